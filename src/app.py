@@ -26,7 +26,7 @@ from src.scripts.data_page import render_data_page
 from src.scripts.search_data import render_search_data_page
 from src.scripts.visualize_data import render_visualize_data_page
 from src.scripts.share_download import render_share_data_page, render_download_data_page
-from src.utils import get_secret, MemoryHandler, CSVFormatter, CustomTimedRotatingFileHandler
+from src.utils import get_secret, MemoryHandler, CSVFormatter, CustomTimedRotatingFileHandler, resume_email_outbox
 
 # Setup logging
 log_dir = os.path.join(os.path.dirname(__file__), get_secret("LOG_DIR", "logs"))
@@ -353,6 +353,7 @@ def main() -> None:
         """,
         unsafe_allow_html=True,
     )
+    resume_email_outbox()
     render_sidebar()
     if st.session_state.page == 'Data Page':
         render_data_page()
@@ -20,7 +20,10 @@ from dotenv import load_dotenv
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from src.datastore.database import save_csv_to_database, init_db  # Updated from save_csv_data
+from src.datastore.database import (  # Updated from save_csv_data
+    apply_retention, get_dedup_stats, save_csv_to_database, save_snapshot_to_database, init_db
+)
+from src.datastore import catalog, retention
 import src.datastore.create_multi_department_data as lsudata
 
 # Load environment variables
@@ -172,39 +175,90 @@ def fetch_lsu_course_data() -> pd.DataFrame:
     course_data : List[dict[str,str]] = lsudata.collect_default_data()
     return pd.DataFrame(course_data)
 
-def save_to_database(dataframe: pd.DataFrame, filename: str, user_id: int = 1) -> None:
+def save_to_database(
+    dataframe: pd.DataFrame,
+    filename: str,
+    user_id: int = 1,
+    series: str | None = None,
+    key_columns: List[str] | None = None,
+    category: str | None = None,
+    fetch_date: str | None = None,
+    major: str | None = None,
+) -> None:
     """Save a DataFrame as CSV to the database.
     
     Args:
         dataframe (pd.DataFrame): DataFrame to save.
         filename (str): Name of the CSV file.
         user_id (int, optional): User ID for database storage. Defaults to 1.
+        series (str, optional): Recurring dataset the file is a daily snapshot of; its rows
+            are then stored as a delta of the previous day. Defaults to None.
+        key_columns (List[str], optional): Columns identifying a row from day to day.
+        category (str, optional): Retention category of the file's partition.
+        fetch_date (str, optional): ISO date naming the file's partition.
+        major (str, optional): Major the data was fetched for; None if it applies to all.
     """
     if dataframe.empty:
         print(f'No data to save for {filename}')
         return
     dataframe.replace('', 'emptyvalue', inplace=True)
     file_content : bytes = dataframe.to_csv(index=False).encode('utf-8')
-    save_csv_to_database(filename, file_content, len(file_content), 'csv', user_id)  # Updated from save_csv_data
-    print(f'Stored {filename} in database')
+    if series:
+        stats = save_snapshot_to_database(
+            filename, file_content, len(file_content), 'csv', user_id, series, key_columns,
+            category=category, fetch_date=fetch_date, major=major, source=catalog.SOURCES.get(category),
+        )
+    else:
+        stats = save_csv_to_database(  # Updated from save_csv_data
+            filename, file_content, len(file_content), 'csv', user_id,
+            category=category, fetch_date=fetch_date, major=major, source=catalog.SOURCES.get(category),
+        )
+    if stats is None:
+        print(f'Failed to store {filename}')
+    elif stats.deduplicated:
+        print(f'Stored {filename} in database ({stats.deduplicated}: unchanged since an earlier fetch)')
+    elif stats.snapshot_base is not None:
+        print(f'Stored {filename} in database (delta of file {stats.snapshot_base})')
+    else:
+        print(f'Stored {filename} in database')
 
 def fetch_and_store_all_data() -> None:
     """Fetch and store job, course, research, and LSU data for all majors."""
     today : str = datetime.now().strftime('%Y-%m-%d')
     for major in MAJORS:
         print(f'Fetching data for {major} on {today}...')
+        slug : str = major.replace(" ", "_")
         jobs_df : pd.DataFrame = fetch_jobs_data(major)
         if not jobs_df.empty:
-            save_to_database(jobs_df, f'jobs_{major.replace(" ", "_")}_{today}.csv')
+            save_to_database(
+                jobs_df, f'jobs_{slug}_{today}.csv', series=f'jobs_{slug}', key_columns=['url'],
+                category=retention.JOBS, fetch_date=today, major=slug,
+            )
         courses_df : pd.DataFrame = fetch_courses_data(major)
         if not courses_df.empty:
-            save_to_database(courses_df, f'courses_{major.replace(" ", "_")}_{today}.csv')
+            save_to_database(
+                courses_df, f'courses_{slug}_{today}.csv', series=f'courses_{slug}', key_columns=['url'],
+                category=retention.COURSES, fetch_date=today, major=slug,
+            )
         research_df : pd.DataFrame = fetch_research_data(major)
         if not research_df.empty:
-            save_to_database(research_df, f'research_{major.replace(" ", "_")}_{today}.csv')
+            save_to_database(
+                research_df, f'research_{slug}_{today}.csv', series=f'research_{slug}', key_columns=['url'],
+                category=retention.RESEARCH, fetch_date=today, major=slug,
+            )
     lsu_df : pd.DataFrame = fetch_lsu_course_data()
     if not lsu_df.empty:
-        save_to_database(lsu_df, f'lsu_relevant_{today}.csv')
+        save_to_database(
+            lsu_df, f'lsu_relevant_{today}.csv', series='lsu_relevant',
+            category=retention.LSU_COURSES, fetch_date=today,
+        )
+    dedup : dict[str, int] = get_dedup_stats()
+    print(
+        f"Deduplication: {dedup['linked_files']} linked file(s) saved "
+        f"{dedup['bytes_saved']:,} bytes and {dedup['rows_saved']:,} rows"
+    )
+    expired : list = apply_retention()
+    print(f'Retention: dropped {len(expired)} expired partition(s)')
 
 def schedule_daily_data_fetch() -> None:
     """Schedule daily data fetching at 8:00 AM."""
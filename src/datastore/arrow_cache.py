@@ -0,0 +1,179 @@
+"""Arrow cache module for Team-34 project.
+
+Keeps decoded datasets of the LSU Datastore Dashboard on disk as uncompressed Arrow IPC
+(Feather v2) files, named by file ID and file version, so every server process reading
+the same database can memory-map a dataset another process already decoded instead of
+rebuilding it from SQLite. Files are written under a temporary name and renamed into
+place, so readers never see a partial file, and a write to a dataset changes its version
+so stale files are never read.
+
+Files live in DATASTORE_ARROW_CACHE_DIR, or next to the SQLite database in a
+``<database>.arrow`` directory.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Directory for cached datasets; defaults to a directory next to the database file
+ARROW_CACHE_DIR: Optional[str] = os.getenv('DATASTORE_ARROW_CACHE_DIR')
+
+# Largest total size of the cached datasets on disk; 0 disables the cache
+ARROW_CACHE_MAX_BYTES: int = int(os.getenv('ARROW_CACHE_MAX_BYTES', str(2**30)))
+
+
+def directory(cursor: sqlite3.Cursor) -> str:
+    """Return the directory holding the cached datasets of a database.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor on the datastore database.
+
+    Returns:
+        str: Path of the cache directory, which may not exist yet.
+    """
+    if ARROW_CACHE_DIR:
+        return ARROW_CACHE_DIR
+    database = next(
+        path for _, name, path in cursor.connection.execute('PRAGMA database_list')
+        if name == 'main'
+    )
+    return f'{database}.arrow' if database else os.path.abspath('datastore.arrow')
+
+
+def _cached_files(cursor: sqlite3.Cursor, file_id: int) -> List[str]:
+    root = directory(cursor)
+    if not os.path.isdir(root):
+        return []
+    prefix = f'{int(file_id)}-'
+    return [
+        os.path.join(root, name) for name in os.listdir(root)
+        if name.startswith(prefix) and name.endswith('.arrow')
+    ]
+
+
+def path(cursor: sqlite3.Cursor, file_id: int, version: int) -> str:
+    """Return the path of a dataset cached at a version.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor on the datastore database.
+        file_id (int): ID of the file.
+        version (int): Version of the file, see database.get_file_version.
+
+    Returns:
+        str: Path of the Arrow file.
+    """
+    return os.path.join(directory(cursor), f'{int(file_id)}-{int(version)}.arrow')
+
+
+def load(cursor: sqlite3.Cursor, file_id: int, version: int) -> Optional[pa.Table]:
+    """Memory-map a cached dataset.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor on the datastore database.
+        file_id (int): ID of the file.
+        version (int): Version of the file the rows must be decoded at.
+
+    Returns:
+        Optional[pa.Table]: The table, backed by the mapped file, or None if the dataset
+            is not cached at that version.
+    """
+    if ARROW_CACHE_MAX_BYTES <= 0:
+        return None
+    try:
+        return feather.read_table(path(cursor, file_id, version), memory_map=True)
+    except FileNotFoundError:
+        return None
+    except (OSError, pa.ArrowException) as e:
+        print(f'❌ Error reading cached dataset {file_id}: {e}')
+        return None
+
+
+def store(cursor: sqlite3.Cursor, file_id: int, version: int, df: pd.DataFrame) -> bool:
+    """Cache a decoded dataset and drop its cached older versions.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor on the datastore database.
+        file_id (int): ID of the file.
+        version (int): Version of the file the rows were decoded at.
+        df (pd.DataFrame): The decoded rows.
+
+    Returns:
+        bool: False if the frame cannot be stored in Arrow format or the write failed.
+    """
+    if ARROW_CACHE_MAX_BYTES <= 0:
+        return False
+    target = path(cursor, file_id, version)
+    temp_path = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        feather.write_feather(df, temp_path, compression='uncompressed')
+        os.replace(temp_path, target)
+    except (OSError, ValueError, pa.ArrowException) as e:
+        print(f'❌ Error caching dataset {file_id}: {e}')
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    for stale_path in _cached_files(cursor, file_id):
+        if stale_path != target:
+            _remove(stale_path)
+    _prune(directory(cursor))
+    return True
+
+
+def discard(cursor: sqlite3.Cursor, file_id: int) -> int:
+    """Remove every cached version of a dataset.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor on the datastore database.
+        file_id (int): ID of the file.
+
+    Returns:
+        int: Number of cache files removed.
+    """
+    stale = _cached_files(cursor, file_id)
+    for stale_path in stale:
+        _remove(stale_path)
+    return len(stale)
+
+
+def clear(cursor: sqlite3.Cursor) -> None:
+    """Remove every cached dataset, e.g. when the database is created anew.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor on the datastore database.
+    """
+    root = directory(cursor)
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            _remove(os.path.join(root, name))
+
+
+def _remove(file_path: str) -> None:
+    # Another process may have removed it first; mapped readers keep their view
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def _prune(root: str) -> None:
+    """Remove the least recently written datasets beyond ARROW_CACHE_MAX_BYTES."""
+    entries = []
+    for entry in os.scandir(root):
+        if entry.name.endswith('.arrow'):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, file_path in sorted(entries):
+        if total <= ARROW_CACHE_MAX_BYTES:
+            break
+        _remove(file_path)
+        total -= size
@@ -0,0 +1,176 @@
+"""Cache module for Team-34 project.
+
+Holds decoded results of datastore reads, such as file listings and read-only dataset
+handles, in a least-recently-used cache bounded by an estimate of their size in bytes.
+Every entry carries the datastore version it was read at; asking for a newer version
+drops the old entry and reloads, so writes invalidate exactly the results they affect.
+"""
+
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+
+class DatasetHandle:
+    """Read-only handle on one version of a dataset, shared by every session.
+
+    Holds the dataset as an Arrow table, memory-mapped from the Arrow cache when it was
+    cached there, together with the DataFrame converted from it once. Pages display and
+    export the shared frame without copying it, so it must never be modified; code
+    that changes rows, such as the editor, works on its own copy.
+
+    Args:
+        table (pa.Table): The dataset's formatted rows.
+    """
+
+    def __init__(self, table: pa.Table) -> None:
+        self.table = table
+        self.frame = table.to_pandas()
+
+    @property
+    def num_rows(self) -> int:
+        """Return the number of rows in the dataset."""
+        return self.table.num_rows
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory a cached value occupies.
+
+    Memory-mapped Arrow data lives in the page cache and is not counted.
+
+    Args:
+        value (Any): A DataFrame, a DatasetHandle or any picklable value.
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    if isinstance(value, DatasetHandle):
+        value = value.frame
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+@dataclass
+class CacheStats:
+    """Counters of an LRUCache.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to load the value.
+        evictions (int): Entries dropped to stay within the byte limit.
+        entries (int): Entries currently cached.
+        bytes (int): Estimated size of the cached entries.
+        max_bytes (int): Byte limit of the cache.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+    max_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache:
+    """Thread-safe LRU cache of versioned values, bounded in bytes.
+
+    Values larger than the whole cache are returned but not kept.
+
+    Args:
+        max_bytes (int): Largest estimated size of all entries together.
+        sizeof (Callable[[Any], int]): Estimates the size of a value in bytes.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = estimate_size) -> None:
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[Hashable, Any, int]]' = OrderedDict()
+        self._stats = CacheStats(max_bytes=max_bytes)
+
+    def get_or_load(self, key: Hashable, version: Hashable, load: Callable[[], Any]) -> Any:
+        """Return the value cached for a key at a version, loading it on a miss.
+
+        Args:
+            key (Hashable): What the value is, e.g. ('preview', file_id).
+            version (Hashable): Datastore version the value must be read at.
+            load (Callable[[], Any]): Reads the value; called without the lock held.
+
+        Returns:
+            Any: The cached or freshly loaded value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return entry[1]
+            self._stats.misses += 1
+        value = load()
+        self.put(key, version, value)
+        return value
+
+    def contains(self, key: Hashable, version: Hashable) -> bool:
+        """Return whether a key is cached at a version, without counting a lookup.
+
+        Args:
+            key (Hashable): What the value is.
+            version (Hashable): Datastore version the value must be read at.
+
+        Returns:
+            bool: True if get_or_load would answer from the cache.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] == version
+
+    def put(self, key: Hashable, version: Hashable, value: Any) -> None:
+        """Cache a value, replacing any other version of the key and evicting the least
+        recently used entries beyond the byte limit.
+
+        Args:
+            key (Hashable): What the value is.
+            version (Hashable): Datastore version the value was read at.
+            value (Any): The value to cache.
+        """
+        size = self._sizeof(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (version, value, size)
+            self._stats.bytes += size
+            while self._stats.bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry, keeping the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.bytes = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(
+                self._stats.hits, self._stats.misses, self._stats.evictions,
+                len(self._entries), self._stats.bytes, self.max_bytes,
+            )
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._stats.bytes -= entry[2]
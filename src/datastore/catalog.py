@@ -0,0 +1,104 @@
+"""Catalog module for Team-34 project.
+
+Describes the datasets of the LSU Datastore Dashboard with structured metadata: the
+category, major, fetch date and source recorded in ``files`` when a dataset is stored.
+The Home page filters and pages on these indexed columns instead of matching filenames.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from . import retention
+
+
+# Data source of each scheduled category
+SOURCES: Dict[str, str] = {
+    retention.JOBS: 'linkedin',
+    retention.COURSES: 'udemy',
+    retention.RESEARCH: 'core',
+    retention.LSU_COURSES: 'lsu_booklet',
+}
+
+# Source recorded for datasets uploaded through the dashboard
+UPLOAD_SOURCE: str = 'upload'
+
+_SCHEDULED_PATTERN = re.compile(
+    rf'^({retention.JOBS}|{retention.COURSES}|{retention.RESEARCH})_(.+)_(\d{{4}}-\d{{2}}-\d{{2}})\.csv$'
+)
+_LSU_PATTERN = re.compile(r'^lsu_relevant_(\d{4}-\d{2}-\d{2})\.csv$')
+
+
+class DatasetMeta(NamedTuple):
+    """Structured description of a scheduled dataset.
+
+    Attributes:
+        category (str): One of the retention categories, e.g. 'jobs'.
+        major (Optional[str]): Major the data was fetched for, e.g. 'data_science';
+            None for data that applies to every major.
+        fetch_date (str): ISO date the data was fetched on.
+        source (str): Where the data came from, e.g. 'linkedin'.
+    """
+
+    category: str
+    major: Optional[str]
+    fetch_date: str
+    source: str
+
+
+def parse_filename(filename: str) -> Optional[DatasetMeta]:
+    """Recover the metadata of a scheduled dataset from its generated filename.
+
+    Used to fill the catalog columns of files stored before they existed.
+
+    Args:
+        filename (str): Stored filename, e.g. 'jobs_data_science_2025-05-05.csv'.
+
+    Returns:
+        Optional[DatasetMeta]: The metadata, or None for filenames the fetcher never
+            generates, such as uploads.
+    """
+    match = _SCHEDULED_PATTERN.match(filename)
+    if match:
+        category, major, fetch_date = match.groups()
+        return DatasetMeta(category, major, fetch_date, SOURCES[category])
+    match = _LSU_PATTERN.match(filename)
+    if match:
+        return DatasetMeta(
+            retention.LSU_COURSES, None, match.group(1), SOURCES[retention.LSU_COURSES]
+        )
+    return None
+
+
+def build_query(
+    category: Optional[str] = None,
+    major: Optional[str] = None,
+    fetch_date: Optional[str] = None,
+    source: Optional[str] = None,
+) -> Tuple[str, List[object]]:
+    """Build the WHERE clause selecting live files by catalog metadata.
+
+    A major also matches files without a major, since those apply to every major.
+
+    Args:
+        category (Optional[str]): Category to match; None for any.
+        major (Optional[str]): Major to match; None for any.
+        fetch_date (Optional[str]): ISO fetch date to match; None for any.
+        source (Optional[str]): Source to match; None for any.
+
+    Returns:
+        Tuple[str, List[object]]: The clause and its parameters.
+    """
+    conditions, params = ['deleted_at IS NULL'], []
+    if category is not None:
+        conditions.append('category = ?')
+        params.append(category)
+    if major is not None:
+        conditions.append('(major = ? OR major IS NULL)')
+        params.append(major)
+    if fetch_date is not None:
+        conditions.append('fetch_date = ?')
+        params.append(fetch_date)
+    if source is not None:
+        conditions.append('source = ?')
+        params.append(source)
+    return ' WHERE ' + ' AND '.join(conditions), params
@@ -0,0 +1,184 @@
+"""Column types module for Team-34 project.
+
+Infers a logical type for every dataset column once, while the dataset is ingested, so
+the LSU Datastore Dashboard can build typed frames on read without guessing. Missing
+values ('N/A' and empty cells) never influence the inferred type.
+"""
+
+import os
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+
+# Logical column types from narrowest to widest
+INT: str = 'int'
+FLOAT: str = 'float'
+DATE: str = 'date'
+CATEGORY: str = 'category'
+STRING: str = 'string'
+LOGICAL_TYPES: List[str] = [INT, FLOAT, DATE, CATEGORY, STRING]
+
+# Most distinct values a text column may have to be stored as a category
+CATEGORY_MAX_VALUES: int = int(os.getenv('CATEGORY_MAX_VALUES', '50'))
+
+# Values treated as missing when inferring types
+_MISSING_VALUES = ['N/A', '', 'nan']
+
+# Rows of a text column tried as dates before the whole column is parsed
+_DATE_SAMPLE_SIZE = 100
+
+
+def display_name(column: str) -> str:
+    """Return the name a stored column is shown under.
+
+    Args:
+        column (str): Stored column name.
+
+    Returns:
+        str: The display name, e.g. 'Job Title' for 'job_title'.
+    """
+    return column.replace('_', ' ').title()
+
+
+def _present(values: pd.Series) -> pd.Series:
+    values = values[values.notna()].astype(str)
+    return values[~values.isin(_MISSING_VALUES)]
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(values, errors='coerce', format='ISO8601')
+
+
+def classify(values: pd.Series) -> Optional[str]:
+    """Find the narrowest logical type that fits every present value.
+
+    Text columns come back as STRING; whether they are categories depends on the whole
+    column and is decided by TypeInference.
+
+    Args:
+        values (pd.Series): Column values in any dtype.
+
+    Returns:
+        Optional[str]: INT, FLOAT, DATE or STRING, or None if every value is missing.
+    """
+    values = _present(values)
+    if values.empty:
+        return None
+    numbers = pd.to_numeric(values, errors='coerce')
+    if numbers.notna().all():
+        return INT if (numbers % 1 == 0).all() else FLOAT
+    sample = values.head(_DATE_SAMPLE_SIZE)
+    if _parse_dates(sample).notna().all() and _parse_dates(values).notna().all():
+        return DATE
+    return STRING
+
+
+def widen(current: Optional[str], observed: Optional[str]) -> Optional[str]:
+    """Combine the type recorded so far with the type of newly seen values.
+
+    Args:
+        current (Optional[str]): Type inferred from earlier values, or None.
+        observed (Optional[str]): Type of the new values, or None if all were missing.
+
+    Returns:
+        Optional[str]: The narrowest type that fits both.
+    """
+    if current is None:
+        return observed
+    if observed is None or observed == current:
+        return current
+    if {current, observed} == {INT, FLOAT}:
+        return FLOAT
+    if current == CATEGORY:
+        return CATEGORY
+    return STRING
+
+
+class TypeInference:
+    """Infer column types incrementally over the chunks of one dataset.
+
+    Args:
+        columns (List[str]): Stored column names in order.
+    """
+
+    def __init__(self, columns: List[str]) -> None:
+        self.columns = list(columns)
+        self._types: Dict[str, Optional[str]] = {col: None for col in self.columns}
+        self._distinct: Dict[str, Set[str]] = {col: set() for col in self.columns}
+        self._counts: Dict[str, int] = {col: 0 for col in self.columns}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Account for one chunk of rows.
+
+        Args:
+            chunk (pd.DataFrame): Rows with the stored column names.
+        """
+        for col in self.columns:
+            values = _present(chunk[col])
+            if values.empty:
+                continue
+            if self._types[col] != STRING:
+                self._types[col] = widen(self._types[col], classify(values))
+            self._counts[col] += len(values)
+            distinct = self._distinct[col]
+            if len(distinct) <= CATEGORY_MAX_VALUES:
+                distinct.update(values.unique()[:CATEGORY_MAX_VALUES + 1])
+
+    def result(self) -> List[str]:
+        """Return the inferred type of every column in order.
+
+        Text columns with at most CATEGORY_MAX_VALUES distinct values, each repeated on
+        average, become categories. Columns with no values are strings.
+
+        Returns:
+            List[str]: One logical type per column.
+        """
+        types = []
+        for col in self.columns:
+            logical_type = self._types[col] or STRING
+            distinct = len(self._distinct[col])
+            repeated = distinct * 2 <= self._counts[col]
+            if logical_type == STRING and distinct <= CATEGORY_MAX_VALUES and repeated:
+                logical_type = CATEGORY
+            types.append(logical_type)
+        return types
+
+
+def infer_types(df: pd.DataFrame) -> List[str]:
+    """Infer the logical type of every column of a complete frame.
+
+    Args:
+        df (pd.DataFrame): Rows with the stored column names.
+
+    Returns:
+        List[str]: One logical type per column.
+    """
+    inference = TypeInference(list(df.columns))
+    inference.update(df)
+    return inference.result()
+
+
+def cast_column(values: pd.Series, logical_type: Optional[str]) -> pd.Series:
+    """Convert stored values to the dtype of their logical type.
+
+    Values that do not fit the type become missing. Integer columns with missing values
+    stay floating point, as pandas has no missing integer in its default dtypes.
+
+    Args:
+        values (pd.Series): Values as returned by a storage engine.
+        logical_type (Optional[str]): The column's logical type; None leaves values as is.
+
+    Returns:
+        pd.Series: The converted values.
+    """
+    if logical_type in (INT, FLOAT):
+        numbers = pd.to_numeric(values, errors='coerce')
+        if logical_type == INT and numbers.notna().all():
+            return numbers.astype('int64')
+        return numbers
+    if logical_type == DATE:
+        return _parse_dates(values)
+    if logical_type == CATEGORY:
+        return values.astype('category')
+    return values
@@ -0,0 +1,157 @@
+"""Connection module for Team-34 project.
+
+Provides a pool of reusable SQLite connections for the LSU Datastore Dashboard. Every
+pooled connection runs in WAL mode with tuned pragmas, so dashboard readers no longer
+block behind the scheduled writer and Streamlit reruns skip connection setup.
+
+Pooled connections also run callbacks when their transaction ends, so work done
+outside SQLite, such as replacing Parquet files, only takes effect once the rows that
+describe it are committed.
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+
+# Pragmas applied to every new connection; values can be tuned through the environment
+CONNECTION_PRAGMAS: List[str] = [
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA foreign_keys = ON',
+    f'PRAGMA mmap_size = {int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))}',
+    f'PRAGMA cache_size = {int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))}',
+    f'PRAGMA busy_timeout = {int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))}',
+    'PRAGMA temp_store = MEMORY',
+]
+
+# Maximum number of idle connections kept per database file
+POOL_SIZE: int = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+
+
+class DatastoreConnection(sqlite3.Connection):
+    """SQLite connection that runs registered callbacks when its transaction ends."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._hooks: List[Tuple[Callable[[], None], Callable[[], None]]] = []
+
+    @property
+    def has_hooks(self) -> bool:
+        """Return whether callbacks are waiting for the transaction to end."""
+        return bool(self._hooks)
+
+    def commit(self) -> None:
+        super().commit()
+        hooks, self._hooks = self._hooks, []
+        for on_commit, _ in hooks:
+            on_commit()
+
+    def rollback(self) -> None:
+        try:
+            super().rollback()
+        finally:
+            hooks, self._hooks = self._hooks, []
+            for _, on_rollback in hooks:
+                on_rollback()
+
+
+def defer(conn: sqlite3.Connection, on_commit: Callable[[], None], on_rollback: Callable[[], None]) -> bool:
+    """Run a callback once the connection's transaction commits, or another if it rolls back.
+
+    Args:
+        conn (sqlite3.Connection): Connection whose transaction the work belongs to.
+        on_commit (Callable[[], None]): Called after the next commit.
+        on_rollback (Callable[[], None]): Called after the next rollback.
+
+    Returns:
+        bool: False if the connection does not run callbacks, i.e. it was not handed out
+            by a ConnectionPool; the caller then has to apply its work at once.
+    """
+    if not isinstance(conn, DatastoreConnection):
+        return False
+    conn._hooks.append((on_commit, on_rollback))
+    return True
+
+
+class ConnectionPool:
+    """Hand out reusable SQLite connections to one database file.
+
+    Connections are created lazily, configured once with CONNECTION_PRAGMAS, and returned
+    to the pool after use. A connection is only ever used by one thread at a time.
+    """
+
+    def __init__(self, path: str, size: int = POOL_SIZE) -> None:
+        self.path = path
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, factory=DatastoreConnection)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of a ``with`` block.
+
+        Any transaction left open by the caller is rolled back, and its callbacks told
+        so, before the connection goes back to the pool.
+
+        Yields:
+            sqlite3.Connection: A configured connection.
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction or conn.has_hooks:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self) -> None:
+        """Close every idle connection in the pool."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: str) -> ConnectionPool:
+    """Return the shared connection pool for a database file.
+
+    Args:
+        path (str): Path to the SQLite database file.
+
+    Returns:
+        ConnectionPool: The pool for that file, created on first use.
+    """
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path)
+        return pool
+
+
+@atexit.register
+def close_all() -> None:
+    """Close the idle connections of every pool."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
@@ -1,18 +1,29 @@
 """Database module for Team-34 project.
 
 Manages SQLite database operations for user authentication, file metadata, and CSV data
-storage for the LSU Datastore Dashboard.
+storage for the LSU Datastore Dashboard. Dataset values are persisted through the storage
+engines in the engines module; each file records the engine its rows were written with.
 """
 
 import hashlib
 import io
 import os
 import pandas as pd
+import psutil
+import pyarrow as pa
 import sqlite3
-from datetime import datetime
-from typing import Any, List, Optional, Tuple
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from dotenv import load_dotenv
 
+from . import arrow_cache, catalog, column_types, exports, ingest_queue, outbox, reclaim, retention, search_index, snapshots
+from .connection import get_pool
+from .engines import (
+    AGGREGATIONS, ENGINES, FILTER_OPS, Aggregation, EAVEngine, RowFilter, StorageEngine, get_engine
+)
+
 
 load_dotenv()
 
@@ -21,57 +32,305 @@ load_dotenv()
 BASE_DIR: str = os.path.dirname(os.path.abspath(__file__))
 DB_NAME = os.path.join(BASE_DIR, os.getenv("DATABASE_NAME", "datastore.db"))
 
+# Number of CSV rows parsed and written per batch during ingest
+INGEST_CHUNK_SIZE: int = int(os.getenv("INGEST_CHUNK_SIZE", "10000"))
+
+# Maximum number of rows returned by search_csv_data
+SEARCH_RESULT_LIMIT: int = int(os.getenv("SEARCH_RESULT_LIMIT", "1000"))
+
+
+def get_connection() -> ContextManager[sqlite3.Connection]:
+    """Borrow a pooled connection to the datastore database.
+
+    Returns:
+        ContextManager[sqlite3.Connection]: Context manager yielding a WAL-mode connection
+            that is returned to the pool when the block exits.
+    """
+    return get_pool(DB_NAME).connection()
+
+
+# Background reclamation of deleted datasets
+_reclaimer = reclaim.Reclaimer(get_connection)
+
+
+@dataclass
+class IngestStats:
+    """Throughput and memory figures for one dataset ingest.
+
+    Attributes:
+        file_id (int): ID of the stored file.
+        rows (int): Number of rows written.
+        seconds (float): Wall-clock time spent parsing and writing.
+        peak_memory_bytes (int): Highest process resident set size observed between chunks.
+        deduplicated (Optional[str]): 'skipped' if an identical upload already existed,
+            'linked' if the file shares the rows of an identical file, otherwise None.
+        snapshot_base (Optional[int]): ID of the previous snapshot the file was stored as
+            a row delta of, or None if its rows were stored in full.
+    """
+
+    file_id: int
+    rows: int
+    seconds: float
+    peak_memory_bytes: int
+    deduplicated: Optional[str] = None
+    snapshot_base: Optional[int] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        """Return the ingest throughput in rows per second."""
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
 
 def init_db() -> None:
     """Initialize the SQLite database and create tables if they do not exist."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        # Users table for authentication
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL
+            )
+        """)
+
+        # Files metadata table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                filename TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                file_format TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # CSV data table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS csv_data (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                file_id INTEGER NOT NULL,
+                row_number INTEGER NOT NULL,
+                column_name TEXT NOT NULL,
+                value TEXT NOT NULL,
+                FOREIGN KEY (file_id) REFERENCES files(id) ON DELETE CASCADE
+            )
+        """)
+
+        # CSV columns table for preserving column order
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS csv_columns (
+                file_id INTEGER,
+                column_index INTEGER,
+                column_name TEXT
+            )
+        """)
 
-    # Users table for authentication
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL
-        )
-    """)
+        conn.commit()
 
-    # Files metadata table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS files (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            filename TEXT NOT NULL,
-            file_size INTEGER NOT NULL,
-            file_format TEXT NOT NULL,
-            user_id INTEGER NOT NULL,
-            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+        # Cached datasets of a database that was created anew belong to another database
+        if get_schema_version(conn) == 0:
+            arrow_cache.clear(cursor)
 
-    # CSV data table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS csv_data (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            file_id INTEGER NOT NULL,
-            row_number INTEGER NOT NULL,
-            column_name TEXT NOT NULL,
-            value TEXT NOT NULL,
-            FOREIGN KEY (file_id) REFERENCES files(id) ON DELETE CASCADE
+        # Bring the schema up to date
+        migrate_schema(conn)
+    print('✅ Database initialized successfully!')
+
+    # Free storage left behind by deletions; the first pass also enables incremental VACUUM
+    _reclaimer.schedule()
+
+
+def _add_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> None:
+    """Add a column to a table unless it already exists.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        table (str): Table to alter.
+        column (str): Name of the column to add.
+        definition (str): Column type and constraints.
+    """
+    cursor.execute(f'PRAGMA table_info({table})')
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+def _migration_add_storage_engine(cursor: sqlite3.Cursor) -> None:
+    """Record which storage engine holds each file's rows."""
+    _add_column(cursor, 'files', 'storage_engine', "TEXT NOT NULL DEFAULT 'eav'")
+
+
+def _migration_add_indexes(cursor: sqlite3.Cursor) -> None:
+    """Index the per-file lookups used by preview, column ordering and the file list."""
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_csv_data_file_row ON csv_data (file_id, row_number)'
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_csv_columns_file_index '
+        'ON csv_columns (file_id, column_index, column_name)'
+    )
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_uploaded_at ON files (uploaded_at)')
+
+
+def _migration_add_search_index(cursor: sqlite3.Cursor) -> None:
+    """Create the full-text search index and fill it from the stored datasets."""
+    if not search_index.create_index(cursor):
+        return
+    cursor.execute('SELECT id FROM files ORDER BY id')
+    for (file_id,) in cursor.fetchall():
+        engine = _get_file_engine(cursor, file_id)
+        df = engine.read(cursor, file_id, _get_columns(cursor, file_id))
+        search_index.index_rows(cursor, file_id, df)
+
+
+def _migration_add_row_count(cursor: sqlite3.Cursor) -> None:
+    """Store each file's row count so paging never has to count rows."""
+    _add_column(cursor, 'files', 'row_count', 'INTEGER')
+    cursor.execute('SELECT id FROM files WHERE row_count IS NULL')
+    for (file_id,) in cursor.fetchall():
+        engine = _get_file_engine(cursor, file_id)
+        cursor.execute(
+            'UPDATE files SET row_count = ? WHERE id = ?', (engine.count(cursor, file_id), file_id)
         )
-    """)
 
-    # CSV columns table for preserving column order
+
+def _migration_add_content_hash(cursor: sqlite3.Cursor) -> None:
+    """Track content hashes so identical datasets can share one copy of their rows."""
+    _add_column(cursor, 'files', 'content_hash', 'TEXT')
+    _add_column(cursor, 'files', 'data_file_id', 'INTEGER REFERENCES files(id)')
+    _add_column(cursor, 'files', 'deleted_at', 'TIMESTAMP')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_content_hash ON files (content_hash)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_data_file_id ON files (data_file_id)')
+
+
+def _migration_add_column_types(cursor: sqlite3.Cursor) -> None:
+    """Store display names and logical types so reads no longer guess column types."""
+    _add_column(cursor, 'csv_columns', 'display_name', 'TEXT')
+    _add_column(cursor, 'csv_columns', 'logical_type', 'TEXT')
+    cursor.execute('SELECT DISTINCT column_name FROM csv_columns WHERE display_name IS NULL')
+    cursor.executemany(
+        'UPDATE csv_columns SET display_name = ? WHERE column_name = ? AND display_name IS NULL',
+        [(column_types.display_name(name), name) for (name,) in cursor.fetchall()],
+    )
+
+
+def _migration_add_snapshots(cursor: sqlite3.Cursor) -> None:
+    """Let recurring datasets be stored as row deltas of their previous snapshot."""
+    _add_column(cursor, 'files', 'snapshot_series', 'TEXT')
+    _add_column(cursor, 'files', 'base_file_id', 'INTEGER REFERENCES files(id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_snapshot_series ON files (snapshot_series, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_base_file_id ON files (base_file_id)')
+    snapshots.create_table(cursor)
+
+
+def _migration_add_partitions(cursor: sqlite3.Cursor) -> None:
+    """Partition scheduled datasets by category and fetch date for retention."""
+    _add_column(cursor, 'files', 'category', 'TEXT')
+    _add_column(cursor, 'files', 'fetch_date', 'TEXT')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_files_category_fetch_date ON files (category, fetch_date)'
+    )
+
+
+def _migration_add_catalog(cursor: sqlite3.Cursor) -> None:
+    """Describe datasets by major and source, filling scheduled files from their names."""
+    _add_column(cursor, 'files', 'major', 'TEXT')
+    _add_column(cursor, 'files', 'source', 'TEXT')
+    cursor.execute('SELECT id, filename FROM files WHERE category IS NULL')
+    cursor.executemany(
+        'UPDATE files SET category = ?, major = ?, fetch_date = ?, source = ? WHERE id = ?',
+        [
+            (*meta, file_id) for file_id, meta in (
+                (file_id, catalog.parse_filename(filename)) for file_id, filename in cursor.fetchall()
+            )
+            if meta is not None
+        ],
+    )
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_major_fetch_date ON files (major, fetch_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_fetch_date ON files (fetch_date)')
+
+
+def _migration_add_generation(cursor: sqlite3.Cursor) -> None:
+    """Count writes to the datastore and to each file so caches can tell stale results."""
+    _add_column(cursor, 'files', 'version', 'INTEGER NOT NULL DEFAULT 0')
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS csv_columns (
-            file_id INTEGER,
-            column_index INTEGER,
-            column_name TEXT
+        CREATE TABLE IF NOT EXISTS datastore_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
         )
     """)
+    cursor.execute('INSERT OR IGNORE INTO datastore_generation (id, generation) VALUES (1, 0)')
 
-    conn.commit()
-    conn.close()
-    print('✅ Database initialized successfully!')
+
+def _migration_add_email_outbox(cursor: sqlite3.Cursor) -> None:
+    """Persist dataset emails so they are sent and retried in the background."""
+    outbox.create_table(cursor)
+
+
+# Ordered schema upgrades as (version, description, migration); never edit a released entry
+SCHEMA_MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, 'add files.storage_engine', _migration_add_storage_engine),
+    (2, 'add csv_data, csv_columns and files indexes', _migration_add_indexes),
+    (3, 'add csv_search full-text index', _migration_add_search_index),
+    (4, 'add files.row_count', _migration_add_row_count),
+    (5, 'add files.content_hash, data_file_id and deleted_at', _migration_add_content_hash),
+    (6, 'add csv_columns.display_name and logical_type', _migration_add_column_types),
+    (7, 'add files.snapshot_series, base_file_id and snapshot_removed', _migration_add_snapshots),
+    (8, 'add files.category and fetch_date', _migration_add_partitions),
+    (9, 'add files.major and source', _migration_add_catalog),
+    (10, 'add files.version and datastore_generation', _migration_add_generation),
+    (11, 'add email_outbox', _migration_add_email_outbox),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version recorded in the database header.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+
+    Returns:
+        int: The applied schema version, 0 for a database that was never migrated.
+    """
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate_schema(conn: sqlite3.Connection) -> int:
+    """Apply pending schema migrations in order and refresh planner statistics.
+
+    Each migration runs in its own transaction together with the version bump, so a
+    failed upgrade leaves the database at the last good version.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+
+    Returns:
+        int: The schema version after migrating.
+
+    Raises:
+        sqlite3.Error: If a migration fails.
+    """
+    current = get_schema_version(conn)
+    pending = [m for m in SCHEMA_MIGRATIONS if m[0] > current]
+    cursor = conn.cursor()
+    for version, description, migration in pending:
+        try:
+            cursor.execute('BEGIN')
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {int(version)}')
+            conn.commit()
+            print(f'✅ Applied schema migration {version}: {description}')
+            current = version
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f'❌ Error applying schema migration {version} ({description}): {e}')
+            raise
+
+    if pending:
+        cursor.execute('ANALYZE')
+        conn.commit()
+    return current
 
 
 def authenticate_user(username: str, password: str) -> bool:
@@ -84,260 +343,1674 @@ def authenticate_user(username: str, password: str) -> bool:
     Returns:
         bool: True if authentication succeeds, False otherwise.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
     hashed_password = hashlib.sha256(password.encode()).hexdigest()
 
-    cursor.execute('SELECT password FROM users WHERE username = ?', (username,))
-    result = cursor.fetchone()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT password FROM users WHERE username = ?', (username,))
+        result = cursor.fetchone()
 
     return bool(result and result[0] == hashed_password)
 
 
-def save_csv_to_database(
-    filename: str, content: bytes, file_size: int, file_format: str, user_id: int
-) -> None:
-    """Save a CSV file and its data to the SQLite database.
+def _get_file_engine(cursor: sqlite3.Cursor, file_id: int) -> Optional[StorageEngine]:
+    """Look up the storage engine a file's rows were written with.
 
     Args:
-        filename (str): Name of the CSV file.
-        content (bytes): Binary content of the CSV file.
-        file_size (int): Size of the file in bytes.
-        file_format (str): Format of the file (e.g., 'csv').
-        user_id (int): ID of the user uploading the file.
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file.
 
-    Raises:
-        sqlite3.Error: If a database operation fails.
+    Returns:
+        Optional[StorageEngine]: The file's engine, or None if the file does not exist.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    cursor.execute('SELECT storage_engine FROM files WHERE id = ?', (file_id,))
+    result = cursor.fetchone()
+    if result is None:
+        return None
+    return get_engine(result[0] or EAVEngine.name)
 
-    try:
-        # Insert metadata into files table
-        cursor.execute(
-            'INSERT INTO files (filename, file_size, file_format, user_id) VALUES (?, ?, ?, ?)',
-            (filename, file_size, file_format, user_id),
-        )
-        file_id = cursor.lastrowid
 
-        # Read CSV content into pandas
-        csv_data = io.BytesIO(content)
-        df = pd.read_csv(csv_data)
-        df.replace('emptyvalue', 'N/A', inplace=True)
+def _resolve(cursor: sqlite3.Cursor, file_id: int) -> Optional[Tuple[int, StorageEngine]]:
+    """Find the file whose stored rows back a file and the engine holding them.
 
-        # Insert CSV data into csv_data table
-        for row_idx, row in df.iterrows():
-            for col_name, value in row.items():
-                cursor.execute(
-                    'INSERT INTO csv_data (file_id, row_number, column_name, value) '
-                    'VALUES (?, ?, ?, ?)',
-                    (file_id, row_idx, col_name, str(value)),
-                )
+    A deduplicated file keeps no rows of its own and reads those of the file it links to.
+    A delta snapshot is read through a view that rebuilds its rows from its base.
 
-        # Insert column order into csv_columns table
-        for col_idx, col_name in enumerate(df.columns):
-            cursor.execute(
-                'INSERT INTO csv_columns (file_id, column_index, column_name) '
-                'VALUES (?, ?, ?)',
-                (file_id, col_idx, col_name),
-            )
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file.
 
-        conn.commit()
-    except (sqlite3.Error, pd.errors.ParserError) as e:
-        print(f'❌ Error saving CSV data for {filename}: {e}')
-        conn.rollback()
-    finally:
-        conn.close()
+    Returns:
+        Optional[Tuple[int, StorageEngine]]: The ID the rows are stored under and their
+            engine, or None if the file does not exist.
+    """
+    cursor.execute(
+        'SELECT d.id, d.storage_engine, d.base_file_id FROM files f '
+        'JOIN files d ON d.id = COALESCE(f.data_file_id, f.id) WHERE f.id = ?',
+        (file_id,),
+    )
+    result = cursor.fetchone()
+    if result is None:
+        return None
+    data_id, engine_name, base_file_id = result
+    engine = get_engine(engine_name or EAVEngine.name)
+    if base_file_id is not None:
+        base = _resolve(cursor, base_file_id)
+        if base is not None:
+            engine = snapshots.SnapshotView(engine, *base)
+    return data_id, engine
 
 
-def get_files() -> List[Tuple[int, str, int, str, datetime]]:
-    """Retrieve metadata for all stored files from the database.
+def _get_columns(cursor: sqlite3.Cursor, file_id: int) -> List[str]:
+    """Return a file's column names in their original order.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file.
 
     Returns:
-        List[Tuple[int, str, int, str, datetime]]: List of tuples containing file metadata
-            (id, filename, file_size, file_format, uploaded_at).
+        List[str]: Ordered column names, or an empty list if none were recorded.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
     cursor.execute(
-        'SELECT id, filename, file_size, file_format, uploaded_at '
-        'FROM files ORDER BY uploaded_at DESC'
+        'SELECT column_name FROM csv_columns WHERE file_id = ? ORDER BY column_index',
+        (file_id,),
     )
-    files = cursor.fetchall()
-    conn.close()
-    return files
+    return [row[0] for row in cursor.fetchall()]
 
 
-def get_csv_preview(file_id: int) -> pd.DataFrame:
-    """Retrieve and format CSV data for preview in Streamlit.
+def _get_column_meta(cursor: sqlite3.Cursor, file_id: int) -> List[Tuple[str, str, Optional[str]]]:
+    """Return a file's columns with their display names and logical types.
 
     Args:
-        file_id (int): ID of the file to preview.
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID the file's rows are stored under.
 
     Returns:
-        pd.DataFrame: Formatted DataFrame with CSV data, or empty if no data exists.
+        List[Tuple[str, str, Optional[str]]]: (column_name, display_name, logical_type) in
+            column order; the type is None for columns stored before types were recorded.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
     cursor.execute(
-        'SELECT row_number, column_name, value FROM csv_data '
-        'WHERE file_id = ? ORDER BY row_number',
+        'SELECT column_name, display_name, logical_type FROM csv_columns '
+        'WHERE file_id = ? ORDER BY column_index',
         (file_id,),
     )
-    rows = cursor.fetchall()
+    return [
+        (name, display or column_types.display_name(name), logical_type)
+        for name, display, logical_type in cursor.fetchall()
+    ]
+
+
+def _write_columns(
+    cursor: sqlite3.Cursor,
+    file_id: int,
+    columns: List[str],
+    logical_types: Optional[List[str]] = None,
+) -> None:
+    """Replace the recorded columns of a file.
 
-    # Convert to DataFrame
-    df = pd.DataFrame(rows, columns=['row_number', 'column_name', 'value']).pivot(
-        index='row_number', columns='column_name', values='value'
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file.
+        columns (List[str]): Column names in order.
+        logical_types (Optional[List[str]]): Logical type of each column; None leaves the
+            types to be inferred on first read.
+    """
+    cursor.execute('DELETE FROM csv_columns WHERE file_id = ?', (file_id,))
+    cursor.executemany(
+        'INSERT INTO csv_columns (file_id, column_index, column_name, display_name, logical_type) '
+        'VALUES (?, ?, ?, ?, ?)',
+        [
+            (file_id, col_idx, col_name, column_types.display_name(col_name), logical_type)
+            for col_idx, (col_name, logical_type) in enumerate(
+                zip(columns, logical_types or [None] * len(columns))
+            )
+        ],
     )
-    df = df.reset_index(drop=True)
 
-    # Check if csv_columns table exists
-    cursor.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='csv_columns'"
+
+def _set_column_types(cursor: sqlite3.Cursor, file_id: int, logical_types: List[str]) -> None:
+    """Record the logical types of a file's columns.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID the file's rows are stored under.
+        logical_types (List[str]): Logical type of each column in order.
+    """
+    cursor.executemany(
+        'UPDATE csv_columns SET logical_type = ? WHERE file_id = ? AND column_index = ?',
+        [(logical_type, file_id, col_idx) for col_idx, logical_type in enumerate(logical_types)],
     )
-    table_exists = cursor.fetchone() is not None
-    has_column_order = False
-    if table_exists:
-        cursor.execute('SELECT COUNT(*) FROM csv_columns WHERE file_id = ?', (file_id,))
-        has_column_order = cursor.fetchone()[0] > 0
-
-    # Apply column order if available
-    if has_column_order:
-        cursor.execute(
-            'SELECT column_name FROM csv_columns '
-            'WHERE file_id = ? ORDER BY column_index',
-            (file_id,),
-        )
-        ordered_columns = [row[0] for row in cursor.fetchall()]
-        df = df[ordered_columns]
 
-    # Format column names
-    df.columns = [col.replace('_', ' ').title() for col in df.columns]
 
-    # Convert numeric columns
-    for col in df.columns:
-        non_na_values = df[col][df[col] != 'N/A']
-        converted = pd.to_numeric(non_na_values, errors='coerce')
-        if not converted.isna().any():
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+def _widen_column_types(
+    cursor: sqlite3.Cursor, file_id: int, written: Dict[int, List[Any]]
+) -> None:
+    """Widen recorded column types so they also fit newly written values.
 
-    conn.close()
-    return df
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID the file's rows are stored under.
+        written (Dict[int, List[Any]]): New values keyed by column position.
+    """
+    meta = _get_column_meta(cursor, file_id)
+    for col_idx, values in written.items():
+        current = meta[col_idx][2]
+        if current is None:
+            continue
+        observed = column_types.classify(pd.Series(values, dtype=object))
+        widened = column_types.widen(current, observed)
+        if widened != current:
+            cursor.execute(
+                'UPDATE csv_columns SET logical_type = ? WHERE file_id = ? AND column_index = ?',
+                (widened, file_id, col_idx),
+            )
 
 
-def delete_file(file_id: int) -> None:
-    """Delete a file and its associated CSV data from the database.
+def _iter_chunks(df: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield consecutive row slices of a DataFrame, renumbered from zero.
 
     Args:
-        file_id (int): ID of the file to delete.
+        df (pd.DataFrame): DataFrame to slice.
+        chunk_size (int): Maximum number of rows per slice.
 
-    Raises:
-        sqlite3.Error: If the deletion operation fails.
+    Yields:
+        pd.DataFrame: Slices whose index holds the row numbers to store.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute('DELETE FROM files WHERE id = ?', (file_id,))
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f'❌ Error deleting file {file_id}: {e}')
-        conn.rollback()
-    finally:
-        conn.close()
+    df = df.reset_index(drop=True)
+    if df.empty:
+        yield df
+        return
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
 
 
-def search_csv_data(query: str) -> List[Tuple[int, int, str, str]]:
-    """Search all CSV data for a given keyword.
+def _copy_data(
+    cursor: sqlite3.Cursor, engine: StorageEngine, source_id: int, target_id: int
+) -> None:
+    """Copy the stored rows, column order and search entries of one file to another.
+
+    Rows are copied in windows of INGEST_CHUNK_SIZE and keep their row numbers.
 
     Args:
-        query (str): Keyword to search for in CSV values.
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        engine (StorageEngine): Engine holding the source rows; the copy uses it too.
+        source_id (int): ID the rows are currently stored under.
+        target_id (int): ID to store the copy under.
+    """
+    columns = _get_columns(cursor, source_id)
+    _copy_columns(cursor, source_id, target_id)
+    indexed = search_index.index_exists(cursor)
+    offset = 0
+    while True:
+        chunk = engine.read(cursor, source_id, columns, offset, INGEST_CHUNK_SIZE)
+        if offset == 0:
+            engine.create(cursor, target_id, chunk)
+        if chunk.empty:
+            break
+        engine.append(cursor, target_id, chunk)
+        if indexed:
+            search_index.index_rows(cursor, target_id, chunk)
+        offset += len(chunk)
+    engine.finish(cursor, target_id)
+
+
+def _copy_columns(cursor: sqlite3.Cursor, source_id: int, target_id: int) -> None:
+    """Copy the recorded columns, display names and types of one file to another.
 
-    Returns:
-        List[Tuple[int, int, str, str]]: List of tuples containing search results
-            (file_id, row_number, column_name, value).
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        source_id (int): ID the columns are currently recorded under.
+        target_id (int): ID to record the copy under.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    cursor.execute('DELETE FROM csv_columns WHERE file_id = ?', (target_id,))
+    cursor.execute(
+        'INSERT INTO csv_columns (file_id, column_index, column_name, display_name, logical_type) '
+        'SELECT ?, column_index, column_name, display_name, logical_type FROM csv_columns '
+        'WHERE file_id = ?',
+        (target_id, source_id),
+    )
 
-    try:
+
+def _store_in_full(cursor: sqlite3.Cursor, file_id: int, view: snapshots.SnapshotView) -> None:
+    """Store every row of a delta snapshot under its own ID, detaching it from its base.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the delta file.
+        view (snapshots.SnapshotView): View the delta file is read through.
+    """
+    df = view.materialize(cursor, file_id, _get_columns(cursor, file_id))
+    view.own.delete(cursor, file_id)
+    view.own.write(cursor, file_id, df)
+    if search_index.index_exists(cursor):
+        search_index.unindex_file(cursor, file_id)
+        search_index.index_rows(cursor, file_id, df)
+    snapshots.clear_removed(cursor, file_id)
+    cursor.execute('UPDATE files SET base_file_id = NULL WHERE id = ?', (file_id,))
+
+
+def _detach_snapshots(
+    cursor: sqlite3.Cursor, file_id: int, dropped: Optional[Set[int]] = None
+) -> None:
+    """Store the delta snapshots built on a file in full before the file goes away or changes.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the base file.
+        dropped (Optional[Set[int]]): IDs of files deleted in the same transaction, whose
+            rows are not worth copying.
+    """
+    cursor.execute('SELECT id FROM files WHERE base_file_id = ? ORDER BY id', (file_id,))
+    for (child_id,) in cursor.fetchall():
+        if dropped and child_id in dropped:
+            continue
+        _, view = _resolve(cursor, child_id)
+        _store_in_full(cursor, child_id, view)
+
+
+def _claim_data(
+    cursor: sqlite3.Cursor, file_id: int, keep_rows: bool = True
+) -> Optional[StorageEngine]:
+    """Give a file a private copy of its rows before they are modified.
+
+    A linked file copies the shared rows under its own ID. A file whose rows are shared
+    hands a copy to its first linked file, which becomes the owner for the others. Either
+    way the file's content hash is cleared, since its content is about to change. Delta
+    snapshots built on the file, and the file itself if it is a delta snapshot, are
+    stored in full first.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file about to be modified.
+        keep_rows (bool): Whether a linked file needs the shared rows copied; False when
+            the caller replaces every row anyway. Defaults to True.
+
+    Returns:
+        Optional[StorageEngine]: Engine holding the file's own rows, or None if the file
+            does not exist.
+    """
+    _detach_snapshots(cursor, file_id)
+    resolved = _resolve(cursor, file_id)
+    if resolved is None:
+        return None
+    data_id, engine = resolved
+    if isinstance(engine, snapshots.SnapshotView):
+        _store_in_full(cursor, data_id, engine)
+        engine = engine.own
+
+    if data_id != file_id:
+        if keep_rows:
+            _copy_data(cursor, engine, data_id, file_id)
+        else:
+            _copy_columns(cursor, data_id, file_id)
+        cursor.execute('UPDATE files SET data_file_id = NULL WHERE id = ?', (file_id,))
+    else:
         cursor.execute(
-            'SELECT file_id, row_number, column_name, value FROM csv_data '
-            'WHERE value LIKE ?',
-            (f'%{query}%',),
+            'SELECT id FROM files WHERE data_file_id = ? ORDER BY id LIMIT 1', (file_id,)
         )
-        results = cursor.fetchall()
-        return results
-    except sqlite3.Error as e:
-        print(f'❌ Error searching CSV data: {e}')
-        return []
-    finally:
-        conn.close()
+        heir = cursor.fetchone()
+        if heir is not None:
+            _copy_data(cursor, engine, file_id, heir[0])
+            cursor.execute('UPDATE files SET data_file_id = NULL WHERE id = ?', (heir[0],))
+            cursor.execute(
+                'UPDATE files SET data_file_id = ? WHERE data_file_id = ?', (heir[0], file_id)
+            )
 
+    cursor.execute('UPDATE files SET content_hash = NULL WHERE id = ?', (file_id,))
+    return engine
 
-def update_csv_data(file_id: int, df: pd.DataFrame) -> None:
-    """Update modified CSV data in the database.
+
+def save_csv_to_database(
+    filename: str,
+    content: bytes,
+    file_size: int,
+    file_format: str,
+    user_id: int,
+    chunk_size: Optional[int] = None,
+    series: Optional[str] = None,
+    category: Optional[str] = None,
+    fetch_date: Optional[str] = None,
+    major: Optional[str] = None,
+    source: Optional[str] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Optional[IngestStats]:
+    """Save a CSV file and its data to the SQLite database.
+
+    The CSV is parsed in bounded chunks and each chunk is bulk-inserted, all inside a
+    single transaction, so memory use follows the chunk size rather than the file size.
+
+    Content is identified by its SHA-256 hash. Re-saving identical content under the same
+    filename is skipped, and identical content under a new filename is stored as a link
+    to the existing rows instead of a second copy.
 
     Args:
-        file_id (int): ID of the file to update.
-        df (pd.DataFrame): Updated DataFrame to store.
+        filename (str): Name of the CSV file.
+        content (bytes): Binary content of the CSV file.
+        file_size (int): Size of the file in bytes.
+        file_format (str): Format of the file (e.g., 'csv').
+        user_id (int): ID of the user uploading the file.
+        chunk_size (Optional[int]): Rows per chunk. Defaults to INGEST_CHUNK_SIZE.
+        series (Optional[str]): Snapshot series the file belongs to, if it is a
+            recurring dataset; see save_snapshot_to_database.
+        category (Optional[str]): Category of a scheduled dataset, e.g. 'jobs'; it
+            selects the retention policy of the file's partition.
+        fetch_date (Optional[str]): ISO date a scheduled dataset was fetched on, which
+            names the file's partition.
+        major (Optional[str]): Major a scheduled dataset was fetched for.
+        source (Optional[str]): Where the data came from; see catalog.SOURCES.
+        progress (Optional[Callable[[int], None]]): Called with the number of rows
+            written after each chunk. It may raise ingest_queue.IngestCancelled to
+            abandon the ingest, which is then rolled back.
+
+    Returns:
+        Optional[IngestStats]: Ingest statistics, or None if the file could not be saved.
 
     Raises:
         sqlite3.Error: If a database operation fails.
+        ingest_queue.IngestCancelled: If the progress callback cancelled the ingest.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    engine = get_engine()
+    process = psutil.Process()
+    peak_memory = process.memory_info().rss
+    started = time.perf_counter()
+    rows = 0
+    content_hash = hashlib.sha256(content).hexdigest()
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Reuse identical content that is already stored
+            cursor.execute(
+                'SELECT id, COALESCE(data_file_id, id), filename, deleted_at IS NULL, row_count '
+                'FROM files WHERE content_hash = ? ORDER BY id',
+                (content_hash,),
+            )
+            matches = cursor.fetchall()
+            for match_id, _, match_name, live, match_rows in matches:
+                if live and match_name == filename:
+                    print(f'✅ Skipped {filename}: identical to stored file {match_id}')
+                    return IngestStats(
+                        match_id, match_rows or 0, time.perf_counter() - started, peak_memory,
+                        deduplicated='skipped',
+                    )
+            if matches:
+                # The hash condition fails if the reclaimer claimed the rows meanwhile
+                data_id = matches[0][1]
+                cursor.execute(
+                    'INSERT INTO files (filename, file_size, file_format, user_id, storage_engine, '
+                    'row_count, content_hash, data_file_id, snapshot_series, category, fetch_date, '
+                    'major, source) '
+                    'SELECT ?, ?, ?, ?, storage_engine, row_count, ?, id, ?, ?, ?, ?, ? FROM files '
+                    'WHERE id = ? AND content_hash = ?',
+                    (
+                        filename, file_size, file_format, user_id, content_hash, series,
+                        category, fetch_date, major, source, data_id, content_hash,
+                    ),
+                )
+            if matches and cursor.rowcount == 1:
+                file_id = cursor.lastrowid
+                _bump_generation(cursor)
+                conn.commit()
+                stats = IngestStats(
+                    file_id, matches[0][4] or 0, time.perf_counter() - started, peak_memory,
+                    deduplicated='linked',
+                )
+                print(
+                    f'✅ Linked {filename} to identical file {data_id}: '
+                    f'{stats.rows} rows and {file_size:,} bytes not stored again'
+                )
+                return stats
 
-    try:
-        # Delete existing data for the file
-        cursor.execute('DELETE FROM csv_data WHERE file_id = ?', (file_id,))
+            # Insert metadata into files table
+            cursor.execute(
+                'INSERT INTO files (filename, file_size, file_format, user_id, storage_engine, '
+                'content_hash, snapshot_series, category, fetch_date, major, source) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    filename, file_size, file_format, user_id, engine.name, content_hash, series,
+                    category, fetch_date, major, source,
+                ),
+            )
+            file_id = cursor.lastrowid
+            indexed = search_index.index_exists(cursor)
+
+            # Parse and store the CSV content chunk by chunk
+            reader = pd.read_csv(io.BytesIO(content), chunksize=chunk_size or INGEST_CHUNK_SIZE)
+            inference = None
+            for chunk_idx, chunk in enumerate(reader):
+                chunk.replace('emptyvalue', 'N/A', inplace=True)
+                if chunk_idx == 0:
+                    engine.create(cursor, file_id, chunk)
+                    _write_columns(cursor, file_id, list(chunk.columns))
+                    inference = column_types.TypeInference(list(chunk.columns))
+                engine.append(cursor, file_id, chunk)
+                if indexed:
+                    search_index.index_rows(cursor, file_id, chunk)
+                inference.update(chunk)
+                rows += len(chunk)
+                peak_memory = max(peak_memory, process.memory_info().rss)
+                if progress is not None:
+                    progress(rows)
+            engine.finish(cursor, file_id)
+            if inference is not None:
+                _set_column_types(cursor, file_id, inference.result())
+            cursor.execute('UPDATE files SET row_count = ? WHERE id = ?', (rows, file_id))
+            _bump_generation(cursor)
+
+            conn.commit()
+        except (sqlite3.Error, pd.errors.ParserError) as e:
+            print(f'❌ Error saving CSV data for {filename}: {e}')
+            conn.rollback()
+            return None
+        except ingest_queue.IngestCancelled:
+            conn.rollback()
+            print(f'✅ Cancelled ingest of {filename} after {rows} rows')
+            raise
+
+    stats = IngestStats(file_id, rows, time.perf_counter() - started, peak_memory)
+    print(
+        f'✅ Stored {filename}: {stats.rows} rows in {stats.seconds:.2f}s '
+        f'({stats.rows_per_second:,.0f} rows/s, peak memory {stats.peak_memory_bytes / 2**20:.1f} MB)'
+    )
+    return stats
+
+
+def _snapshot_delta(
+    cursor: sqlite3.Cursor,
+    previous_id: int,
+    current: pd.DataFrame,
+    key_columns: Optional[List[str]],
+) -> Optional[snapshots.SnapshotDelta]:
+    """Compute the delta from a series' previous snapshot, if storing one pays off.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        previous_id (int): ID of the previous snapshot in the series.
+        current (pd.DataFrame): Rows of the new snapshot.
+        key_columns (Optional[List[str]]): Columns identifying a row across snapshots.
+
+    Returns:
+        Optional[snapshots.SnapshotDelta]: The delta, or None if the new snapshot should
+            be stored in full because its columns differ, the delta chain is at
+            SNAPSHOT_MAX_CHAIN or more than SNAPSHOT_MAX_CHURN of its rows changed.
+    """
+    resolved = _resolve(cursor, previous_id)
+    if resolved is None:
+        return None
+    data_id, engine = resolved
+    columns = _get_columns(cursor, data_id)
+    if columns != list(current.columns):
+        return None
+    if snapshots.chain_length(cursor, previous_id) >= snapshots.SNAPSHOT_MAX_CHAIN:
+        return None
+    delta = snapshots.compute_delta(engine.read(cursor, data_id, columns), current, key_columns)
+    if delta.size > snapshots.SNAPSHOT_MAX_CHURN * len(current):
+        return None
+    return delta
+
+
+def save_snapshot_to_database(
+    filename: str,
+    content: bytes,
+    file_size: int,
+    file_format: str,
+    user_id: int,
+    series: str,
+    key_columns: Optional[List[str]] = None,
+    category: Optional[str] = None,
+    fetch_date: Optional[str] = None,
+    major: Optional[str] = None,
+    source: Optional[str] = None,
+) -> Optional[IngestStats]:
+    """Save one day of a recurring dataset as a row delta of the previous day.
+
+    Only the rows added or changed since the latest snapshot of the same series are
+    written, together with the row numbers that disappeared; reads rebuild the full day.
+    The snapshot is stored in full instead when it is the first of its series, when its
+    content is already stored, or when _snapshot_delta finds a delta does not pay off.
+    A rebuilt day holds the same rows as the CSV, with unchanged rows in their previous
+    order and new rows at the end.
+
+    Args:
+        filename (str): Name of the CSV file.
+        content (bytes): Binary content of the CSV file.
+        file_size (int): Size of the file in bytes.
+        file_format (str): Format of the file (e.g., 'csv').
+        user_id (int): ID of the user storing the file.
+        series (str): Name of the recurring dataset, e.g. 'jobs_data_science'.
+        key_columns (Optional[List[str]]): Columns identifying a row from one day to the
+            next, so edited rows are stored as changed rather than removed and added.
+        category (Optional[str]): Category selecting the retention policy.
+        fetch_date (Optional[str]): ISO date naming the file's partition.
+        major (Optional[str]): Major the data was fetched for.
+        source (Optional[str]): Where the data came from; see catalog.SOURCES.
 
-        # Insert updated CSV data
-        for row_idx, row in df.iterrows():
-            for col_name, value in row.items():
+    Returns:
+        Optional[IngestStats]: Ingest statistics, or None if the file could not be saved.
+    """
+    process = psutil.Process()
+    peak_memory = process.memory_info().rss
+    started = time.perf_counter()
+    content_hash = hashlib.sha256(content).hexdigest()
+    delta = None
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute('SELECT 1 FROM files WHERE content_hash = ? LIMIT 1', (content_hash,))
+            duplicate = cursor.fetchone() is not None
+            cursor.execute(
+                'SELECT id FROM files WHERE snapshot_series = ? AND deleted_at IS NULL '
+                'ORDER BY id DESC LIMIT 1',
+                (series,),
+            )
+            previous = cursor.fetchone()
+            if previous is not None and not duplicate:
+                current = pd.read_csv(io.BytesIO(content))
+                current.replace('emptyvalue', 'N/A', inplace=True)
+                peak_memory = max(peak_memory, process.memory_info().rss)
+                delta = _snapshot_delta(cursor, previous[0], current, key_columns)
+
+            if delta is not None:
+                engine = get_engine()
                 cursor.execute(
-                    'INSERT INTO csv_data (file_id, row_number, column_name, value) '
-                    'VALUES (?, ?, ?, ?)',
-                    (file_id, row_idx, col_name, str(value)),
+                    'INSERT INTO files (filename, file_size, file_format, user_id, storage_engine, '
+                    'row_count, content_hash, snapshot_series, base_file_id, category, fetch_date, '
+                    'major, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        filename, file_size, file_format, user_id, engine.name, len(current),
+                        content_hash, series, previous[0], category, fetch_date, major, source,
+                    ),
                 )
+                file_id = cursor.lastrowid
+                engine.write(cursor, file_id, delta.rows)
+                snapshots.write_removed(cursor, file_id, delta.removed)
+                inference = column_types.TypeInference(list(current.columns))
+                inference.update(current)
+                _write_columns(cursor, file_id, list(current.columns), inference.result())
+                if search_index.index_exists(cursor):
+                    search_index.index_rows(cursor, file_id, delta.rows)
+                _bump_generation(cursor)
+                conn.commit()
+        except (sqlite3.Error, pd.errors.ParserError) as e:
+            print(f'❌ Error saving snapshot {filename}: {e}')
+            conn.rollback()
+            return None
+
+    if delta is None:
+        return save_csv_to_database(
+            filename, content, file_size, file_format, user_id,
+            series=series, category=category, fetch_date=fetch_date, major=major, source=source,
+        )
 
-        conn.commit()
-        print(f'✅ CSV file {file_id} updated successfully!')
-    except sqlite3.Error as e:
-        print(f'❌ Error updating CSV file {file_id}: {e}')
-        conn.rollback()
-    finally:
-        conn.close()
+    stats = IngestStats(
+        file_id, len(current), time.perf_counter() - started, peak_memory, snapshot_base=previous[0]
+    )
+    print(
+        f'✅ Stored {filename} as a delta of file {previous[0]}: '
+        f'{len(delta.rows) - delta.changed} added, {delta.changed} changed, '
+        f'{len(delta.removed)} removed of {stats.rows} rows in {stats.seconds:.2f}s'
+    )
+    return stats
 
 
-def reset_password(username: str, new_password: str) -> None:
-    """Update a user's password with SHA-256 hashing.
+def _bump_generation(cursor: sqlite3.Cursor, file_ids: Iterable[int] = ()) -> None:
+    """Record a write so results cached at earlier generations are no longer used.
 
     Args:
-        username (str): Username whose password is to be updated.
-        new_password (str): New password to set.
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_ids (Iterable[int]): Files whose rows or metadata changed.
+    """
+    cursor.execute('UPDATE datastore_generation SET generation = generation + 1')
+    cursor.executemany(
+        'UPDATE files SET version = version + 1 WHERE id = ?', [(file_id,) for file_id in file_ids]
+    )
 
-    Raises:
-        sqlite3.Error: If the update operation fails.
+
+def get_generation() -> int:
+    """Return the datastore generation, which every write to the datastore increments.
+
+    Returns:
+        int: The current generation.
     """
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        return conn.execute('SELECT generation FROM datastore_generation').fetchone()[0]
 
-    try:
-        hashed_password = hashlib.sha256(new_password.encode()).hexdigest()
-        cursor.execute(
-            'UPDATE users SET password = ? WHERE username = ?',
-            (hashed_password, username),
-        )
-        conn.commit()
-        print(f"✅ Password for '{username}' updated successfully!")
+
+def get_file_version(file_id: int) -> int:
+    """Return the version of a file, which every write to the file increments.
+
+    Args:
+        file_id (int): ID of the file.
+
+    Returns:
+        int: The current version, or -1 if the file does not exist.
+    """
+    with get_connection() as conn:
+        result = conn.execute('SELECT version FROM files WHERE id = ?', (file_id,)).fetchone()
+        return -1 if result is None else result[0]
+
+
+def get_files() -> List[Tuple[int, str, int, str, datetime]]:
+    """Retrieve metadata for all stored files from the database.
+
+    Returns:
+        List[Tuple[int, str, int, str, datetime]]: List of tuples containing file metadata
+            (id, filename, file_size, file_format, uploaded_at).
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT id, filename, file_size, file_format, uploaded_at '
+            'FROM files WHERE deleted_at IS NULL ORDER BY uploaded_at DESC'
+        )
+        return cursor.fetchall()
+
+
+def get_catalog(
+    category: Optional[str] = None,
+    major: Optional[str] = None,
+    fetch_date: Optional[str] = None,
+    source: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> List[Tuple[int, str, int, str, datetime, Optional[str], Optional[str], Optional[str], Optional[str]]]:
+    """Retrieve a page of stored files selected by their catalog metadata.
+
+    The filters run on indexed columns of ``files``, so selecting one day's datasets stays
+    fast however many daily files are stored. A major also matches files that apply to
+    every major, such as the LSU course listings.
+
+    Args:
+        category (Optional[str]): Category to match, e.g. 'jobs'; None for any.
+        major (Optional[str]): Major to match, e.g. 'data_science'; None for any.
+        fetch_date (Optional[str]): ISO fetch date to match; None for any.
+        source (Optional[str]): Source to match, e.g. 'linkedin'; None for any.
+        offset (int): Number of matching files to skip. Defaults to 0.
+        limit (Optional[int]): Maximum number of files to return; None for all.
+
+    Returns:
+        List[Tuple[int, str, int, str, datetime, Optional[str], Optional[str], Optional[str],
+            Optional[str]]]: (id, filename, file_size, file_format, uploaded_at, category,
+            major, fetch_date, source), newest fetch first.
+    """
+    where, params = catalog.build_query(category, major, fetch_date, source)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT id, filename, file_size, file_format, uploaded_at, category, major, fetch_date, '
+            f'source FROM files{where} ORDER BY fetch_date DESC, id DESC LIMIT ? OFFSET ?',
+            (*params, -1 if limit is None else limit, offset),
+        )
+        return cursor.fetchall()
+
+
+def count_catalog(
+    category: Optional[str] = None,
+    major: Optional[str] = None,
+    fetch_date: Optional[str] = None,
+    source: Optional[str] = None,
+) -> int:
+    """Count the stored files get_catalog would return without paging.
+
+    Args:
+        category (Optional[str]): Category to match; None for any.
+        major (Optional[str]): Major to match; None for any.
+        fetch_date (Optional[str]): ISO fetch date to match; None for any.
+        source (Optional[str]): Source to match; None for any.
+
+    Returns:
+        int: Number of matching files.
+    """
+    where, params = catalog.build_query(category, major, fetch_date, source)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT COUNT(*) FROM files{where}', params)
+        return cursor.fetchone()[0]
+
+
+def _load_column_meta(
+    cursor: sqlite3.Cursor, data_id: int, engine: StorageEngine
+) -> List[Tuple[str, str, Optional[str]]]:
+    """Return a file's column metadata, inferring types the file was stored without.
+
+    Files stored before column types were recorded are scanned once and their inferred
+    types are saved, so later reads skip the inference.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        data_id (int): ID the file's rows are stored under.
+        engine (StorageEngine): Engine holding the rows.
+
+    Returns:
+        List[Tuple[str, str, Optional[str]]]: (column_name, display_name, logical_type) in
+            column order.
+    """
+    meta = _get_column_meta(cursor, data_id)
+    if all(logical_type is not None for _, _, logical_type in meta):
+        return meta
+
+    names = [name for name, _, _ in meta]
+    logical_types = column_types.infer_types(engine.read(cursor, data_id, names))
+    try:
+        _set_column_types(cursor, data_id, logical_types)
+        cursor.connection.commit()
     except sqlite3.Error as e:
-        print(f'❌ Error updating password for {username}: {e}')
-        conn.rollback()
-    finally:
-        conn.close()
+        print(f'❌ Error recording column types for file {data_id}: {e}')
+        cursor.connection.rollback()
+    return [(name, display, t) for (name, display, _), t in zip(meta, logical_types)]
+
+
+def _format_frame(df: pd.DataFrame, meta: List[Tuple[str, str, Optional[str]]]) -> pd.DataFrame:
+    """Apply display column names and recorded logical types to stored rows.
+
+    Args:
+        df (pd.DataFrame): Rows as returned by a storage engine.
+        meta (List[Tuple[str, str, Optional[str]]]): Metadata of the returned columns, in
+            the same order, as (column_name, display_name, logical_type).
+
+    Returns:
+        pd.DataFrame: The same rows formatted for display.
+    """
+    df.columns = [display for _, display, _ in meta]
+    for col_idx, (_, _, logical_type) in enumerate(meta):
+        df.isetitem(col_idx, column_types.cast_column(df.iloc[:, col_idx], logical_type))
+    return df
+
+
+def get_csv_table(file_id: int) -> pa.Table:
+    """Retrieve a file's formatted rows as an Arrow table.
+
+    The decoded rows are kept in the shared on-disk Arrow cache, so other server
+    processes, and this one after a restart, map them instead of decoding them again;
+    the returned table is then backed by the mapped file rather than process memory.
+
+    Args:
+        file_id (int): ID of the file to read.
+
+    Returns:
+        pa.Table: Formatted rows with display column names, or an empty table if the
+            file does not exist.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        resolved = _resolve(cursor, file_id)
+        if resolved is None:
+            return pa.table({})
+        cursor.execute('SELECT version FROM files WHERE id = ?', (file_id,))
+        version = cursor.fetchone()[0]
+        table = arrow_cache.load(cursor, file_id, version)
+        if table is not None:
+            return table
+        data_id, engine = resolved
+        meta = _load_column_meta(cursor, data_id, engine)
+        df = engine.read(cursor, data_id, [name for name, _, _ in meta])
+        df = _format_frame(df.reset_index(drop=True), meta)
+        if arrow_cache.store(cursor, file_id, version, df):
+            table = arrow_cache.load(cursor, file_id, version)
+    return table if table is not None else pa.Table.from_pandas(df, preserve_index=False)
+
+
+def get_csv_preview(file_id: int) -> pd.DataFrame:
+    """Retrieve and format CSV data for preview in Streamlit.
+
+    Args:
+        file_id (int): ID of the file to preview.
+
+    Returns:
+        pd.DataFrame: Formatted DataFrame with CSV data, or empty if no data exists.
+    """
+    return get_csv_table(file_id).to_pandas()
+
+
+def get_row_count(file_id: int) -> int:
+    """Return the number of rows in a file without loading its data.
+
+    Args:
+        file_id (int): ID of the file.
+
+    Returns:
+        int: Number of rows, or 0 if the file does not exist.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT row_count FROM files WHERE id = ?', (file_id,))
+        result = cursor.fetchone()
+        if result is None:
+            return 0
+        if result[0] is None:
+            data_id, engine = _resolve(cursor, file_id)
+            return engine.count(cursor, data_id)
+        return result[0]
+
+
+def _column_positions(all_columns: List[str]) -> Dict[str, int]:
+    """Map stored and display column names to their stored positions.
+
+    Args:
+        all_columns (List[str]): Stored column names in order.
+
+    Returns:
+        Dict[str, int]: Position of every stored name and display name.
+    """
+    positions = {name: idx for idx, name in enumerate(all_columns)}
+    for idx, name in enumerate(all_columns):
+        positions.setdefault(column_types.display_name(name), idx)
+    return positions
+
+
+def _select_columns(all_columns: List[str], columns: Optional[List[str]]) -> Optional[List[int]]:
+    """Map requested column names to their stored positions.
+
+    Args:
+        all_columns (List[str]): Stored column names in order.
+        columns (Optional[List[str]]): Requested stored or display names; None for all.
+
+    Returns:
+        Optional[List[int]]: Positions of the requested columns, or None for all columns.
+
+    Raises:
+        KeyError: If a requested column does not exist.
+    """
+    if columns is None:
+        return None
+    positions = _column_positions(all_columns)
+    return [positions[name] for name in columns]
+
+
+def _build_filters(
+    meta: List[Tuple[str, str, Optional[str]]], filters: Optional[List[Tuple[str, str, Any]]]
+) -> Optional[List[RowFilter]]:
+    """Map (column, operator, value) conditions to engine row filters.
+
+    Args:
+        meta (List[Tuple[str, str, Optional[str]]]): Column metadata of the file.
+        filters (Optional[List[Tuple[str, str, Any]]]): Conditions on stored or display
+            column names; None for no conditions.
+
+    Returns:
+        Optional[List[RowFilter]]: The row filters, or None if there are no conditions.
+
+    Raises:
+        KeyError: If a filtered column does not exist.
+        ValueError: If an operator is not one of FILTER_OPS.
+    """
+    if not filters:
+        return None
+    positions = _column_positions([name for name, _, _ in meta])
+    row_filters = []
+    for column, op, value in filters:
+        if column not in positions:
+            raise KeyError(f'Unknown column: {column}')
+        if op not in FILTER_OPS:
+            raise ValueError(f'Unsupported filter operator: {op}')
+        position = positions[column]
+        row_filters.append(RowFilter(position, op, value, meta[position][2]))
+    return row_filters
+
+
+def get_column_types(file_id: int) -> List[Tuple[str, Optional[str]]]:
+    """Retrieve the display name and logical type of every column of a file.
+
+    Args:
+        file_id (int): ID of the file.
+
+    Returns:
+        List[Tuple[str, Optional[str]]]: (display name, logical type) pairs in column
+            order, or empty if the file does not exist.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        resolved = _resolve(cursor, file_id)
+        if resolved is None:
+            return []
+        meta = _load_column_meta(cursor, *resolved)
+    return [(display, logical_type) for _, display, logical_type in meta]
+
+
+def get_csv_rows(
+    file_id: int,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Tuple[str, str, Any]]] = None,
+) -> pd.DataFrame:
+    """Retrieve and format a window of rows from a file.
+
+    Only the requested columns are read, and the filters are applied by the storage
+    engine, so offset and limit count matching rows.
+
+    Args:
+        file_id (int): ID of the file to read.
+        offset (int): Number of rows to skip. Defaults to 0.
+        limit (Optional[int]): Maximum number of rows to return; None for all.
+        columns (Optional[List[str]]): Stored or display names of the columns to return;
+            None for all columns.
+        filters (Optional[List[Tuple[str, str, Any]]]): (column, operator, value)
+            conditions every returned row must meet, with operators from FILTER_OPS.
+
+    Returns:
+        pd.DataFrame: Formatted rows indexed by their stored row number, or empty if the
+            file does not exist.
+
+    Raises:
+        KeyError: If a requested or filtered column does not exist.
+        ValueError: If a filter operator is not supported.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        resolved = _resolve(cursor, file_id)
+        if resolved is None:
+            return pd.DataFrame()
+        data_id, engine = resolved
+        meta = _load_column_meta(cursor, data_id, engine)
+        all_columns = [name for name, _, _ in meta]
+        selected = _select_columns(all_columns, columns)
+        row_filters = _build_filters(meta, filters)
+        df = engine.read(cursor, data_id, all_columns, offset, limit, selected, row_filters)
+
+    return _format_frame(df, meta if selected is None else [meta[idx] for idx in selected])
+
+
+def iter_csv_rows(file_id: int, chunk_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Read a file's formatted rows one window at a time.
+
+    Args:
+        file_id (int): ID of the file to read.
+        chunk_size (Optional[int]): Rows per window. Defaults to INGEST_CHUNK_SIZE.
+
+    Yields:
+        pd.DataFrame: Consecutive windows of formatted rows indexed by their stored row
+            number; nothing if the file does not exist.
+    """
+    chunk_size = chunk_size or INGEST_CHUNK_SIZE
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        resolved = _resolve(cursor, file_id)
+        if resolved is None:
+            return
+        data_id, engine = resolved
+        meta = _load_column_meta(cursor, data_id, engine)
+        all_columns = [name for name, _, _ in meta]
+        for chunk in engine.iter_rows(cursor, data_id, all_columns, chunk_size):
+            yield _format_frame(chunk, meta)
+
+
+def export_csv_data(
+    file_id: int, export_format: str, compress: bool = False, chunk_size: Optional[int] = None
+) -> Optional[str]:
+    """Stream a file to a temporary export file without loading it whole.
+
+    Args:
+        file_id (int): ID of the file to export.
+        export_format (str): One of the exports.STREAM_FORMATS names.
+        compress (bool): Whether to gzip the export.
+        chunk_size (Optional[int]): Rows read and written at a time. Defaults to
+            INGEST_CHUNK_SIZE.
+
+    Returns:
+        Optional[str]: Path of the export file, which the caller removes when done, or
+            None if the file does not exist.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    columns = get_column_types(file_id)
+    if not columns:
+        return None
+    return exports.stream_export(iter_csv_rows(file_id, chunk_size), columns, export_format, compress)
+
+
+def aggregate_csv_data(
+    file_id: int,
+    group_by: Optional[List[str]] = None,
+    aggregations: Optional[List[Tuple[str, Optional[str]]]] = None,
+    filters: Optional[List[Tuple[str, str, Any]]] = None,
+) -> pd.DataFrame:
+    """Compute grouped aggregates of a file inside its storage engine.
+
+    Only the small result leaves the engine, e.g. the sum of open seats per department or
+    the number of postings per company. Missing values are ignored by every aggregate.
+
+    Args:
+        file_id (int): ID of the file to aggregate.
+        group_by (Optional[List[str]]): Stored or display names of the grouping columns;
+            None or empty for a single group over all rows.
+        aggregations (Optional[List[Tuple[str, Optional[str]]]]): (function, column) pairs
+            with functions from AGGREGATIONS; a None column counts rows. Defaults to
+            counting rows.
+        filters (Optional[List[Tuple[str, str, Any]]]): (column, operator, value)
+            conditions rows must meet to be included.
+
+    Returns:
+        pd.DataFrame: One row per group sorted by the grouping columns, named by their
+            display names, followed by one column per aggregate named like
+            'sum(Open Seats)', or 'count' for row counts. Empty if the file does not exist.
+
+    Raises:
+        KeyError: If a grouping, aggregated or filtered column does not exist.
+        ValueError: If a function or operator is not supported, or a sum or mean is
+            requested over a non-numeric column.
+    """
+    aggregations = aggregations or [('count', None)]
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        resolved = _resolve(cursor, file_id)
+        if resolved is None:
+            return pd.DataFrame()
+        data_id, engine = resolved
+        meta = _load_column_meta(cursor, data_id, engine)
+        all_columns = [name for name, _, _ in meta]
+        group_positions = _select_columns(all_columns, group_by or [])
+        positions = _column_positions(all_columns)
+        requested = []
+        for func, column in aggregations:
+            if func not in AGGREGATIONS:
+                raise ValueError(f'Unsupported aggregate function: {func}')
+            if column is None:
+                if func != 'count':
+                    raise ValueError(f'{func} needs a column')
+                requested.append(Aggregation(func))
+                continue
+            if column not in positions:
+                raise KeyError(f'Unknown column: {column}')
+            position = positions[column]
+            logical_type = meta[position][2]
+            if func in ('sum', 'mean') and logical_type not in (column_types.INT, column_types.FLOAT):
+                raise ValueError(f'Cannot compute {func} of non-numeric column {column}')
+            requested.append(Aggregation(func, position, logical_type))
+        row_filters = _build_filters(meta, filters)
+        df = engine.aggregate(cursor, data_id, all_columns, group_positions, requested, row_filters)
+
+    names = [meta[idx][1] for idx in group_positions]
+    for idx, position in enumerate(group_positions):
+        df[f'g{idx}'] = column_types.cast_column(df[f'g{idx}'], meta[position][2])
+    for idx, aggregation in enumerate(requested):
+        values = df[f'a{idx}']
+        if aggregation.func in ('count', 'nunique'):
+            values = values.fillna(0).astype('int64')
+        elif aggregation.func != 'mean':
+            values = column_types.cast_column(values, aggregation.logical_type)
+        df[f'a{idx}'] = values
+        if aggregation.position is None:
+            names.append('count')
+        else:
+            names.append(f'{aggregation.func}({meta[aggregation.position][1]})')
+    df.columns = names
+    if group_positions:
+        df = df.sort_values(names[:len(group_positions)], na_position='last', kind='stable')
+    return df.reset_index(drop=True)
+
+
+def delete_file(file_id: int) -> None:
+    """Delete a file and its associated CSV data from the database.
+
+    The file is hidden immediately and its stored rows are reclaimed in the background.
+    Rows still shared by linked files, or read by delta snapshots built on the file, are
+    kept until the last such file is deleted.
+
+    Args:
+        file_id (int): ID of the file to delete.
+
+    Raises:
+        sqlite3.Error: If the deletion operation fails.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            if not _hide_file(cursor, file_id):
+                return
+            _bump_generation(cursor, [file_id])
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f'❌ Error deleting file {file_id}: {e}')
+            conn.rollback()
+            return
+
+    _reclaimer.schedule()
+
+
+def _hide_file(cursor: sqlite3.Cursor, file_id: int) -> bool:
+    """Remove a file from view, leaving its stored rows for the reclaimer.
+
+    A linked file nothing builds on is removed outright, since it stores no rows.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file to hide.
+
+    Returns:
+        bool: False if the file does not exist.
+    """
+    resolved = _resolve(cursor, file_id)
+    if resolved is None:
+        return False
+    data_id, _ = resolved
+    cursor.execute('SELECT 1 FROM files WHERE base_file_id = ? LIMIT 1', (file_id,))
+    if data_id != file_id and cursor.fetchone() is None:
+        cursor.execute('DELETE FROM files WHERE id = ?', (file_id,))
+    else:
+        cursor.execute('UPDATE files SET deleted_at = CURRENT_TIMESTAMP WHERE id = ?', (file_id,))
+    return True
+
+
+def _drop_files(file_ids: List[int]) -> reclaim.ReclaimStats:
+    """Delete files and reclaim their storage before returning.
+
+    Delta snapshots built on a dropped file are stored in full first unless they are
+    dropped too, so files are handled newest first. Files whose rows are still shared
+    with linked files stay hidden until their last linked file is deleted.
+
+    Args:
+        file_ids (List[int]): IDs of the files to drop.
+
+    Returns:
+        reclaim.ReclaimStats: What the reclamation pass removed.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            dropped = set(file_ids)
+            for file_id in sorted(file_ids, reverse=True):
+                _detach_snapshots(cursor, file_id, dropped)
+                _hide_file(cursor, file_id)
+            _bump_generation(cursor, file_ids)
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f'❌ Error dropping {len(file_ids)} file(s): {e}')
+            conn.rollback()
+            return reclaim.ReclaimStats()
+    return _reclaimer.run_once()
+
+
+def get_partitions() -> List[Tuple[str, str, int, int, int]]:
+    """List the date partitions of scheduled datasets.
+
+    Returns:
+        List[Tuple[str, str, int, int, int]]: (category, fetch_date, files, rows,
+            file_size) per partition, newest first.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT category, fetch_date, COUNT(*), COALESCE(SUM(row_count), 0), SUM(file_size) '
+            'FROM files WHERE category IS NOT NULL AND fetch_date IS NOT NULL '
+            'AND deleted_at IS NULL GROUP BY category, fetch_date '
+            'ORDER BY fetch_date DESC, category'
+        )
+        return cursor.fetchall()
+
+
+def drop_partition(category: str, fetch_date: str) -> reclaim.ReclaimStats:
+    """Delete every file of one date partition and reclaim its storage at once.
+
+    Args:
+        category (str): Category of the partition, e.g. 'jobs'.
+        fetch_date (str): ISO fetch date of the partition.
+
+    Returns:
+        reclaim.ReclaimStats: What the reclamation pass removed.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT id FROM files WHERE category = ? AND fetch_date = ? AND deleted_at IS NULL',
+            (category, fetch_date),
+        )
+        file_ids = [row[0] for row in cursor.fetchall()]
+    return _drop_files(file_ids)
+
+
+def apply_retention(
+    policies: Optional[Dict[str, int]] = None, today: Optional[date] = None
+) -> List[Tuple[str, str]]:
+    """Drop every partition older than its category's retention period.
+
+    Args:
+        policies (Optional[Dict[str, int]]): Days to keep per category. Defaults to
+            retention.RETENTION_DAYS.
+        today (Optional[date]): Date to measure ages from. Defaults to the current date.
+
+    Returns:
+        List[Tuple[str, str]]: The (category, fetch_date) partitions dropped.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        partitions = retention.expired_partitions(cursor, policies, today)
+        file_ids = []
+        for category, fetch_date in partitions:
+            cursor.execute(
+                'SELECT id FROM files WHERE category = ? AND fetch_date = ? AND deleted_at IS NULL',
+                (category, fetch_date),
+            )
+            file_ids.extend(row[0] for row in cursor.fetchall())
+    if partitions:
+        stats = _drop_files(file_ids)
+        print(
+            f'✅ Dropped {len(partitions)} expired partition(s): {len(file_ids)} file(s), '
+            f'{stats.rows_deleted} rows and {stats.bytes_reclaimed / 2**20:.1f} MB reclaimed'
+        )
+    return partitions
+
+
+def reclaim_storage() -> reclaim.ReclaimStats:
+    """Purge deleted and orphaned datasets now and run incremental VACUUM.
+
+    delete_file schedules this in the background; call it directly to reclaim storage
+    synchronously, e.g. from maintenance scripts.
+
+    Returns:
+        reclaim.ReclaimStats: Files purged, rows removed and bytes returned to the
+            filesystem.
+    """
+    return _reclaimer.run_once()
+
+
+def wait_for_reclaim(timeout: Optional[float] = None) -> bool:
+    """Wait for scheduled background reclamation to finish.
+
+    Args:
+        timeout (Optional[float]): Maximum number of seconds to wait; None to wait
+            indefinitely.
+
+    Returns:
+        bool: True if no reclamation is running or pending afterwards.
+    """
+    return _reclaimer.wait(timeout)
+
+
+# Background worker storing uploads queued by submit_upload
+_ingest_queue = ingest_queue.IngestQueue(save_csv_to_database)
+
+
+def submit_upload(
+    filename: str,
+    content: bytes,
+    file_size: int,
+    file_format: str,
+    user_id: int,
+    idempotency_key: Optional[str] = None,
+    **kwargs: Any,
+) -> ingest_queue.IngestJob:
+    """Queue a CSV file to be saved by save_csv_to_database on the ingest worker.
+
+    Returns at once; poll get_ingest_job for progress. Submitting again under the key of
+    a queued, running or finished job returns that job instead of ingesting twice.
+
+    Args:
+        filename (str): Name of the CSV file.
+        content (bytes): Binary content of the CSV file.
+        file_size (int): Size of the file in bytes.
+        file_format (str): Format of the file (e.g., 'csv').
+        user_id (int): ID of the user uploading the file.
+        idempotency_key (Optional[str]): Key identifying the upload, e.g. the ID the
+            browser assigned to it. Defaults to a hash of the filename and content.
+        **kwargs (Any): Further keyword arguments for save_csv_to_database.
+
+    Returns:
+        ingest_queue.IngestJob: The job storing the file.
+    """
+    return _ingest_queue.submit(
+        filename, content, file_size, file_format, user_id, key=idempotency_key, **kwargs
+    )
+
+
+def get_ingest_job(job_id: str) -> Optional[ingest_queue.IngestJob]:
+    """Return a queued upload by job ID.
+
+    Args:
+        job_id (str): ID returned by submit_upload.
+
+    Returns:
+        Optional[ingest_queue.IngestJob]: The job, or None if it is unknown.
+    """
+    return _ingest_queue.get(job_id)
+
+
+def cancel_ingest(job_id: str) -> bool:
+    """Cancel a queued or running upload; rows it already wrote are rolled back.
+
+    Args:
+        job_id (str): ID returned by submit_upload.
+
+    Returns:
+        bool: False if the job is unknown or already finished.
+    """
+    return _ingest_queue.cancel(job_id)
+
+
+def wait_for_ingest(timeout: Optional[float] = None) -> bool:
+    """Wait for every queued upload to finish.
+
+    Args:
+        timeout (Optional[float]): Maximum number of seconds to wait; None to wait
+            indefinitely.
+
+    Returns:
+        bool: True if no upload is queued or running afterwards.
+    """
+    return _ingest_queue.wait(timeout)
+
+
+def _map_search_hits(
+    cursor: sqlite3.Cursor, results: List[Tuple[int, int, str, str]]
+) -> List[Tuple[int, int, str, str]]:
+    """Report search hits under the visible files whose rows contain them.
+
+    Hits are found under the ID rows are stored under. Rows of a shared file are
+    reported under the file itself, or under the first visible file linking to it once
+    it is hidden. A delta snapshot indexes only its own rows, so a hit in a snapshot is
+    also reported under every visible delta built on it, however far down the chain,
+    that neither removes nor replaces the row. Rows of deleted files that have not been
+    reclaimed yet are dropped.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        results (List[Tuple[int, int, str, str]]): Hits as (stored file_id, row_number,
+            column_name, value), best first.
+
+    Returns:
+        List[Tuple[int, int, str, str]]: Hits as (file_id, row_number, column_name,
+            value), each base hit followed by the deltas that share it.
+    """
+    cursor.execute(
+        'SELECT id, COALESCE(data_file_id, id), base_file_id, deleted_at IS NULL FROM files ORDER BY id'
+    )
+    files = cursor.fetchall()
+    data_ids = {file_id: data_id for file_id, data_id, _, _ in files}
+    shown: Dict[int, int] = {}
+    deltas: Dict[int, List[int]] = {}
+    for file_id, data_id, base_file_id, visible in files:
+        if visible and (file_id == data_id or data_id not in shown):
+            shown[data_id] = file_id
+        if file_id == data_id and base_file_id in data_ids:
+            deltas.setdefault(data_ids[base_file_id], []).append(file_id)
+
+    shadowed: Dict[int, Set[int]] = {}
+    mapped: List[Tuple[int, int, str, str]] = []
+    for data_id, row_number, column_name, value in results:
+        pending = [data_id]
+        while pending:
+            current = pending.pop()
+            if current != data_id:
+                if current not in shadowed:
+                    _, view = _resolve(cursor, current)
+                    shadowed[current] = (
+                        view.shadowed(cursor, current) if isinstance(view, snapshots.SnapshotView) else set()
+                    )
+                if row_number in shadowed[current]:
+                    continue
+            if current in shown:
+                mapped.append((shown[current], row_number, column_name, value))
+            pending.extend(reversed(deltas.get(current, [])))
+    return mapped
+
+
+def search_csv_data(query: str, limit: int = SEARCH_RESULT_LIMIT) -> List[Tuple[int, int, str, str]]:
+    """Search all CSV data for a given keyword.
+
+    Uses the full-text index when it exists, returning the best-ranked matches first.
+    Words match as prefixes and text in double quotes matches as an exact phrase.
+    Without FTS5 support every stored value is scanned with LIKE instead. Rows a delta
+    snapshot shares with its base are reported under both.
+
+    Args:
+        query (str): Keyword to search for in CSV values.
+        limit (int): Maximum number of results. Defaults to SEARCH_RESULT_LIMIT.
+
+    Returns:
+        List[Tuple[int, int, str, str]]: List of tuples containing search results
+            (file_id, row_number, column_name, value).
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        try:
+            if not search_index.index_exists(cursor):
+                results = []
+                for engine in ENGINES.values():
+                    results.extend(engine.search(cursor, query))
+                return _map_search_hits(cursor, results)[:limit]
+
+            # Hits in stored data nobody can see are dropped, so fetch pages until enough remain
+            found: List[Tuple[int, int, str, str]] = []
+            offset = 0
+            while len(found) < limit:
+                results = search_index.search(cursor, query, limit, offset)
+                found.extend(_map_search_hits(cursor, results))
+                if len(results) < limit:
+                    break
+                offset += limit
+            return found[:limit]
+        except sqlite3.Error as e:
+            print(f'❌ Error searching CSV data: {e}')
+            return []
+
+
+def update_csv_data(file_id: int, df: pd.DataFrame, chunk_size: Optional[int] = None) -> None:
+    """Update modified CSV data in the database.
+
+    Args:
+        file_id (int): ID of the file to update.
+        df (pd.DataFrame): Updated DataFrame to store.
+        chunk_size (Optional[int]): Rows per bulk insert. Defaults to INGEST_CHUNK_SIZE.
+
+    Raises:
+        sqlite3.Error: If a database operation fails.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        try:
+            engine = _claim_data(cursor, file_id, keep_rows=False)
+            if engine is None:
+                print(f'❌ Error updating CSV file {file_id}: file not found')
+                return
+
+            # Replace existing data for the file
+            indexed = search_index.index_exists(cursor)
+            engine.delete(cursor, file_id)
+            if indexed:
+                search_index.unindex_file(cursor, file_id)
+            inference = column_types.TypeInference(list(df.columns))
+            for chunk_idx, chunk in enumerate(_iter_chunks(df, chunk_size or INGEST_CHUNK_SIZE)):
+                if chunk_idx == 0:
+                    engine.create(cursor, file_id, chunk)
+                engine.append(cursor, file_id, chunk)
+                if indexed:
+                    search_index.index_rows(cursor, file_id, chunk)
+                inference.update(chunk)
+            engine.finish(cursor, file_id)
+            _write_columns(cursor, file_id, list(df.columns), inference.result())
+            cursor.execute('UPDATE files SET row_count = ? WHERE id = ?', (len(df), file_id))
+            _bump_generation(cursor, [file_id])
+
+            conn.commit()
+            print(f'✅ CSV file {file_id} updated successfully!')
+        except sqlite3.Error as e:
+            print(f'❌ Error updating CSV file {file_id}: {e}')
+            conn.rollback()
+
+
+def patch_csv_data(
+    file_id: int,
+    changed_cells: Optional[Dict[int, Dict[str, Any]]] = None,
+    inserted_rows: Optional[List[Dict[str, Any]]] = None,
+    deleted_rows: Optional[List[int]] = None,
+) -> None:
+    """Apply cell edits, new rows and row deletions to a file in one transaction.
+
+    Only the touched rows are written, so the cost follows the size of the edit rather
+    than the size of the dataset. Columns may be given by stored or display name.
+
+    Args:
+        file_id (int): ID of the file to patch.
+        changed_cells (Optional[Dict[int, Dict[str, Any]]]): New values keyed by stored row
+            number, then by column name.
+        inserted_rows (Optional[List[Dict[str, Any]]]): Rows to append as column-to-value
+            mappings; missing columns are left empty.
+        deleted_rows (Optional[List[int]]): Stored row numbers to remove.
+
+    Raises:
+        sqlite3.Error: If a database operation fails.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        try:
+            engine = _claim_data(cursor, file_id)
+            if engine is None:
+                print(f'❌ Error patching CSV file {file_id}: file not found')
+                return
+            all_columns = _get_columns(cursor, file_id)
+            positions = _column_positions(all_columns)
+            indexed = search_index.index_exists(cursor)
+            removed_rows = sorted({int(row) for row in deleted_rows or []})
+            removed = 0
+
+            if removed_rows:
+                removed = engine.delete_rows(cursor, file_id, removed_rows)
+                if indexed:
+                    search_index.unindex_rows(cursor, file_id, len(all_columns), removed_rows)
+
+            cells = [
+                (int(row), positions[col], all_columns[positions[col]], value)
+                for row, changes in (changed_cells or {}).items()
+                if int(row) not in removed_rows
+                for col, value in changes.items()
+            ]
+            if cells:
+                engine.update_cells(cursor, file_id, cells)
+                if indexed:
+                    search_index.reindex_cells(cursor, file_id, len(all_columns), cells)
+
+            if inserted_rows:
+                start = engine.max_row(cursor, file_id) + 1
+                new_rows = pd.DataFrame(
+                    [
+                        {all_columns[positions[col]]: value for col, value in row.items()}
+                        for row in inserted_rows
+                    ],
+                    columns=all_columns,
+                    index=range(start, start + len(inserted_rows)),
+                )
+                engine.append(cursor, file_id, new_rows)
+                if indexed:
+                    search_index.index_rows(cursor, file_id, new_rows)
+
+            written: Dict[int, List[Any]] = {}
+            for _, col_idx, _, value in cells:
+                written.setdefault(col_idx, []).append(value)
+            for col_idx in {positions[col] for row in inserted_rows or [] for col in row}:
+                written.setdefault(col_idx, []).extend(new_rows[all_columns[col_idx]])
+            _widen_column_types(cursor, file_id, written)
+
+            cursor.execute(
+                'UPDATE files SET row_count = row_count + ? WHERE id = ?',
+                (len(inserted_rows or []) - removed, file_id),
+            )
+            _bump_generation(cursor, [file_id])
+            conn.commit()
+            print(
+                f'✅ CSV file {file_id} patched: {len(cells)} cell(s) changed, '
+                f'{len(inserted_rows or [])} row(s) added, {removed} row(s) deleted'
+            )
+        except (sqlite3.Error, KeyError) as e:
+            print(f'❌ Error patching CSV file {file_id}: {e}')
+            conn.rollback()
+
+
+def migrate_storage_engine(engine_name: Optional[str] = None) -> int:
+    """Move existing datasets into another storage engine.
+
+    Each file is copied into the target engine and removed from its previous engine in
+    its own transaction, so an interrupted migration leaves every file readable.
+
+    Args:
+        engine_name (Optional[str]): Target engine name. Defaults to the engine selected by
+            the DATASTORE_ENGINE environment variable.
+
+    Returns:
+        int: Number of files migrated.
+
+    Raises:
+        ValueError: If the engine name is unknown.
+    """
+    target = get_engine(engine_name)
+    migrated = 0
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id FROM files WHERE COALESCE(storage_engine, 'eav') != ? "
+            'AND data_file_id IS NULL ORDER BY id',
+            (target.name,),
+        )
+        for (file_id,) in cursor.fetchall():
+            try:
+                source = _get_file_engine(cursor, file_id)
+                columns = _get_columns(cursor, file_id)
+                df = source.read(cursor, file_id, columns)
+                if not columns:
+                    _write_columns(cursor, file_id, list(df.columns))
+                target.write(cursor, file_id, df)
+                source.delete(cursor, file_id)
+                cursor.execute(
+                    'UPDATE files SET storage_engine = ? WHERE id = ? OR data_file_id = ?',
+                    (target.name, file_id, file_id),
+                )
+                _bump_generation(cursor, [file_id])
+                conn.commit()
+                migrated += 1
+            except sqlite3.Error as e:
+                print(f'❌ Error migrating file {file_id} to {target.name}: {e}')
+                conn.rollback()
+
+    print(f'✅ Migrated {migrated} file(s) to the {target.name} storage engine!')
+    return migrated
+
+
+def get_dedup_stats() -> Dict[str, int]:
+    """Report the storage saved by linking identical datasets instead of copying them.
+
+    Returns:
+        Dict[str, int]: Number of linked files ('linked_files') and the file bytes and
+            rows they avoided storing ('bytes_saved', 'rows_saved').
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT COUNT(*), COALESCE(SUM(file_size), 0), COALESCE(SUM(row_count), 0) '
+            'FROM files WHERE data_file_id IS NOT NULL'
+        )
+        linked_files, bytes_saved, rows_saved = cursor.fetchone()
+    return {'linked_files': linked_files, 'bytes_saved': bytes_saved, 'rows_saved': rows_saved}
+
+
+def reset_password(username: str, new_password: str) -> None:
+    """Update a user's password with SHA-256 hashing.
+
+    Args:
+        username (str): Username whose password is to be updated.
+        new_password (str): New password to set.
+
+    Raises:
+        sqlite3.Error: If the update operation fails.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        try:
+            hashed_password = hashlib.sha256(new_password.encode()).hexdigest()
+            cursor.execute(
+                'UPDATE users SET password = ? WHERE username = ?',
+                (hashed_password, username),
+            )
+            conn.commit()
+            print(f"✅ Password for '{username}' updated successfully!")
+        except sqlite3.Error as e:
+            print(f'❌ Error updating password for {username}: {e}')
+            conn.rollback()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,1120 @@
+"""Storage engine module for Team-34 project.
+
+Provides the storage engines used by the database module to persist dataset values
+for the LSU Datastore Dashboard. The EAV engine keeps the original one-row-per-cell
+layout in ``csv_data``; the columnar engine keeps each dataset as a typed table; the
+Parquet engine keeps each dataset as a memory-mapped Parquet file.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from . import column_types, connection
+
+
+# Directory holding Parquet datasets; defaults to '<database>.parquet' beside the SQLite file
+PARQUET_DIR: Optional[str] = os.getenv('DATASTORE_PARQUET_DIR')
+
+# Maximum number of rows per row group when a Parquet dataset is rewritten
+PARQUET_ROW_GROUP_SIZE: int = int(os.getenv('PARQUET_ROW_GROUP_SIZE', '10000'))
+
+# Age in seconds before a Parquet file without a files row counts as left behind
+PARQUET_ORPHAN_GRACE_SECONDS: int = int(os.getenv('PARQUET_ORPHAN_GRACE_SECONDS', '300'))
+
+# Comparison operators accepted in row filters
+FILTER_OPS: Tuple[str, ...] = ('==', '!=', '<', '<=', '>', '>=', 'contains')
+
+_SQL_OPS = {'==': '=', '!=': '!=', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+
+
+class RowFilter(NamedTuple):
+    """A condition on one column that an engine applies while reading.
+
+    Missing values never match. Numeric columns compare as numbers, date columns as
+    dates and other columns as text; 'contains' is a case-insensitive substring match.
+
+    Attributes:
+        position (int): Position of the column in the file.
+        op (str): One of FILTER_OPS.
+        value (object): Value to compare with.
+        logical_type (Optional[str]): Logical type of the column, if recorded.
+    """
+
+    position: int
+    op: str
+    value: object
+    logical_type: Optional[str] = None
+
+
+def _sql_condition(expr: str, row_filter: RowFilter) -> Tuple[str, List[object]]:
+    """Translate a row filter into an SQL condition on a column expression.
+
+    Args:
+        expr (str): SQL expression holding the column value.
+        row_filter (RowFilter): The filter to translate.
+
+    Returns:
+        Tuple[str, List[object]]: The condition and its parameters.
+    """
+    if row_filter.op == 'contains':
+        pattern = str(row_filter.value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"CAST({expr} AS TEXT) LIKE ? ESCAPE '\\'", [f'%{pattern}%']
+    op = _SQL_OPS[row_filter.op]
+    if row_filter.logical_type in (column_types.INT, column_types.FLOAT):
+        return (
+            f"({expr} NOT IN ('N/A', 'nan', '') AND CAST({expr} AS REAL) {op} ?)",
+            [float(row_filter.value)],
+        )
+    if row_filter.logical_type == column_types.DATE:
+        return f'datetime({expr}) {op} datetime(?)', [str(pd.Timestamp(row_filter.value))]
+    return f"(CAST({expr} AS TEXT) {op} ? AND {expr} NOT IN ('N/A', 'nan'))", [str(row_filter.value)]
+
+
+def _filter_mask(values: pd.Series, row_filter: RowFilter) -> pd.Series:
+    """Evaluate a row filter over a column of stored values.
+
+    Args:
+        values (pd.Series): Stored values of the filtered column.
+        row_filter (RowFilter): The filter to evaluate.
+
+    Returns:
+        pd.Series: True for the rows that match.
+    """
+    present = values.notna() & ~values.isin(['N/A', 'nan'])
+    if row_filter.op == 'contains':
+        return present & values.astype(str).str.contains(
+            str(row_filter.value), case=False, regex=False
+        )
+    if row_filter.logical_type in (column_types.INT, column_types.FLOAT):
+        typed, value = pd.to_numeric(values, errors='coerce'), float(row_filter.value)
+    elif row_filter.logical_type == column_types.DATE:
+        typed, value = column_types.cast_column(values, column_types.DATE), pd.Timestamp(row_filter.value)
+    else:
+        typed, value = values.astype(str), str(row_filter.value)
+    compare = {
+        '==': typed.eq, '!=': typed.ne, '<': typed.lt, '<=': typed.le, '>': typed.gt, '>=': typed.ge,
+    }[row_filter.op]
+    return present & typed.notna() & compare(value)
+
+
+# Aggregate functions accepted by StorageEngine.aggregate
+AGGREGATIONS: Tuple[str, ...] = ('count', 'sum', 'mean', 'min', 'max', 'nunique')
+
+_SQL_AGGREGATIONS = {'count': 'COUNT', 'sum': 'SUM', 'mean': 'AVG', 'min': 'MIN', 'max': 'MAX'}
+
+
+class Aggregation(NamedTuple):
+    """An aggregate computed over one column for every group of rows.
+
+    Missing values are ignored. Numeric columns aggregate as numbers and other columns
+    as text, which orders ISO dates correctly for min and max.
+
+    Attributes:
+        func (str): One of AGGREGATIONS.
+        position (Optional[int]): Position of the column; None counts rows.
+        logical_type (Optional[str]): Logical type of the column, if recorded.
+    """
+
+    func: str
+    position: Optional[int] = None
+    logical_type: Optional[str] = None
+
+
+def _sql_aggregate(expr: str, aggregation: Aggregation) -> str:
+    """Translate an aggregation into an SQL aggregate over a column expression.
+
+    Args:
+        expr (str): SQL expression holding the column value.
+        aggregation (Aggregation): The aggregation to translate.
+
+    Returns:
+        str: The aggregate expression.
+    """
+    if aggregation.position is None:
+        return 'COUNT(*)'
+    value = expr
+    if aggregation.logical_type in (column_types.INT, column_types.FLOAT) and aggregation.func != 'nunique':
+        value = f'CAST({expr} AS REAL)'
+    present = f"CASE WHEN {expr} NOT IN ('N/A', 'nan', '') THEN {value} END"
+    if aggregation.func == 'nunique':
+        return f'COUNT(DISTINCT {present})'
+    return f'{_SQL_AGGREGATIONS[aggregation.func]}({present})'
+
+
+def _aggregate_frame(
+    df: pd.DataFrame, group_by: List[str], aggregations: List[Aggregation], columns: List[str]
+) -> pd.DataFrame:
+    """Aggregate stored rows in memory, for engines without a query language.
+
+    Args:
+        df (pd.DataFrame): Stored rows holding at least the grouped and aggregated columns.
+        group_by (List[str]): Names of the grouping columns.
+        aggregations (List[Aggregation]): Aggregates to compute.
+        columns (List[str]): All column names in their original order.
+
+    Returns:
+        pd.DataFrame: One row per group, with the grouping columns followed by one column
+            per aggregate.
+    """
+    frame = pd.DataFrame({f'g{idx}': df[name] for idx, name in enumerate(group_by)}, index=df.index)
+    frame['_rows'] = 1
+    specs = {}
+    for idx, aggregation in enumerate(aggregations):
+        if aggregation.position is None:
+            specs[f'a{idx}'] = ('_rows', 'count')
+            continue
+        values = df[columns[aggregation.position]]
+        values = values.where(values.notna() & ~values.isin(['N/A', 'nan', '']))
+        if aggregation.logical_type in (column_types.INT, column_types.FLOAT) and aggregation.func != 'nunique':
+            values = pd.to_numeric(values, errors='coerce')
+        frame[f'v{idx}'] = values
+        func = aggregation.func
+        if func == 'sum':
+            specs[f'a{idx}'] = (f'v{idx}', lambda s: s.sum(min_count=1))
+        elif func in ('min', 'max') and values.dtype == object:
+            # Text cannot be compared with the NaN of missing values, so drop them first
+            specs[f'a{idx}'] = (f'v{idx}', lambda s, func=func: getattr(s.dropna(), func)())
+        else:
+            specs[f'a{idx}'] = (f'v{idx}', func)
+    keys = [f'g{idx}' for idx in range(len(group_by))]
+    if keys:
+        return frame.groupby(keys, dropna=False, sort=False).agg(**specs).reset_index()
+    # Without grouping columns all rows form one group, even when there are none
+    frame['_all'] = 0
+    result = frame.groupby('_all').agg(**specs).reset_index(drop=True)
+    if result.empty:
+        result = pd.DataFrame(
+            [[0 if a.func in ('count', 'nunique') else None for a in aggregations]], columns=list(specs)
+        )
+    return result
+
+
+class StorageEngine:
+    """Base class for dataset storage engines.
+
+    Engines operate on a cursor owned by the caller, so every engine call takes part
+    in the caller's transaction.
+    """
+
+    name: str = ''
+
+    def create(self, cursor: sqlite3.Cursor, file_id: int, df: pd.DataFrame) -> None:
+        """Prepare storage for a file before its first rows are appended.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file the rows belong to.
+            df (pd.DataFrame): First chunk of rows, used to derive the layout.
+        """
+
+    def append(self, cursor: sqlite3.Cursor, file_id: int, df: pd.DataFrame) -> None:
+        """Bulk-insert a chunk of rows for a file, keyed by the DataFrame index.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file the rows belong to.
+            df (pd.DataFrame): Rows to store, in column order.
+        """
+        raise NotImplementedError
+
+    def write(self, cursor: sqlite3.Cursor, file_id: int, df: pd.DataFrame) -> None:
+        """Store all rows of a DataFrame for a file in one call.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file the rows belong to.
+            df (pd.DataFrame): Rows to store, in column order.
+        """
+        self.create(cursor, file_id, df)
+        self.append(cursor, file_id, df)
+        self.finish(cursor, file_id)
+
+    def finish(self, cursor: sqlite3.Cursor, file_id: int) -> None:
+        """Complete a write started with create once every chunk has been appended.
+
+        Engines that buffer writes outside SQLite flush them here; the default does nothing.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file being written.
+        """
+
+    def read(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        select: Optional[List[int]] = None,
+        filters: Optional[List[RowFilter]] = None,
+    ) -> pd.DataFrame:
+        """Load a window of the stored rows of a file.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file to load.
+            columns (List[str]): All column names in their original order.
+            offset (int): Number of matching rows to skip, in row-number order.
+            limit (Optional[int]): Maximum number of rows to return; None for all.
+            select (Optional[List[int]]): Positions of the columns to return; None for all.
+            filters (Optional[List[RowFilter]]): Conditions every returned row must meet.
+
+        Returns:
+            pd.DataFrame: Stored rows indexed by row number, with the original column names.
+        """
+        raise NotImplementedError
+
+    def iter_rows(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        chunk_size: int,
+        select: Optional[List[int]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Read the stored rows of a file one window at a time, in row-number order.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file to load.
+            columns (List[str]): All column names in their original order.
+            chunk_size (int): Rows per window.
+            select (Optional[List[int]]): Positions of the columns to return; None for all.
+
+        Yields:
+            pd.DataFrame: Consecutive non-empty windows indexed by row number.
+        """
+        offset = 0
+        while True:
+            chunk = self.read(cursor, file_id, columns, offset, chunk_size, select)
+            if not len(chunk):
+                return
+            yield chunk
+            offset += len(chunk)
+
+    def aggregate(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        group_by: List[int],
+        aggregations: List[Aggregation],
+        filters: Optional[List[RowFilter]] = None,
+    ) -> pd.DataFrame:
+        """Compute aggregates over the stored rows of a file, grouped by some columns.
+
+        The default implementation reads only the grouped, aggregated and filtered
+        columns and aggregates them in memory.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file to aggregate.
+            columns (List[str]): All column names in their original order.
+            group_by (List[int]): Positions of the grouping columns; empty for one group.
+            aggregations (List[Aggregation]): Aggregates to compute.
+            filters (Optional[List[RowFilter]]): Conditions rows must meet to be included.
+
+        Returns:
+            pd.DataFrame: One unsorted row per group, with the stored values of the
+                grouping columns followed by one column per aggregate.
+        """
+        used = group_by + [a.position for a in aggregations if a.position is not None]
+        df = self.read(cursor, file_id, columns, select=list(dict.fromkeys(used)), filters=filters)
+        return _aggregate_frame(df, [columns[idx] for idx in group_by], aggregations, columns)
+
+    def count(self, cursor: sqlite3.Cursor, file_id: int) -> int:
+        """Count the stored rows of a file.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file.
+
+        Returns:
+            int: Number of rows.
+        """
+        raise NotImplementedError
+
+    def max_row(self, cursor: sqlite3.Cursor, file_id: int) -> int:
+        """Return the highest stored row number of a file.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file.
+
+        Returns:
+            int: The highest row number, or -1 if the file has no rows.
+        """
+        raise NotImplementedError
+
+    def update_cells(
+        self, cursor: sqlite3.Cursor, file_id: int, cells: List[Tuple[int, int, str, object]]
+    ) -> None:
+        """Overwrite individual cells of a file.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file.
+            cells (List[Tuple[int, int, str, object]]): Changes as
+                (row_number, column_index, column_name, value).
+        """
+        raise NotImplementedError
+
+    def delete_rows(self, cursor: sqlite3.Cursor, file_id: int, row_numbers: List[int]) -> int:
+        """Remove individual rows of a file.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file.
+            row_numbers (List[int]): Row numbers to remove.
+
+        Returns:
+            int: Number of rows that existed and were removed.
+        """
+        raise NotImplementedError
+
+    def search(self, cursor: sqlite3.Cursor, query: str) -> List[Tuple[int, int, str, str]]:
+        """Search the values stored by this engine for a keyword.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            query (str): Keyword to search for.
+
+        Returns:
+            List[Tuple[int, int, str, str]]: Matches as (file_id, row_number, column_name, value).
+        """
+        raise NotImplementedError
+
+    def delete(self, cursor: sqlite3.Cursor, file_id: int) -> None:
+        """Remove the stored rows of a file.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file to remove.
+        """
+        raise NotImplementedError
+
+    def delete_batch(self, cursor: sqlite3.Cursor, file_id: int, batch_size: int) -> int:
+        """Remove part of the stored rows of a file, for reclaiming deleted files.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the file to remove.
+            batch_size (int): Maximum number of stored rows to remove.
+
+        Returns:
+            int: Number of stored rows removed; 0 once none are left.
+        """
+        raise NotImplementedError
+
+    def stored_file_ids(self, cursor: sqlite3.Cursor) -> List[int]:
+        """List the file IDs this engine holds separate storage for.
+
+        Used to find storage left behind by deleted files. Engines whose rows share one
+        table return an empty list.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor on the datastore database.
+
+        Returns:
+            List[int]: IDs of files with a dataset table or file of their own.
+        """
+        return []
+
+
+class EAVEngine(StorageEngine):
+    """Store every cell as a (file_id, row_number, column_name, value) row in csv_data."""
+
+    name = 'eav'
+
+    def append(self, cursor: sqlite3.Cursor, file_id: int, df: pd.DataFrame) -> None:
+        row_numbers = [int(row_idx) for row_idx in df.index]
+        values = df.astype(str)
+        cursor.executemany(
+            'INSERT INTO csv_data (file_id, row_number, column_name, value) '
+            'VALUES (?, ?, ?, ?)',
+            (
+                (file_id, row_number, col_name, value)
+                for row_number, row in zip(row_numbers, values.itertuples(index=False, name=None))
+                for col_name, value in zip(df.columns, row)
+            ),
+        )
+
+    def read(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        select: Optional[List[int]] = None,
+        filters: Optional[List[RowFilter]] = None,
+    ) -> pd.DataFrame:
+        wanted = [columns[idx] for idx in select] if select is not None else columns
+        sql = 'SELECT row_number, column_name, value FROM csv_data WHERE file_id = ?'
+        params: List[object] = [file_id]
+        if offset or limit is not None or filters:
+            conditions, window_params = self._filter_rows(file_id, columns, filters)
+            sql += (
+                ' AND row_number IN (SELECT DISTINCT row_number FROM csv_data '
+                f'WHERE file_id = ?{conditions} ORDER BY row_number LIMIT ? OFFSET ?)'
+            )
+            params += [file_id, *window_params, -1 if limit is None else limit, offset]
+        if select is not None:
+            sql += f' AND column_name IN ({", ".join("?" * len(wanted))})'
+            params += wanted
+        cursor.execute(sql + ' ORDER BY row_number', params)
+        rows = cursor.fetchall()
+        df = pd.DataFrame(rows, columns=['row_number', 'column_name', 'value']).pivot(
+            index='row_number', columns='column_name', values='value'
+        )
+        df.index.name = None
+        df.columns.name = None
+        if wanted:
+            df = df.reindex(columns=wanted)
+        return df
+
+    @staticmethod
+    def _filter_rows(
+        file_id: int, columns: List[str], filters: Optional[List[RowFilter]]
+    ) -> Tuple[str, List[object]]:
+        # Each filter selects the matching row numbers through the (file_id, row_number) index
+        sql, params = '', []
+        for row_filter in filters or []:
+            condition, condition_params = _sql_condition('value', row_filter)
+            sql += (
+                ' AND row_number IN (SELECT row_number FROM csv_data '
+                f'WHERE file_id = ? AND column_name = ? AND {condition})'
+            )
+            params += [file_id, columns[row_filter.position], *condition_params]
+        return sql, params
+
+    def aggregate(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        group_by: List[int],
+        aggregations: List[Aggregation],
+        filters: Optional[List[RowFilter]] = None,
+    ) -> pd.DataFrame:
+        # Pivot only the used columns back into rows, then aggregate those rows
+        used = list(dict.fromkeys(group_by + [a.position for a in aggregations if a.position is not None]))
+        pivot = ', '.join(f'MAX(CASE WHEN column_name = ? THEN value END) AS c{idx}' for idx in used)
+        conditions, filter_params = self._filter_rows(file_id, columns, filters)
+        keys = ', '.join(f'c{idx}' for idx in group_by)
+        aggregates = ', '.join(_sql_aggregate(f'c{a.position}', a) for a in aggregations)
+        if used:
+            conditions += f' AND column_name IN ({", ".join("?" * len(used))})'
+            filter_params += [columns[idx] for idx in used]
+        sql = (
+            f'SELECT {keys + ", " if keys else ""}{aggregates} FROM ('
+            f'SELECT row_number{", " + pivot if pivot else ""} FROM csv_data '
+            f'WHERE file_id = ?{conditions} GROUP BY row_number)'
+        )
+        if keys:
+            sql += f' GROUP BY {keys}'
+        cursor.execute(sql, [*(columns[idx] for idx in used), file_id, *filter_params])
+        return pd.DataFrame(
+            cursor.fetchall(),
+            columns=[f'g{idx}' for idx in range(len(group_by))] + [f'a{idx}' for idx in range(len(aggregations))],
+        )
+
+    def count(self, cursor: sqlite3.Cursor, file_id: int) -> int:
+        cursor.execute(
+            'SELECT COUNT(DISTINCT row_number) FROM csv_data WHERE file_id = ?', (file_id,)
+        )
+        return cursor.fetchone()[0]
+
+    def max_row(self, cursor: sqlite3.Cursor, file_id: int) -> int:
+        cursor.execute('SELECT MAX(row_number) FROM csv_data WHERE file_id = ?', (file_id,))
+        result = cursor.fetchone()[0]
+        return -1 if result is None else result
+
+    def update_cells(
+        self, cursor: sqlite3.Cursor, file_id: int, cells: List[Tuple[int, int, str, object]]
+    ) -> None:
+        for row_number, _, col_name, value in cells:
+            text = 'nan' if value is None else str(value)
+            cursor.execute(
+                'UPDATE csv_data SET value = ? '
+                'WHERE file_id = ? AND row_number = ? AND column_name = ?',
+                (text, file_id, row_number, col_name),
+            )
+            if cursor.rowcount == 0:
+                cursor.execute(
+                    'INSERT INTO csv_data (file_id, row_number, column_name, value) '
+                    'VALUES (?, ?, ?, ?)',
+                    (file_id, row_number, col_name, text),
+                )
+
+    def delete_rows(self, cursor: sqlite3.Cursor, file_id: int, row_numbers: List[int]) -> int:
+        removed = 0
+        for row_number in row_numbers:
+            cursor.execute(
+                'DELETE FROM csv_data WHERE file_id = ? AND row_number = ?', (file_id, row_number)
+            )
+            removed += cursor.rowcount > 0
+        return removed
+
+    def search(self, cursor: sqlite3.Cursor, query: str) -> List[Tuple[int, int, str, str]]:
+        cursor.execute(
+            'SELECT file_id, row_number, column_name, value FROM csv_data '
+            'WHERE value LIKE ?',
+            (f'%{query}%',),
+        )
+        return cursor.fetchall()
+
+    def delete(self, cursor: sqlite3.Cursor, file_id: int) -> None:
+        cursor.execute('DELETE FROM csv_data WHERE file_id = ?', (file_id,))
+
+    def delete_batch(self, cursor: sqlite3.Cursor, file_id: int, batch_size: int) -> int:
+        cursor.execute(
+            'DELETE FROM csv_data WHERE id IN '
+            '(SELECT id FROM csv_data WHERE file_id = ? LIMIT ?)',
+            (file_id, batch_size),
+        )
+        return cursor.rowcount
+
+
+class ColumnarEngine(StorageEngine):
+    """Store every dataset as its own table with one SQLite column per CSV column.
+
+    Table columns are named positionally (``c0``, ``c1``, ...) so arbitrary CSV headers
+    never need quoting; the original names live in ``csv_columns``. Columns are declared
+    TEXT, since the first chunk cannot tell whether a column stays numeric (a later
+    ``'007'`` must not become 7); the logical types in ``csv_columns`` type them on read.
+    """
+
+    name = 'columnar'
+
+    @staticmethod
+    def table_name(file_id: int) -> str:
+        """Return the name of the table holding a file's rows."""
+        return f'dataset_{int(file_id)}'
+
+    @staticmethod
+    def _to_sql_value(value: object) -> object:
+        if value is None or isinstance(value, (int, float, str, bytes)):
+            return value
+        if isinstance(value, pd.Timestamp):
+            return value.isoformat()
+        if hasattr(value, 'item'):
+            return value.item()
+        return str(value)
+
+    def _rows(self, df: pd.DataFrame) -> Iterator[tuple]:
+        values = df.astype(object).where(df.notna(), None)
+        return (
+            (int(row_idx), *[self._to_sql_value(v) for v in row])
+            for row_idx, row in zip(df.index, values.itertuples(index=False, name=None))
+        )
+
+    def create(self, cursor: sqlite3.Cursor, file_id: int, df: pd.DataFrame) -> None:
+        table = self.table_name(file_id)
+        column_defs = ', '.join(f'c{idx} TEXT' for idx in range(len(df.columns)))
+        cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        cursor.execute(
+            f'CREATE TABLE {table} (row_number INTEGER PRIMARY KEY'
+            f'{", " + column_defs if column_defs else ""})'
+        )
+
+    def append(self, cursor: sqlite3.Cursor, file_id: int, df: pd.DataFrame) -> None:
+        placeholders = ', '.join('?' * (len(df.columns) + 1))
+        cursor.executemany(
+            f'INSERT INTO {self.table_name(file_id)} VALUES ({placeholders})', self._rows(df)
+        )
+
+    def read(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        select: Optional[List[int]] = None,
+        filters: Optional[List[RowFilter]] = None,
+    ) -> pd.DataFrame:
+        positions = select if select is not None else list(range(len(columns)))
+        selected = ''.join(f', c{idx}' for idx in positions)
+        where, params = self._where(filters)
+        cursor.execute(
+            f'SELECT row_number{selected} FROM {self.table_name(file_id)}{where} '
+            'ORDER BY row_number LIMIT ? OFFSET ?',
+            (*params, -1 if limit is None else limit, offset),
+        )
+        rows = cursor.fetchall()
+        return pd.DataFrame(
+            [row[1:] for row in rows],
+            index=[row[0] for row in rows],
+            columns=[columns[idx] for idx in positions],
+        )
+
+    @staticmethod
+    def _where(filters: Optional[List[RowFilter]]) -> Tuple[str, List[object]]:
+        conditions, params = [], []
+        for row_filter in filters or []:
+            condition, condition_params = _sql_condition(f'c{int(row_filter.position)}', row_filter)
+            conditions.append(condition)
+            params += condition_params
+        return (f' WHERE {" AND ".join(conditions)}' if conditions else ''), params
+
+    def aggregate(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        group_by: List[int],
+        aggregations: List[Aggregation],
+        filters: Optional[List[RowFilter]] = None,
+    ) -> pd.DataFrame:
+        keys = ', '.join(f'c{int(idx)}' for idx in group_by)
+        aggregates = ', '.join(
+            _sql_aggregate(f'c{aggregation.position}', aggregation) for aggregation in aggregations
+        )
+        where, params = self._where(filters)
+        sql = f'SELECT {keys + ", " if keys else ""}{aggregates} FROM {self.table_name(file_id)}{where}'
+        if keys:
+            sql += f' GROUP BY {keys}'
+        cursor.execute(sql, params)
+        return pd.DataFrame(
+            cursor.fetchall(),
+            columns=[f'g{idx}' for idx in range(len(group_by))] + [f'a{idx}' for idx in range(len(aggregations))],
+        )
+
+    def count(self, cursor: sqlite3.Cursor, file_id: int) -> int:
+        cursor.execute(f'SELECT COUNT(*) FROM {self.table_name(file_id)}')
+        return cursor.fetchone()[0]
+
+    def max_row(self, cursor: sqlite3.Cursor, file_id: int) -> int:
+        cursor.execute(f'SELECT MAX(row_number) FROM {self.table_name(file_id)}')
+        result = cursor.fetchone()[0]
+        return -1 if result is None else result
+
+    def update_cells(
+        self, cursor: sqlite3.Cursor, file_id: int, cells: List[Tuple[int, int, str, object]]
+    ) -> None:
+        table = self.table_name(file_id)
+        for row_number, column_index, _, value in cells:
+            cursor.execute(
+                f'UPDATE {table} SET c{int(column_index)} = ? WHERE row_number = ?',
+                (self._to_sql_value(value), row_number),
+            )
+
+    def delete_rows(self, cursor: sqlite3.Cursor, file_id: int, row_numbers: List[int]) -> int:
+        cursor.executemany(
+            f'DELETE FROM {self.table_name(file_id)} WHERE row_number = ?',
+            [(row_number,) for row_number in row_numbers],
+        )
+        return cursor.rowcount
+
+    def search(self, cursor: sqlite3.Cursor, query: str) -> List[Tuple[int, int, str, str]]:
+        cursor.execute(
+            'SELECT f.id, c.column_index, c.column_name FROM files f '
+            'JOIN csv_columns c ON c.file_id = f.id '
+            'WHERE f.storage_engine = ? ORDER BY f.id, c.column_index',
+            (self.name,),
+        )
+        columns_by_file: Dict[int, List[Tuple[int, str]]] = {}
+        for file_id, column_index, column_name in cursor.fetchall():
+            columns_by_file.setdefault(file_id, []).append((column_index, column_name))
+
+        results: List[Tuple[int, int, str, str]] = []
+        for file_id, file_columns in columns_by_file.items():
+            table = self.table_name(file_id)
+            for column_index, column_name in file_columns:
+                cursor.execute(
+                    f'SELECT row_number, CAST(c{column_index} AS TEXT) FROM {table} '
+                    f'WHERE CAST(c{column_index} AS TEXT) LIKE ?',
+                    (f'%{query}%',),
+                )
+                results.extend(
+                    (file_id, row_number, column_name, value)
+                    for row_number, value in cursor.fetchall()
+                )
+        return results
+
+    def delete(self, cursor: sqlite3.Cursor, file_id: int) -> None:
+        cursor.execute(f'DROP TABLE IF EXISTS {self.table_name(file_id)}')
+
+    def delete_batch(self, cursor: sqlite3.Cursor, file_id: int, batch_size: int) -> int:
+        # Dropping the table frees its pages at once, however many rows it holds
+        table = self.table_name(file_id)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        if cursor.fetchone() is None:
+            return 0
+        cursor.execute(f'SELECT COUNT(*) FROM {table}')
+        removed = cursor.fetchone()[0]
+        cursor.execute(f'DROP TABLE {table}')
+        return removed
+
+    def stored_file_ids(self, cursor: sqlite3.Cursor) -> List[int]:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'dataset_[0-9]*'"
+        )
+        return [int(name[len('dataset_'):]) for (name,) in cursor.fetchall()]
+
+
+class ParquetEngine(StorageEngine):
+    """Store every dataset as one Parquet file and read it through memory-mapping.
+
+    Files live in DATASTORE_PARQUET_DIR, or next to the SQLite database in a
+    ``<database>.parquet`` directory. Values are kept as strings in positional columns
+    (``c0``, ``c1``, ...) beside a ``row_number`` column, and the logical types recorded
+    in ``csv_columns`` turn them back into typed columns on read. Each ingest chunk
+    becomes one row group, so windowed reads only touch the row groups they need.
+
+    Parquet files cannot be changed in place: ingests, cell edits, row deletions and
+    appends after ingest write a new file under a temporary name. Like deletions, the new
+    file is staged on the caller's transaction. Reads in that transaction see the staged
+    state, and the file is renamed into place, or removed, only once the transaction
+    commits; a rollback discards it.
+    """
+
+    name = 'parquet'
+
+    def __init__(self) -> None:
+        # Open ingest writers and the temporary file each one writes, by dataset path
+        self._writers: Dict[str, Tuple[pq.ParquetWriter, str]] = {}
+        self._writers_lock = threading.Lock()
+        # Per connection, the staged file of each dataset path, or None for a deletion
+        self._staged: Dict[sqlite3.Connection, Dict[str, Optional[str]]] = {}
+
+    @staticmethod
+    def directory(cursor: sqlite3.Cursor) -> str:
+        """Return the directory holding the Parquet files of a database."""
+        if PARQUET_DIR:
+            return PARQUET_DIR
+        database = next(
+            path for _, name, path in cursor.connection.execute('PRAGMA database_list')
+            if name == 'main'
+        )
+        return f'{database}.parquet' if database else os.path.abspath('datastore.parquet')
+
+    def path(self, cursor: sqlite3.Cursor, file_id: int) -> str:
+        """Return the path of the Parquet file holding a file's committed rows."""
+        return os.path.join(self.directory(cursor), f'{int(file_id)}.parquet')
+
+    def _location(self, cursor: sqlite3.Cursor, file_id: int) -> Optional[str]:
+        """Return the file holding a file's rows as the caller's transaction sees them."""
+        path = self.path(cursor, file_id)
+        with self._writers_lock:
+            staged = self._staged.get(cursor.connection, {})
+            if path in staged:
+                return staged[path]
+        return path if os.path.exists(path) else None
+
+    @staticmethod
+    def _temp_path(path: str) -> str:
+        return f'{path}.{uuid.uuid4().hex}.tmp'
+
+    def _stage(self, cursor: sqlite3.Cursor, path: str, staged: Optional[str]) -> None:
+        """Make a staged file, or None for a deletion, replace path when the transaction commits."""
+        conn = cursor.connection
+        with self._writers_lock:
+            pending = self._staged.get(conn)
+            first = pending is None
+            if first:
+                pending = self._staged[conn] = {}
+            superseded = pending.get(path)
+            pending[path] = staged
+        if superseded is not None and superseded != staged:
+            _remove_file(superseded)
+        if first and not connection.defer(conn, lambda: self._apply(conn), lambda: self._discard(conn)):
+            self._apply(conn)
+
+    def _apply(self, conn: sqlite3.Connection) -> None:
+        with self._writers_lock:
+            pending = self._staged.pop(conn, {})
+        for path, staged in pending.items():
+            if staged is None:
+                _remove_file(path)
+            else:
+                os.replace(staged, path)
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._writers_lock:
+            pending = self._staged.pop(conn, {})
+            writers = [self._writers.pop(path) for path in pending if path in self._writers]
+        for writer, _ in writers:
+            writer.close()
+        for staged in pending.values():
+            if staged is not None:
+                _remove_file(staged)
+
+    @staticmethod
+    def _schema(column_count: int) -> pa.Schema:
+        return pa.schema(
+            [('row_number', pa.int64())] + [(f'c{idx}', pa.string()) for idx in range(column_count)]
+        )
+
+    def _to_table(self, df: pd.DataFrame) -> pa.Table:
+        arrays = [pa.array(df.index.to_numpy(dtype='int64'))]
+        for idx in range(len(df.columns)):
+            values = df.iloc[:, idx]
+            arrays.append(
+                pa.array(values.astype(str).where(values.notna(), None), type=pa.string())
+            )
+        return pa.Table.from_arrays(arrays, schema=self._schema(len(df.columns)))
+
+    def _load(self, cursor: sqlite3.Cursor, file_id: int) -> Optional[pa.Table]:
+        location = self._location(cursor, file_id)
+        if location is None:
+            return None
+        return pq.read_table(location, memory_map=True)
+
+    def _replace(self, cursor: sqlite3.Cursor, file_id: int, table: pa.Table) -> None:
+        path = self.path(cursor, file_id)
+        temp_path = self._temp_path(path)
+        pq.write_table(table, temp_path, row_group_size=PARQUET_ROW_GROUP_SIZE)
+        self._stage(cursor, path, temp_path)
+
+    def create(self, cursor: sqlite3.Cursor, file_id: int, df: pd.DataFrame) -> None:
+        path = self.path(cursor, file_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = self._temp_path(path)
+        with self._writers_lock:
+            stale = self._writers.pop(path, None)
+            self._writers[path] = (
+                pq.ParquetWriter(temp_path, self._schema(len(df.columns))), temp_path
+            )
+        if stale is not None:
+            stale[0].close()
+            _remove_file(stale[1])
+        if isinstance(cursor.connection, connection.DatastoreConnection):
+            # Staged now so a rollback before finish also removes the partial file
+            self._stage(cursor, path, temp_path)
+
+    def append(self, cursor: sqlite3.Cursor, file_id: int, df: pd.DataFrame) -> None:
+        path = self.path(cursor, file_id)
+        with self._writers_lock:
+            writer = self._writers.get(path)
+        if writer is not None:
+            writer[0].write_table(self._to_table(df))
+            return
+        existing = self._load(cursor, file_id)
+        table = self._to_table(df)
+        if existing is not None:
+            table = pa.concat_tables([existing, table]).sort_by('row_number')
+        self._replace(cursor, file_id, table)
+
+    def finish(self, cursor: sqlite3.Cursor, file_id: int) -> None:
+        path = self.path(cursor, file_id)
+        with self._writers_lock:
+            writer = self._writers.pop(path, None)
+        if writer is not None:
+            writer[0].close()
+            self._stage(cursor, path, writer[1])
+
+    def read(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        select: Optional[List[int]] = None,
+        filters: Optional[List[RowFilter]] = None,
+    ) -> pd.DataFrame:
+        positions = select if select is not None else list(range(len(columns)))
+        names = [columns[idx] for idx in positions]
+        path = self._location(cursor, file_id)
+        if path is None:
+            return pd.DataFrame(columns=names)
+        if filters:
+            return self._read_filtered(path, names, positions, offset, limit, filters)
+
+        # Only decode the row groups that overlap the requested window
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        end = None if limit is None else offset + limit
+        groups: List[int] = []
+        first_row = start = 0
+        for group in range(parquet_file.metadata.num_row_groups):
+            group_rows = parquet_file.metadata.row_group(group).num_rows
+            if start + group_rows > offset and (end is None or start < end):
+                if not groups:
+                    first_row = start
+                groups.append(group)
+            start += group_rows
+        if not groups:
+            return pd.DataFrame(columns=names)
+
+        table = parquet_file.read_row_groups(
+            groups, columns=['row_number'] + [f'c{idx}' for idx in positions]
+        ).slice(offset - first_row, limit)
+        df = table.drop_columns(['row_number']).to_pandas()
+        df.columns = names
+        df.index = table.column('row_number').to_numpy()
+        return df
+
+    @staticmethod
+    def _read_filtered(
+        path: str,
+        names: List[str],
+        positions: List[int],
+        offset: int,
+        limit: Optional[int],
+        filters: List[RowFilter],
+    ) -> pd.DataFrame:
+        # Decode only the filtered columns to find the matching rows, then the selected ones
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        filtered = sorted({row_filter.position for row_filter in filters})
+        table = parquet_file.read(columns=['row_number'] + [f'c{idx}' for idx in filtered])
+        values = table.to_pandas()
+        mask = pd.Series(True, index=values.index)
+        for row_filter in filters:
+            mask &= _filter_mask(values[f'c{row_filter.position}'], row_filter)
+        matches = values.index[mask.to_numpy()][offset:]
+        if limit is not None:
+            matches = matches[:limit]
+        table = parquet_file.read(columns=['row_number'] + [f'c{idx}' for idx in positions])
+        table = table.take(pa.array(matches, type=pa.int64()))
+        df = table.drop_columns(['row_number']).to_pandas()
+        df.columns = names
+        df.index = table.column('row_number').to_numpy()
+        return df
+
+    def count(self, cursor: sqlite3.Cursor, file_id: int) -> int:
+        path = self._location(cursor, file_id)
+        if path is None:
+            return 0
+        return pq.ParquetFile(path, memory_map=True).metadata.num_rows
+
+    def max_row(self, cursor: sqlite3.Cursor, file_id: int) -> int:
+        path = self._location(cursor, file_id)
+        if path is None:
+            return -1
+        result = pc.max(pq.read_table(path, columns=['row_number'], memory_map=True)['row_number'])
+        return -1 if result.as_py() is None else result.as_py()
+
+    def update_cells(
+        self, cursor: sqlite3.Cursor, file_id: int, cells: List[Tuple[int, int, str, object]]
+    ) -> None:
+        table = self._load(cursor, file_id)
+        if table is None:
+            return
+        df = table.to_pandas()
+        positions = {row_number: pos for pos, row_number in enumerate(df['row_number'])}
+        for row_number, column_index, _, value in cells:
+            if row_number in positions:
+                df.iat[positions[row_number], int(column_index) + 1] = (
+                    None if pd.isna(value) else str(value)
+                )
+        self._replace(
+            cursor, file_id, pa.Table.from_pandas(df, schema=table.schema, preserve_index=False)
+        )
+
+    def delete_rows(self, cursor: sqlite3.Cursor, file_id: int, row_numbers: List[int]) -> int:
+        table = self._load(cursor, file_id)
+        if table is None:
+            return 0
+        keep = pc.invert(pc.is_in(table['row_number'], value_set=pa.array(row_numbers, pa.int64())))
+        kept = table.filter(keep)
+        self._replace(cursor, file_id, kept)
+        return table.num_rows - kept.num_rows
+
+    def search(self, cursor: sqlite3.Cursor, query: str) -> List[Tuple[int, int, str, str]]:
+        cursor.execute(
+            'SELECT f.id, c.column_index, c.column_name FROM files f '
+            'JOIN csv_columns c ON c.file_id = f.id '
+            'WHERE f.storage_engine = ? ORDER BY f.id, c.column_index',
+            (self.name,),
+        )
+        columns_by_file: Dict[int, List[Tuple[int, str]]] = {}
+        for file_id, column_index, column_name in cursor.fetchall():
+            columns_by_file.setdefault(file_id, []).append((column_index, column_name))
+
+        results: List[Tuple[int, int, str, str]] = []
+        for file_id, file_columns in columns_by_file.items():
+            table = self._load(cursor, file_id)
+            if table is None:
+                continue
+            for column_index, column_name in file_columns:
+                matches = table.filter(
+                    pc.match_substring(table[f'c{column_index}'], query, ignore_case=True)
+                )
+                results.extend(
+                    (file_id, row_number, column_name, value)
+                    for row_number, value in zip(
+                        matches['row_number'].to_pylist(), matches[f'c{column_index}'].to_pylist()
+                    )
+                )
+        return results
+
+    def delete(self, cursor: sqlite3.Cursor, file_id: int) -> None:
+        path = self.path(cursor, file_id)
+        with self._writers_lock:
+            writer = self._writers.pop(path, None)
+        if writer is not None:
+            writer[0].close()
+        self._stage(cursor, path, None)
+
+    def delete_batch(self, cursor: sqlite3.Cursor, file_id: int, batch_size: int) -> int:
+        removed = self.count(cursor, file_id)
+        self.delete(cursor, file_id)
+        return removed
+
+    def stored_file_ids(self, cursor: sqlite3.Cursor) -> List[int]:
+        directory = self.directory(cursor)
+        if not os.path.isdir(directory):
+            return []
+        # Recent files may belong to an ingest whose transaction has not committed yet
+        cutoff = time.time() - PARQUET_ORPHAN_GRACE_SECONDS
+        file_ids = []
+        for name in os.listdir(directory):
+            if not (name.endswith('.parquet') and name[:-len('.parquet')].isdigit()):
+                continue
+            try:
+                modified = os.path.getmtime(os.path.join(directory, name))
+            except FileNotFoundError:
+                # Deleted by a transaction that committed while listing
+                continue
+            if modified < cutoff:
+                file_ids.append(int(name[:-len('.parquet')]))
+        return file_ids
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# Registered storage engines by name
+ENGINES: Dict[str, StorageEngine] = {
+    EAVEngine.name: EAVEngine(),
+    ColumnarEngine.name: ColumnarEngine(),
+    ParquetEngine.name: ParquetEngine(),
+}
+
+# Engine used for newly stored datasets; existing datasets keep the engine they were written with
+DEFAULT_ENGINE: str = os.getenv('DATASTORE_ENGINE', ColumnarEngine.name)
+
+
+def get_engine(name: str = None) -> StorageEngine:
+    """Return a storage engine by name.
+
+    Args:
+        name (str, optional): Engine name ('eav', 'columnar' or 'parquet'). Defaults to the engine
+            selected by the DATASTORE_ENGINE environment variable.
+
+    Returns:
+        StorageEngine: The requested engine.
+
+    Raises:
+        ValueError: If the engine name is unknown.
+    """
+    engine_name = (name or DEFAULT_ENGINE).lower()
+    if engine_name not in ENGINES:
+        raise ValueError(f"Unknown storage engine '{engine_name}'. Choose from: {', '.join(ENGINES)}")
+    return ENGINES[engine_name]
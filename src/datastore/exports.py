@@ -0,0 +1,306 @@
+"""Exports module for Team-34 project.
+
+Serializes datasets of the LSU Datastore Dashboard into the download formats the pages
+offer. Exports are built from the shared read-only dataset handle, so Parquet files are
+written straight from the Arrow table without converting it to pandas first.
+
+Large datasets are streamed instead: stream_export writes CSV, JSON Lines or Parquet to
+a temporary file one chunk of rows at a time, optionally gzip-compressed, so memory use
+follows the chunk size rather than the size of the dataset.
+"""
+
+import gzip
+import io
+import os
+import tempfile
+import zipfile
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import column_types
+from .cache import DatasetHandle
+
+# Directory for streamed export files; defaults to the system temporary directory
+EXPORT_DIR: Optional[str] = os.getenv('DATASTORE_EXPORT_DIR')
+
+# Email attachments whose zipped CSV is larger are sent as Parquet when that is smaller
+EMAIL_PARQUET_THRESHOLD: int = int(os.getenv('EMAIL_PARQUET_THRESHOLD', str(2**20)))
+
+
+class ExportFormat(NamedTuple):
+    """A download format.
+
+    Attributes:
+        label (str): Name shown on buttons, e.g. 'CSV'.
+        extension (str): File extension without the dot.
+        mime (str): MIME type of the file.
+        write (Callable[[DatasetHandle], bytes]): Serializes a dataset.
+    """
+
+    label: str
+    extension: str
+    mime: str
+    write: Callable[[DatasetHandle], bytes]
+
+
+def _write_csv(handle: DatasetHandle) -> bytes:
+    return handle.frame.to_csv(index=False).encode('utf-8')
+
+
+def _write_json(handle: DatasetHandle) -> bytes:
+    return handle.frame.to_json(orient='records', indent=2, date_format='iso').encode('utf-8')
+
+
+def _write_parquet(handle: DatasetHandle) -> bytes:
+    buffer = io.BytesIO()
+    pq.write_table(handle.table, buffer)
+    return buffer.getvalue()
+
+
+def _write_excel(handle: DatasetHandle) -> bytes:
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+        handle.frame.to_excel(writer, index=False)
+    return buffer.getvalue()
+
+
+# Download formats by name
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    'csv': ExportFormat('CSV', 'csv', 'text/csv', _write_csv),
+    'json': ExportFormat('JSON', 'json', 'application/json', _write_json),
+    'parquet': ExportFormat('Parquet', 'parquet', 'application/octet-stream', _write_parquet),
+    'excel': ExportFormat(
+        'Excel', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', _write_excel
+    ),
+}
+
+
+def export_dataset(handle: DatasetHandle, export_format: str) -> bytes:
+    """Serialize a dataset in a download format.
+
+    Args:
+        handle (DatasetHandle): The dataset to export.
+        export_format (str): One of the EXPORT_FORMATS names.
+
+    Returns:
+        bytes: Content of the exported file.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'. Choose from: {', '.join(EXPORT_FORMATS)}")
+    return EXPORT_FORMATS[export_format].write(handle)
+
+
+class StreamFormat(NamedTuple):
+    """A format that can be written chunk by chunk.
+
+    Attributes:
+        label (str): Name shown on buttons, e.g. 'JSON Lines'.
+        extension (str): File extension without the dot.
+        mime (str): MIME type of the uncompressed file.
+        write (Callable[..., int]): Writes chunks of rows to a path, given the chunks,
+            the (display name, logical type) pairs of the columns, the path and whether
+            to compress; returns the number of rows written.
+    """
+
+    label: str
+    extension: str
+    mime: str
+    write: Callable[[Iterable[pd.DataFrame], List[Tuple[str, Optional[str]]], str, bool], int]
+
+
+def _open_text(path: str, compress: bool):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def _stream_csv(
+    chunks: Iterable[pd.DataFrame], columns: List[Tuple[str, Optional[str]]], path: str, compress: bool
+) -> int:
+    rows = 0
+    with _open_text(path, compress) as out:
+        for chunk in chunks:
+            chunk.to_csv(out, index=False, header=rows == 0)
+            rows += len(chunk)
+        if rows == 0:
+            out.write(','.join(name for name, _ in columns) + '\n')
+    return rows
+
+
+def _stream_jsonl(
+    chunks: Iterable[pd.DataFrame], columns: List[Tuple[str, Optional[str]]], path: str, compress: bool
+) -> int:
+    rows = 0
+    with _open_text(path, compress) as out:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            lines = chunk.to_json(orient='records', lines=True, date_format='iso')
+            out.write(lines if lines.endswith('\n') else lines + '\n')
+            rows += len(chunk)
+    return rows
+
+
+# Arrow types of the logical column types; text and categories are written as strings
+_ARROW_TYPES: Dict[Optional[str], pa.DataType] = {
+    column_types.INT: pa.int64(),
+    column_types.FLOAT: pa.float64(),
+    column_types.DATE: pa.timestamp('ns'),
+}
+
+
+def _stream_parquet(
+    chunks: Iterable[pd.DataFrame], columns: List[Tuple[str, Optional[str]]], path: str, compress: bool
+) -> int:
+    # Chunks of one column may differ in dtype, e.g. an int column with missing values
+    # in one chunk only, so every chunk is cast to a schema taken from the logical types
+    schema = pa.schema(
+        [(name, _ARROW_TYPES.get(logical_type, pa.string())) for name, logical_type in columns]
+    )
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression='gzip' if compress else 'snappy') as writer:
+        for chunk in chunks:
+            arrays = []
+            for idx, field in enumerate(schema):
+                values = chunk.iloc[:, idx]
+                if pa.types.is_string(field.type):
+                    values = values.astype('string')
+                arrays.append(pa.array(values, type=field.type, from_pandas=True))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+# Formats that can be streamed, by name
+STREAM_FORMATS: Dict[str, StreamFormat] = {
+    'csv': StreamFormat('CSV', 'csv', 'text/csv', _stream_csv),
+    'jsonl': StreamFormat('JSON Lines', 'jsonl', 'application/x-ndjson', _stream_jsonl),
+    'parquet': StreamFormat('Parquet', 'parquet', 'application/octet-stream', _stream_parquet),
+}
+
+
+def stream_file_name(name: str, export_format: str, compress: bool = False) -> str:
+    """Return the file name a streamed export is downloaded under.
+
+    Parquet compresses its pages internally, so only text formats get a '.gz' suffix.
+
+    Args:
+        name (str): Name of the dataset.
+        export_format (str): One of the STREAM_FORMATS names.
+        compress (bool): Whether the export is gzip-compressed.
+
+    Returns:
+        str: The file name, e.g. 'jobs.csv.gz'.
+    """
+    extension = STREAM_FORMATS[export_format].extension
+    suffix = '.gz' if compress and export_format != 'parquet' else ''
+    return f'{name}.{extension}{suffix}'
+
+
+def stream_export(
+    chunks: Iterable[pd.DataFrame],
+    columns: List[Tuple[str, Optional[str]]],
+    export_format: str,
+    compress: bool = False,
+) -> str:
+    """Write chunks of rows to a temporary export file.
+
+    The caller owns the file and removes it once it has been served.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Formatted rows, one chunk at a time, with the
+            columns in the order of ``columns``.
+        columns (List[Tuple[str, Optional[str]]]): (display name, logical type) of every
+            column.
+        export_format (str): One of the STREAM_FORMATS names.
+        compress (bool): Gzip the file; Parquet uses its gzip page codec instead.
+
+    Returns:
+        str: Path of the written file.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if export_format not in STREAM_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'. Choose from: {', '.join(STREAM_FORMATS)}")
+    fd, path = tempfile.mkstemp(
+        suffix='-' + stream_file_name('export', export_format, compress), dir=EXPORT_DIR
+    )
+    os.close(fd)
+    try:
+        STREAM_FORMATS[export_format].write(chunks, columns, path, compress)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+class EmailAttachment(NamedTuple):
+    """A compressed dataset file to attach to an email.
+
+    Attributes:
+        filename (str): Name of the attached file.
+        mime (str): MIME type of the file.
+        content (bytes): Content of the file.
+    """
+
+    filename: str
+    mime: str
+    content: bytes
+
+
+def _zip_csv(df: pd.DataFrame, name: str) -> EmailAttachment:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f'{name}.csv', df.to_csv(index=False))
+    return EmailAttachment(f'{name}.zip', 'application/zip', buffer.getvalue())
+
+
+def _compress(df: pd.DataFrame, name: str) -> EmailAttachment:
+    zipped = _zip_csv(df, name)
+    if len(zipped.content) <= EMAIL_PARQUET_THRESHOLD:
+        return zipped
+    buffer = io.BytesIO()
+    try:
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer, compression='zstd')
+    except (ValueError, pa.ArrowException):
+        # Columns mixing types cannot be stored in Parquet; keep the zipped CSV
+        return zipped
+    if buffer.tell() >= len(zipped.content):
+        return zipped
+    return EmailAttachment(f'{name}.parquet', 'application/octet-stream', buffer.getvalue())
+
+
+def email_attachments(df: pd.DataFrame, filename: str, max_bytes: int) -> List[EmailAttachment]:
+    """Compress a dataset for emailing, split by rows into parts of at most max_bytes.
+
+    A single part is named after the dataset; several are named
+    '<name>.part<i>of<n>'. A part holding one row may still exceed max_bytes.
+
+    Args:
+        df (pd.DataFrame): Formatted rows of the dataset.
+        filename (str): Name of the dataset file.
+        max_bytes (int): Largest size of one attachment before encoding.
+
+    Returns:
+        List[EmailAttachment]: The attachments, in row order.
+    """
+    name = os.path.splitext(os.path.basename(filename))[0] or 'dataset'
+    parts = 1
+    while True:
+        bounds = [len(df) * idx // parts for idx in range(parts + 1)]
+        attachments = [
+            _compress(df.iloc[start:end], name if parts == 1 else f'{name}.part{idx + 1}of{parts}')
+            for idx, (start, end) in enumerate(zip(bounds, bounds[1:]))
+        ]
+        largest = max(len(attachment.content) for attachment in attachments)
+        if largest <= max_bytes or parts >= len(df):
+            return attachments
+        # Compression varies between parts, so aim a little below the limit
+        parts = min(len(df), max(parts + 1, int(parts * largest * 1.2 / max_bytes) + 1))
@@ -0,0 +1,243 @@
+"""Ingest queue module for Team-34 project.
+
+Runs dataset uploads for the LSU Datastore Dashboard on a background worker thread, so
+the Streamlit session that submitted an upload returns at once. Each upload becomes a job
+with an ID, progress in rows with an estimated time remaining, and a cancel switch. Jobs
+are identified by an idempotency key, so a rerun that submits the same upload again gets
+the existing job instead of a second ingest.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+# Number of finished jobs remembered for status queries and idempotency
+INGEST_JOB_HISTORY: int = int(os.getenv('INGEST_JOB_HISTORY', '100'))
+
+# Job states
+QUEUED: str = 'queued'
+RUNNING: str = 'running'
+DONE: str = 'done'
+FAILED: str = 'failed'
+CANCELLED: str = 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class IngestCancelled(Exception):
+    """Raised from an ingest's progress callback to abandon the ingest."""
+
+
+def idempotency_key(filename: str, content: bytes) -> str:
+    """Derive the default idempotency key of an upload from its name and content.
+
+    Args:
+        filename (str): Name of the uploaded file.
+        content (bytes): Binary content of the file.
+
+    Returns:
+        str: A key that is equal for equal uploads.
+    """
+    return hashlib.sha256(filename.encode() + b'\0' + content).hexdigest()
+
+
+@dataclass
+class IngestJob:
+    """State of one queued upload.
+
+    Attributes:
+        job_id (str): Unique ID of the job.
+        key (str): Idempotency key the job was submitted under.
+        filename (str): Name of the uploaded file.
+        total_rows (int): Estimated number of rows, from the line count of the content.
+        status (str): One of QUEUED, RUNNING, DONE, FAILED or CANCELLED.
+        rows_ingested (int): Rows written so far.
+        started_at (Optional[float]): time.monotonic() when the ingest started.
+        finished_at (Optional[float]): time.monotonic() when the job finished.
+        result (Any): Value returned by the ingest once DONE.
+        error (Optional[str]): Why the job FAILED.
+    """
+
+    job_id: str
+    key: str
+    filename: str
+    total_rows: int
+    status: str = QUEUED
+    rows_ingested: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    _args: tuple = field(default=(), repr=False)
+    _kwargs: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        """Return whether the job has stopped running for good."""
+        return self.status in FINISHED_STATES
+
+    @property
+    def progress(self) -> float:
+        """Return the completed share of the job between 0 and 1."""
+        if self.status == DONE:
+            return 1.0
+        if self.total_rows <= 0:
+            return 0.0
+        return min(self.rows_ingested / self.total_rows, 1.0)
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Return the estimated seconds until the job is done, or None if unknown."""
+        if self.status != RUNNING or self.started_at is None or self.rows_ingested <= 0:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        remaining = max(self.total_rows - self.rows_ingested, 0)
+        return elapsed / self.rows_ingested * remaining
+
+
+class IngestQueue:
+    """Run queued ingests one at a time on a background thread.
+
+    SQLite allows a single writer, so ingests run in submission order. The thread starts
+    when a job is submitted and exits once the queue is empty.
+
+    Args:
+        ingest (Callable[..., Any]): Function storing one upload. It is called with the
+            submitted arguments and a ``progress`` keyword callback taking the number of
+            rows written so far; the callback raises IngestCancelled when the job is
+            cancelled.
+    """
+
+    def __init__(self, ingest: Callable[..., Any]) -> None:
+        self._ingest = ingest
+        self._lock = threading.Lock()
+        self._pending: Deque[IngestJob] = deque()
+        self._jobs: 'OrderedDict[str, IngestJob]' = OrderedDict()
+        self._keys: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self, filename: str, content: bytes, *args: Any, key: Optional[str] = None, **kwargs: Any
+    ) -> IngestJob:
+        """Queue an upload unless a job was already submitted under its idempotency key.
+
+        The existing job is returned whatever its state, so a cancelled or failed upload
+        is not restarted by a repeated submission; retry it under a new key.
+
+        Args:
+            filename (str): Name of the uploaded file.
+            content (bytes): Binary content of the file.
+            *args (Any): Further positional arguments for the ingest function.
+            key (Optional[str]): Idempotency key. Defaults to idempotency_key(filename,
+                content).
+            **kwargs (Any): Further keyword arguments for the ingest function.
+
+        Returns:
+            IngestJob: The new job, or the existing job for the key.
+        """
+        key = key or idempotency_key(filename, content)
+        with self._lock:
+            existing = self._jobs.get(self._keys.get(key, ''))
+            if existing is not None:
+                return existing
+            job = IngestJob(
+                uuid.uuid4().hex, key, filename, max(content.count(b'\n') - 1, 0),
+                _args=(filename, content, *args), _kwargs=kwargs,
+            )
+            self._jobs[job.job_id] = job
+            self._keys[key] = job.job_id
+            self._pending.append(job)
+            self._forget_old()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name='datastore-ingest', daemon=True)
+                self._thread.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        """Return a job by ID, or None if it is unknown or long finished."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Ask a queued or running job to stop; its partial ingest is rolled back.
+
+        Args:
+            job_id (str): ID of the job.
+
+        Returns:
+            bool: False if the job is unknown or already finished.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job._cancel.set()
+            if job.status == QUEUED:
+                self._pending.remove(job)
+                self._finish(job, CANCELLED)
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued job has finished.
+
+        Args:
+            timeout (Optional[float]): Maximum number of seconds to wait; None to wait
+                indefinitely.
+
+        Returns:
+            bool: True if no job is queued or running afterwards.
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _forget_old(self) -> None:
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[:max(len(finished) - INGEST_JOB_HISTORY, 0)]:
+            del self._jobs[job.job_id]
+            if self._keys.get(job.key) == job.job_id:
+                del self._keys[job.key]
+
+    @staticmethod
+    def _finish(job: IngestJob, status: str) -> None:
+        job.status = status
+        job.finished_at = time.monotonic()
+        job._args, job._kwargs = (), {}
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                job = self._pending.popleft()
+                job.status = RUNNING
+                job.started_at = time.monotonic()
+
+            def progress(rows: int, job: IngestJob = job) -> None:
+                job.rows_ingested = rows
+                if job._cancel.is_set():
+                    raise IngestCancelled(job.job_id)
+
+            try:
+                result = self._ingest(*job._args, progress=progress, **job._kwargs)
+            except IngestCancelled:
+                status = CANCELLED
+            except Exception as e:
+                job.error = str(e)
+                status = FAILED
+            else:
+                job.result = result
+                status = DONE if result is not None else FAILED
+                if result is None:
+                    job.error = 'The dataset could not be saved.'
+            with self._lock:
+                self._finish(job, status)
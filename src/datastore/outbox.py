@@ -0,0 +1,299 @@
+"""Outbox module for Team-34 project.
+
+Queues dataset emails of the LSU Datastore Dashboard in the ``email_outbox`` table and
+sends them from a background thread, so a Streamlit session that shares a dataset
+returns at once and can poll the message's status. The sender reuses pooled HTTPS
+connections, bounds every request with timeouts and retries transient failures with
+exponential backoff and full jitter. Messages are claimed with a conditional update, so
+several server processes can share one outbox without sending a message twice.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, ContextManager, Dict, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Mail endpoint the outbox posts to
+OUTBOX_URL: str = os.getenv('SENDGRID_URL', 'https://api.sendgrid.com/v3/mail/send')
+
+# Seconds to wait for a connection and for a response
+OUTBOX_CONNECT_TIMEOUT: float = float(os.getenv('OUTBOX_CONNECT_TIMEOUT', '5'))
+OUTBOX_READ_TIMEOUT: float = float(os.getenv('OUTBOX_READ_TIMEOUT', '30'))
+
+# Attempts per message before it is marked failed
+OUTBOX_MAX_ATTEMPTS: int = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '5'))
+
+# Backoff before the first retry and the longest backoff, in seconds
+OUTBOX_BACKOFF_BASE: float = float(os.getenv('OUTBOX_BACKOFF_BASE', '2'))
+OUTBOX_BACKOFF_MAX: float = float(os.getenv('OUTBOX_BACKOFF_MAX', '300'))
+
+# Seconds after which a message claimed by a sender that never finished is retried
+OUTBOX_CLAIM_TIMEOUT: float = float(os.getenv('OUTBOX_CLAIM_TIMEOUT', '300'))
+
+# Message states
+QUEUED: str = 'queued'
+SENDING: str = 'sending'
+SENT: str = 'sent'
+FAILED: str = 'failed'
+
+
+class OutboxMessage(NamedTuple):
+    """Delivery state of a queued email.
+
+    Attributes:
+        id (int): ID of the message.
+        recipient (str): Address the message is sent to.
+        status (str): One of QUEUED, SENDING, SENT or FAILED.
+        attempts (int): Send attempts made so far.
+        last_error (Optional[str]): Why the last attempt failed.
+        next_attempt_at (float): Unix time of the next attempt while QUEUED.
+    """
+
+    id: int
+    recipient: str
+    status: str
+    attempts: int
+    last_error: Optional[str]
+    next_attempt_at: float
+
+
+def create_table(cursor: sqlite3.Cursor) -> None:
+    """Create the table of queued emails.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recipient TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            claimed_at REAL,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+    """)
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at)'
+    )
+
+
+def backoff_delay(attempt: int, rng: random.Random = random) -> float:
+    """Return the seconds to wait before retrying after a failed attempt.
+
+    The cap doubles with every attempt up to OUTBOX_BACKOFF_MAX and the delay is drawn
+    uniformly below it, which spreads out retries of messages that failed together.
+
+    Args:
+        attempt (int): Number of attempts made so far, from 1.
+        rng (random.Random): Source of the jitter.
+
+    Returns:
+        float: Delay in seconds.
+    """
+    cap = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * 2 ** (attempt - 1))
+    return rng.uniform(0, cap)
+
+
+class Outbox:
+    """Send queued emails on a background thread.
+
+    The thread starts when a message is queued or sending is resumed, sleeps until the
+    next retry is due and exits once no message is waiting.
+
+    Args:
+        connect (Callable[[], ContextManager[sqlite3.Connection]]): Factory returning a
+            context manager that yields a connection to the datastore database.
+        api_key (Callable[[], str]): Returns the mail API key when a message is sent, so
+            the key is never stored in the outbox.
+        url (Optional[str]): Mail endpoint. Defaults to OUTBOX_URL.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], ContextManager[sqlite3.Connection]],
+        api_key: Callable[[], str],
+        url: Optional[str] = None,
+    ) -> None:
+        self._connect = connect
+        self._api_key = api_key
+        self.url = url or OUTBOX_URL
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_maxsize=4))
+        self._session.mount('http://', HTTPAdapter(pool_maxsize=4))
+        self._requested = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, recipient: str, payload: Dict[str, Any]) -> int:
+        """Queue an email and wake the sender.
+
+        Args:
+            recipient (str): Address the message is sent to, shown in its status.
+            payload (Dict[str, Any]): JSON request body for the mail endpoint.
+
+        Returns:
+            int: ID of the queued message.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'INSERT INTO email_outbox (recipient, payload, next_attempt_at) VALUES (?, ?, ?)',
+                (recipient, json.dumps(payload), time.time()),
+            )
+            conn.commit()
+            message_id = cursor.lastrowid
+        self.schedule()
+        return message_id
+
+    def status(self, message_id: int) -> Optional[OutboxMessage]:
+        """Return the delivery state of a message.
+
+        Args:
+            message_id (int): ID returned by enqueue.
+
+        Returns:
+            Optional[OutboxMessage]: The state, or None if the message does not exist.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT id, recipient, status, attempts, last_error, next_attempt_at '
+                'FROM email_outbox WHERE id = ?',
+                (message_id,),
+            ).fetchone()
+        return None if row is None else OutboxMessage(*row)
+
+    def schedule(self) -> None:
+        """Start the sender unless it is running; it picks up every waiting message."""
+        self._requested.set()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name='datastore-outbox', daemon=True)
+                self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until no message is waiting to be sent.
+
+        Args:
+            timeout (Optional[float]): Maximum number of seconds to wait; None to wait
+                indefinitely.
+
+        Returns:
+            bool: True if the sender has finished.
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def run_once(self) -> Optional[float]:
+        """Send every message that is due, on the calling thread.
+
+        Returns:
+            Optional[float]: Seconds until the next queued message is due or a message
+                claimed by another sender times out, or None if no message is waiting.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            # Release messages of senders that stopped while sending
+            conn.execute(
+                'UPDATE email_outbox SET status = ?, claimed_at = NULL '
+                'WHERE status = ? AND claimed_at < ?',
+                (QUEUED, SENDING, now - OUTBOX_CLAIM_TIMEOUT),
+            )
+            conn.commit()
+            due = conn.execute(
+                'SELECT id FROM email_outbox WHERE status = ? AND next_attempt_at <= ? ORDER BY id',
+                (QUEUED, now),
+            ).fetchall()
+            for (message_id,) in due:
+                claimed = conn.execute(
+                    'UPDATE email_outbox SET status = ?, claimed_at = ? WHERE id = ? AND status = ?',
+                    (SENDING, time.time(), message_id, QUEUED),
+                )
+                conn.commit()
+                if claimed.rowcount == 1:
+                    self._send(conn, message_id)
+            # Messages another sender holds are due again once their claim times out
+            wake_at = conn.execute(
+                'SELECT MIN(wake_at) FROM ('
+                'SELECT MIN(next_attempt_at) AS wake_at FROM email_outbox WHERE status = ? '
+                'UNION ALL SELECT MIN(claimed_at) + ? FROM email_outbox WHERE status = ?)',
+                (QUEUED, OUTBOX_CLAIM_TIMEOUT, SENDING),
+            ).fetchone()[0]
+        if wake_at is None:
+            return None
+        return max(wake_at - time.time(), 0.0)
+
+    def _send(self, conn: sqlite3.Connection, message_id: int) -> None:
+        payload, attempts = conn.execute(
+            'SELECT payload, attempts FROM email_outbox WHERE id = ?', (message_id,)
+        ).fetchone()
+        attempts += 1
+        retry, error = False, None
+        try:
+            response = self._session.post(
+                self.url,
+                data=payload.encode('utf-8'),
+                headers={
+                    'Authorization': f'Bearer {self._api_key()}',
+                    'Content-Type': 'application/json',
+                },
+                timeout=(OUTBOX_CONNECT_TIMEOUT, OUTBOX_READ_TIMEOUT),
+            )
+        except requests.exceptions.SSLError as e:
+            # Certificate problems do not go away by retrying; fix the CA bundle instead
+            error = f'SSL error: {e}'
+        except requests.RequestException as e:
+            retry, error = True, f'{type(e).__name__}: {e}'
+        else:
+            if response.status_code >= 400:
+                retry = response.status_code == 429 or response.status_code >= 500
+                error = f'Status code {response.status_code}: {response.text[:500]}'
+
+        # Finished messages keep their state but drop the payload, which holds the attachments
+        if error is None:
+            conn.execute(
+                "UPDATE email_outbox SET status = ?, attempts = ?, last_error = NULL, payload = '', "
+                'claimed_at = NULL, sent_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (SENT, attempts, message_id),
+            )
+        elif retry and attempts < OUTBOX_MAX_ATTEMPTS:
+            conn.execute(
+                'UPDATE email_outbox SET status = ?, attempts = ?, last_error = ?, claimed_at = NULL, '
+                'next_attempt_at = ? WHERE id = ?',
+                (QUEUED, attempts, error, time.time() + backoff_delay(attempts), message_id),
+            )
+        else:
+            conn.execute(
+                "UPDATE email_outbox SET status = ?, attempts = ?, last_error = ?, payload = '', "
+                'claimed_at = NULL WHERE id = ?',
+                (FAILED, attempts, error, message_id),
+            )
+        conn.commit()
+
+    def _work(self) -> None:
+        while True:
+            self._requested.clear()
+            try:
+                delay = self.run_once()
+            except sqlite3.Error as e:
+                print(f'❌ Error sending queued emails: {e}')
+                delay = None
+            with self._lock:
+                if delay is None and not self._requested.is_set():
+                    self._thread = None
+                    return
+            # Sleep until the next retry is due or a new message is queued
+            self._requested.wait(delay)
@@ -0,0 +1,276 @@
+"""Storage reclamation module for Team-34 project.
+
+Frees the storage of deleted datasets for the LSU Datastore Dashboard in the background.
+Deleting a file only hides it; the reclaimer later removes the stored rows, search
+entries and column metadata of hidden files that nothing links to or builds a delta
+snapshot on, together with rows left behind by older versions that deleted only the
+``files`` row. Rows are removed in small committed batches so the dashboard never waits
+on one long write, and freed pages are returned to the filesystem with incremental
+VACUUM.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, ContextManager, List, Optional
+
+from . import arrow_cache, search_index, snapshots
+from .engines import ENGINES
+
+
+# Maximum number of stored rows removed per committed batch
+RECLAIM_BATCH_SIZE: int = int(os.getenv("RECLAIM_BATCH_SIZE", "5000"))
+
+# Set to 0 to reclaim storage synchronously inside delete_file
+RECLAIM_IN_BACKGROUND: bool = os.getenv("RECLAIM_IN_BACKGROUND", "1") != "0"
+
+
+@dataclass
+class ReclaimStats:
+    """Outcome of one reclamation pass.
+
+    Attributes:
+        files_purged (int): Number of deleted or orphaned files removed.
+        rows_deleted (int): Number of stored rows and search entries removed.
+        bytes_reclaimed (int): Bytes returned to the filesystem by incremental VACUUM.
+        seconds (float): Wall-clock time of the pass.
+    """
+
+    files_purged: int = 0
+    rows_deleted: int = 0
+    bytes_reclaimed: int = 0
+    seconds: float = 0.0
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """Switch the database to incremental auto-vacuum.
+
+    The mode only takes effect after a full VACUUM, which runs once here and cannot run
+    inside a transaction, so this is not a schema migration. The Reclaimer calls it
+    before its first pass, keeping the VACUUM off the startup path.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection with no active transaction.
+
+    Returns:
+        bool: True if the database was converted by this call.
+    """
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        return False
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    return True
+
+
+def find_reclaimable(cursor: sqlite3.Cursor) -> List[int]:
+    """List the IDs of files whose storage can be freed.
+
+    These are deleted files that no other file links to or builds a delta snapshot on,
+    and IDs that still have column metadata, removed snapshot rows or engine storage (a
+    dataset table or file) but no ``files`` row.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor on the datastore database.
+
+    Returns:
+        List[int]: File IDs in ascending order.
+    """
+    cursor.execute(
+        'SELECT id FROM files f WHERE deleted_at IS NOT NULL '
+        'AND NOT EXISTS (SELECT 1 FROM files l WHERE l.data_file_id = f.id) '
+        'AND NOT EXISTS (SELECT 1 FROM files s WHERE s.base_file_id = f.id) '
+        'UNION SELECT DISTINCT file_id FROM csv_columns '
+        'WHERE file_id NOT IN (SELECT id FROM files) '
+        'UNION SELECT DISTINCT file_id FROM snapshot_removed '
+        'WHERE file_id NOT IN (SELECT id FROM files)'
+    )
+    file_ids = {row[0] for row in cursor.fetchall()}
+    stored = {file_id for engine in ENGINES.values() for file_id in engine.stored_file_ids(cursor)}
+    if stored:
+        cursor.execute('SELECT id FROM files')
+        file_ids.update(stored - {row[0] for row in cursor.fetchall()})
+    return sorted(file_ids)
+
+
+def _claim(conn: sqlite3.Connection, file_id: int) -> bool:
+    """Confirm a file may be purged and stop new uploads from linking to it.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+        file_id (int): ID of a file returned by find_reclaimable.
+
+    Returns:
+        bool: False if the file was restored or gained a link or delta snapshot since it
+            was listed.
+    """
+    cursor = conn.cursor()
+    cursor.execute('SELECT 1 FROM files WHERE id = ?', (file_id,))
+    if cursor.fetchone() is None:
+        return True
+    cursor.execute(
+        'UPDATE files SET content_hash = NULL WHERE id = ? AND deleted_at IS NOT NULL '
+        'AND NOT EXISTS (SELECT 1 FROM files l WHERE l.data_file_id = ?) '
+        'AND NOT EXISTS (SELECT 1 FROM files s WHERE s.base_file_id = ?)',
+        (file_id, file_id, file_id),
+    )
+    conn.commit()
+    return cursor.rowcount == 1
+
+
+def purge_file(conn: sqlite3.Connection, file_id: int, batch_size: int = RECLAIM_BATCH_SIZE) -> int:
+    """Remove a file's stored rows, search entries and metadata in committed batches.
+
+    The ``files`` row goes last, so an interrupted purge is picked up by the next pass.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection with no active transaction.
+        file_id (int): ID of the file to remove.
+        batch_size (int): Maximum number of rows removed per transaction.
+
+    Returns:
+        int: Number of stored rows and search entries removed.
+    """
+    cursor = conn.cursor()
+    removed = 0
+    for engine in ENGINES.values():
+        while True:
+            batch = engine.delete_batch(cursor, file_id, batch_size)
+            conn.commit()
+            removed += batch
+            if batch == 0:
+                break
+    if search_index.index_exists(cursor):
+        while True:
+            batch = search_index.unindex_file(cursor, file_id, batch_size)
+            conn.commit()
+            removed += batch
+            if batch < batch_size:
+                break
+    snapshots.clear_removed(cursor, file_id)
+    arrow_cache.discard(cursor, file_id)
+    cursor.execute('DELETE FROM csv_columns WHERE file_id = ?', (file_id,))
+    cursor.execute('DELETE FROM files WHERE id = ?', (file_id,))
+    conn.commit()
+    return removed
+
+
+def _database_size(conn: sqlite3.Connection) -> int:
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    return page_count * conn.execute('PRAGMA page_size').fetchone()[0]
+
+
+def reclaim(conn: sqlite3.Connection, batch_size: Optional[int] = None) -> ReclaimStats:
+    """Purge every reclaimable file and return the freed pages to the filesystem.
+
+    Purging a delta snapshot can make its deleted base reclaimable, so files are listed
+    again until a round purges nothing.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection with no active transaction.
+        batch_size (Optional[int]): Rows removed per transaction. Defaults to
+            RECLAIM_BATCH_SIZE.
+
+    Returns:
+        ReclaimStats: What the pass removed and how many bytes it freed.
+    """
+    started = time.perf_counter()
+    stats = ReclaimStats()
+    size_before = _database_size(conn)
+    purged = None
+    while purged != stats.files_purged:
+        purged = stats.files_purged
+        for file_id in find_reclaimable(conn.cursor()):
+            try:
+                if not _claim(conn, file_id):
+                    continue
+                stats.rows_deleted += purge_file(conn, file_id, batch_size or RECLAIM_BATCH_SIZE)
+                stats.files_purged += 1
+            except sqlite3.Error as e:
+                print(f'❌ Error reclaiming storage of file {file_id}: {e}')
+                conn.rollback()
+
+    if stats.files_purged:
+        conn.execute('PRAGMA incremental_vacuum').fetchall()
+        stats.bytes_reclaimed = max(size_before - _database_size(conn), 0)
+    stats.seconds = time.perf_counter() - started
+    if stats.files_purged:
+        print(
+            f'✅ Reclaimed {stats.files_purged} file(s): {stats.rows_deleted} rows removed, '
+            f'{stats.bytes_reclaimed / 2**20:.1f} MB freed in {stats.seconds:.2f}s'
+        )
+    return stats
+
+
+class Reclaimer:
+    """Run reclamation passes on a background thread whenever they are requested.
+
+    Requests made while a pass is running trigger one more pass, so every deletion is
+    eventually reclaimed. The thread exits when there is nothing left to do. A database
+    not yet in incremental auto-vacuum mode is converted before the pass.
+
+    Args:
+        connect (Callable[[], ContextManager[sqlite3.Connection]]): Factory returning a
+            context manager that yields a connection to the datastore database.
+    """
+
+    def __init__(self, connect: Callable[[], ContextManager[sqlite3.Connection]]) -> None:
+        self._connect = connect
+        self._requested = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.last_stats: Optional[ReclaimStats] = None
+
+    def run_once(self) -> ReclaimStats:
+        """Run one reclamation pass on the calling thread.
+
+        Returns:
+            ReclaimStats: Result of the pass.
+        """
+        with self._connect() as conn:
+            if enable_incremental_vacuum(conn):
+                print('✅ Enabled incremental VACUUM')
+            self.last_stats = reclaim(conn)
+        return self.last_stats
+
+    def schedule(self) -> None:
+        """Request a reclamation pass without waiting for it."""
+        if not RECLAIM_IN_BACKGROUND:
+            self.run_once()
+            return
+        self._requested.set()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work, name='datastore-reclaimer', daemon=True
+                )
+                self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the background thread has finished all requested passes.
+
+        Args:
+            timeout (Optional[float]): Maximum number of seconds to wait; None to wait
+                indefinitely.
+
+        Returns:
+            bool: True if no pass is running or pending afterwards.
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                if not self._requested.is_set():
+                    self._thread = None
+                    return
+                self._requested.clear()
+            try:
+                self.run_once()
+            except sqlite3.Error as e:
+                print(f'❌ Error reclaiming storage: {e}')
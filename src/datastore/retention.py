@@ -0,0 +1,78 @@
+"""Retention module for Team-34 project.
+
+Partitions the scheduled datasets of the LSU Datastore Dashboard by category and fetch
+date and decides which partitions have outlived their category's retention period.
+With the columnar and Parquet engines each file of a partition keeps its rows in its own
+dataset table or Parquet file, so a partition is dropped as whole units instead of row
+by row.
+"""
+
+import os
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+# Categories of scheduled datasets
+JOBS: str = 'jobs'
+COURSES: str = 'courses'
+RESEARCH: str = 'research'
+LSU_COURSES: str = 'lsu_courses'
+
+
+def parse_policies(text: str) -> Dict[str, int]:
+    """Parse retention periods written as 'category=days' pairs separated by commas.
+
+    Args:
+        text (str): Policy text, e.g. 'jobs=30,lsu_courses=365'.
+
+    Returns:
+        Dict[str, int]: Days to keep per category.
+
+    Raises:
+        ValueError: If a pair is malformed or a period is negative.
+    """
+    policies: Dict[str, int] = {}
+    for pair in filter(None, (part.strip() for part in text.split(','))):
+        category, sep, days = pair.partition('=')
+        if not sep or not category.strip() or int(days) < 0:
+            raise ValueError(f'Invalid retention policy: {pair!r}')
+        policies[category.strip()] = int(days)
+    return policies
+
+
+# Days of partitions kept per category; categories without a policy are kept forever
+RETENTION_DAYS: Dict[str, int] = parse_policies(
+    os.getenv('DATASTORE_RETENTION', f'{JOBS}=30,{COURSES}=90,{RESEARCH}=365,{LSU_COURSES}=365')
+)
+
+
+def expired_partitions(
+    cursor: sqlite3.Cursor, policies: Optional[Dict[str, int]] = None, today: Optional[date] = None
+) -> List[Tuple[str, str]]:
+    """List the partitions older than their category's retention period.
+
+    A partition is kept for as many days as its policy allows, counting today, so with
+    'jobs=30' the jobs fetched 30 or more days ago expire.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor on the datastore database.
+        policies (Optional[Dict[str, int]]): Days to keep per category. Defaults to
+            RETENTION_DAYS.
+        today (Optional[date]): Date to measure ages from. Defaults to the current date.
+
+    Returns:
+        List[Tuple[str, str]]: (category, fetch_date) pairs, oldest first.
+    """
+    policies = RETENTION_DAYS if policies is None else policies
+    today = today or date.today()
+    expired: List[Tuple[str, str]] = []
+    for category, days in sorted(policies.items()):
+        cutoff = (today - timedelta(days=days)).isoformat()
+        cursor.execute(
+            'SELECT DISTINCT fetch_date FROM files WHERE category = ? AND fetch_date <= ? '
+            'AND deleted_at IS NULL',
+            (category, cutoff),
+        )
+        expired.extend((category, fetch_date) for (fetch_date,) in cursor.fetchall())
+    return sorted(expired, key=lambda partition: (partition[1], partition[0]))
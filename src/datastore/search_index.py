@@ -0,0 +1,223 @@
+"""Search index module for Team-34 project.
+
+Maintains an SQLite FTS5 full-text index over dataset values for the LSU Datastore
+Dashboard. Each indexed cell gets the rowid ``(file_id << 32) | cell`` where ``cell`` is
+``row_number * column_count + column_index``, so a file's entries form one contiguous
+rowid range that can be replaced or dropped without scanning the index.
+"""
+
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+
+# Name of the FTS5 table holding indexed cell values
+SEARCH_TABLE: str = 'csv_search'
+
+_PHRASE_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def fts5_available(cursor: sqlite3.Cursor) -> bool:
+    """Check whether the linked SQLite library was compiled with FTS5.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+
+    Returns:
+        bool: True if FTS5 virtual tables can be created.
+    """
+    cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+    return bool(cursor.fetchone()[0])
+
+
+def index_exists(cursor: sqlite3.Cursor) -> bool:
+    """Check whether the search index table exists.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+
+    Returns:
+        bool: True if the index has been created.
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    )
+    return cursor.fetchone() is not None
+
+
+def create_index(cursor: sqlite3.Cursor) -> bool:
+    """Create the search index table if FTS5 is available.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+
+    Returns:
+        bool: True if the index exists afterwards.
+    """
+    if not fts5_available(cursor):
+        print('⚠️ SQLite was built without FTS5; search falls back to scanning values.')
+        return False
+    cursor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+        'value, file_id UNINDEXED, row_number UNINDEXED, column_name UNINDEXED, '
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    return True
+
+
+def _file_range(file_id: int) -> Tuple[int, int]:
+    return int(file_id) << 32, (int(file_id) + 1) << 32
+
+
+def index_rows(cursor: sqlite3.Cursor, file_id: int, df: pd.DataFrame) -> None:
+    """Add the non-empty cells of a chunk of rows to the index.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file the rows belong to.
+        df (pd.DataFrame): Rows to index, keyed by row number, in column order.
+    """
+    base, _ = _file_range(file_id)
+    column_count = len(df.columns)
+    present = df.notna()
+    values = df.astype(str)
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, value, file_id, row_number, column_name) '
+        'VALUES (?, ?, ?, ?, ?)',
+        (
+            (base + int(row_number) * column_count + col_idx, value, file_id, int(row_number), col_name)
+            for row_number, row, mask in zip(
+                df.index,
+                values.itertuples(index=False, name=None),
+                present.itertuples(index=False, name=None),
+            )
+            for col_idx, (col_name, value, has_value) in enumerate(zip(df.columns, row, mask))
+            if has_value
+        ),
+    )
+
+
+def reindex_cells(
+    cursor: sqlite3.Cursor,
+    file_id: int,
+    column_count: int,
+    cells: List[Tuple[int, int, str, object]],
+) -> None:
+    """Replace the indexed values of individual cells.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file the cells belong to.
+        column_count (int): Number of columns in the file.
+        cells (List[Tuple[int, int, str, object]]): Changes as
+            (row_number, column_index, column_name, value).
+    """
+    base, _ = _file_range(file_id)
+    rowids = [(base + int(row) * column_count + int(col),) for row, col, _, _ in cells]
+    cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = ?', rowids)
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, value, file_id, row_number, column_name) '
+        'VALUES (?, ?, ?, ?, ?)',
+        [
+            (rowid, str(value), file_id, int(row), col_name)
+            for (rowid,), (row, _, col_name, value) in zip(rowids, cells)
+            if not pd.isna(value)
+        ],
+    )
+
+
+def unindex_rows(
+    cursor: sqlite3.Cursor, file_id: int, column_count: int, row_numbers: List[int]
+) -> None:
+    """Remove the indexed cells of individual rows.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file the rows belong to.
+        column_count (int): Number of columns in the file.
+        row_numbers (List[int]): Row numbers to remove.
+    """
+    base, _ = _file_range(file_id)
+    cursor.executemany(
+        f'DELETE FROM {SEARCH_TABLE} WHERE rowid >= ? AND rowid < ?',
+        [
+            (base + int(row) * column_count, base + (int(row) + 1) * column_count)
+            for row in row_numbers
+        ],
+    )
+
+
+def unindex_file(cursor: sqlite3.Cursor, file_id: int, limit: Optional[int] = None) -> int:
+    """Remove the indexed cells of a file.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the file to remove.
+        limit (Optional[int]): Maximum number of cells to remove; None for all.
+
+    Returns:
+        int: Number of cells removed.
+    """
+    start, end = _file_range(file_id)
+    if limit is None:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid >= ? AND rowid < ?', (start, end))
+    else:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN '
+            f'(SELECT rowid FROM {SEARCH_TABLE} WHERE rowid >= ? AND rowid < ? LIMIT ?)',
+            (start, end, limit),
+        )
+    return cursor.rowcount
+
+
+def build_match_query(query: str) -> str:
+    """Translate user search text into an FTS5 MATCH expression.
+
+    Text in double quotes is matched as an exact phrase. Other words are matched as
+    prefixes, and a trailing ``*`` is accepted for the same effect, so partially typed
+    words still find results. All terms must match.
+
+    Args:
+        query (str): Raw search text.
+
+    Returns:
+        str: The MATCH expression, or an empty string if the text has no searchable terms.
+    """
+    terms: List[str] = []
+    for phrase, word in _PHRASE_PATTERN.findall(query):
+        if phrase:
+            tokens = _TOKEN_PATTERN.findall(phrase)
+            if tokens:
+                terms.append('"' + ' '.join(tokens) + '"')
+        else:
+            terms.extend(f'"{token}"*' for token in _TOKEN_PATTERN.findall(word))
+    return ' AND '.join(terms)
+
+
+def search(
+    cursor: sqlite3.Cursor, query: str, limit: int, offset: int = 0
+) -> List[Tuple[int, int, str, str]]:
+    """Run a ranked full-text search over indexed values.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        query (str): Raw search text.
+        limit (int): Maximum number of results.
+        offset (int): Number of best matches to skip. Defaults to 0.
+
+    Returns:
+        List[Tuple[int, int, str, str]]: Best matches first as
+            (file_id, row_number, column_name, value).
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+    cursor.execute(
+        f'SELECT file_id, row_number, column_name, value FROM {SEARCH_TABLE} '
+        f'WHERE {SEARCH_TABLE} MATCH ? ORDER BY rank LIMIT ? OFFSET ?',
+        (match, limit, offset),
+    )
+    return cursor.fetchall()
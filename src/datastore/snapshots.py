@@ -0,0 +1,359 @@
+"""Snapshot module for Team-34 project.
+
+Stores recurring fetched datasets of the LSU Datastore Dashboard as a base snapshot plus
+per-day row deltas. A delta file records the ID of the snapshot it was taken against in
+``files.base_file_id``; its own engine storage holds only the rows that were added or
+changed since then, and ``snapshot_removed`` lists the base rows that disappeared. Reads
+rebuild the full day from the base one window at a time, so storage and ingest writes
+grow with daily churn rather than with the size of the dataset.
+"""
+
+import os
+import sqlite3
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import pandas as pd
+
+from .engines import RowFilter, StorageEngine, _filter_mask
+
+
+# Longest chain of deltas before a snapshot is stored in full again
+SNAPSHOT_MAX_CHAIN: int = int(os.getenv('SNAPSHOT_MAX_CHAIN', '7'))
+
+# Largest share of changed rows a delta may hold before the snapshot is stored in full
+SNAPSHOT_MAX_CHURN: float = float(os.getenv('SNAPSHOT_MAX_CHURN', '0.5'))
+
+# Rows of the base and of the delta read at a time when a snapshot is rebuilt
+SNAPSHOT_READ_CHUNK_SIZE: int = int(os.getenv('SNAPSHOT_READ_CHUNK_SIZE', '10000'))
+
+
+class SnapshotDelta(NamedTuple):
+    """Row changes turning one snapshot into the next.
+
+    Attributes:
+        rows (pd.DataFrame): Added and changed rows of the new snapshot, indexed by the
+            row number they are stored under.
+        removed (List[int]): Row numbers of the previous snapshot that are gone.
+        changed (int): Number of rows in ``rows`` that replace a previous row.
+    """
+
+    rows: pd.DataFrame
+    removed: List[int]
+    changed: int
+
+    @property
+    def size(self) -> int:
+        """Return the number of rows the delta touches."""
+        return len(self.rows) + len(self.removed)
+
+
+def create_table(cursor: sqlite3.Cursor) -> None:
+    """Create the table listing the base rows each delta snapshot removes.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS snapshot_removed (
+            file_id INTEGER NOT NULL,
+            row_number INTEGER NOT NULL,
+            PRIMARY KEY (file_id, row_number)
+        ) WITHOUT ROWID
+    """)
+
+
+def removed_rows(cursor: sqlite3.Cursor, file_id: int) -> List[int]:
+    """Return the base row numbers a delta snapshot removes.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the delta file.
+
+    Returns:
+        List[int]: Removed row numbers in ascending order.
+    """
+    cursor.execute(
+        'SELECT row_number FROM snapshot_removed WHERE file_id = ? ORDER BY row_number', (file_id,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def write_removed(cursor: sqlite3.Cursor, file_id: int, row_numbers: List[int]) -> None:
+    """Record the base row numbers a delta snapshot removes.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the delta file.
+        row_numbers (List[int]): Removed row numbers.
+    """
+    cursor.executemany(
+        'INSERT INTO snapshot_removed (file_id, row_number) VALUES (?, ?)',
+        [(file_id, int(row)) for row in row_numbers],
+    )
+
+
+def clear_removed(cursor: sqlite3.Cursor, file_id: int) -> int:
+    """Forget the removed rows of a delta snapshot.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the delta file.
+
+    Returns:
+        int: Number of entries removed.
+    """
+    cursor.execute('DELETE FROM snapshot_removed WHERE file_id = ?', (file_id,))
+    return cursor.rowcount
+
+
+def chain_length(cursor: sqlite3.Cursor, file_id: int) -> int:
+    """Count the deltas between a snapshot and the full snapshot it is built on.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the active transaction.
+        file_id (int): ID of the snapshot.
+
+    Returns:
+        int: 0 for a snapshot stored in full.
+    """
+    cursor.execute(
+        'WITH RECURSIVE chain(id, base) AS ('
+        'SELECT id, base_file_id FROM files WHERE id = ? '
+        'UNION ALL SELECT f.id, f.base_file_id FROM files f JOIN chain c ON f.id = c.base) '
+        'SELECT COUNT(*) - 1 FROM chain',
+        (file_id,),
+    )
+    return max(cursor.fetchone()[0], 0)
+
+
+def _row_text(df: pd.DataFrame) -> List[Tuple[Optional[str], ...]]:
+    """Return the rows of a frame as tuples of text, with missing values as None."""
+    values = df.astype(object).where(df.notna(), None)
+    return [
+        tuple(None if value is None or str(value) == 'nan' else str(value) for value in row)
+        for row in values.itertuples(index=False, name=None)
+    ]
+
+
+def _unique_key(df: pd.DataFrame, key_columns: Optional[List[str]]) -> Optional[List[tuple]]:
+    """Return each row's key values if the key columns identify every row."""
+    if not key_columns or any(col not in df.columns for col in key_columns):
+        return None
+    keys = df[key_columns]
+    if keys.isna().any().any() or keys.duplicated().any():
+        return None
+    return list(_row_text(keys))
+
+
+def compute_delta(
+    previous: pd.DataFrame, current: pd.DataFrame, key_columns: Optional[List[str]] = None
+) -> SnapshotDelta:
+    """Find the rows added, removed and changed between two snapshots.
+
+    Rows are matched on the key columns when these identify every row of both
+    snapshots, so an edited row counts as changed. Otherwise whole rows are matched and
+    an edited row counts as removed and added. Unchanged rows keep their row number,
+    changed rows take over the number of the row they replace and added rows are
+    numbered after the highest previous row number.
+
+    Args:
+        previous (pd.DataFrame): Previous snapshot indexed by stored row number.
+        current (pd.DataFrame): New snapshot with the same columns.
+        key_columns (Optional[List[str]]): Columns identifying a row across snapshots.
+
+    Returns:
+        SnapshotDelta: The rows to store and the row numbers to drop.
+    """
+    previous_text = _row_text(previous)
+    current_text = _row_text(current)
+    previous_keys = _unique_key(previous, key_columns)
+    current_keys = _unique_key(current, key_columns)
+
+    positions: List[Optional[int]] = []
+    changed = 0
+    if previous_keys is not None and current_keys is not None:
+        by_key = {key: (row, text) for key, row, text in zip(previous_keys, previous.index, previous_text)}
+        kept = set()
+        for key, text in zip(current_keys, current_text):
+            match = by_key.get(key)
+            if match is None:
+                positions.append(None)
+                continue
+            kept.add(match[0])
+            if match[1] == text:
+                positions.append(-1)
+            else:
+                positions.append(match[0])
+                changed += 1
+        removed = [int(row) for row in previous.index if row not in kept]
+    else:
+        by_text: Dict[tuple, List[int]] = {}
+        for row, text in zip(previous.index, previous_text):
+            by_text.setdefault(text, []).append(int(row))
+        for text in current_text:
+            rows = by_text.get(text)
+            if rows:
+                rows.pop()
+                positions.append(-1)
+            else:
+                positions.append(None)
+        removed = sorted(row for rows in by_text.values() for row in rows)
+
+    next_row = int(previous.index.max()) + 1 if len(previous) else 0
+    index: List[int] = []
+    for pos, position in enumerate(positions):
+        if position is None:
+            index.append(next_row)
+            next_row += 1
+        elif position >= 0:
+            index.append(position)
+    rows = current.reset_index(drop=True).iloc[[pos for pos, p in enumerate(positions) if p != -1]]
+    rows.index = index
+    return SnapshotDelta(rows, removed, changed)
+
+
+class SnapshotView(StorageEngine):
+    """Read a delta snapshot as if its full rows were stored.
+
+    The view streams the base snapshot and the delta's own rows side by side in
+    row-number order, drops the removed base rows and lets the delta's rows replace the
+    base rows they share a number with, so windows, filters and counts only hold one
+    window of each in memory. It is read-only: a delta snapshot is stored in full before
+    it is modified.
+
+    Args:
+        own (StorageEngine): Engine holding the delta's added and changed rows.
+        base_id (int): ID the base snapshot's rows are stored under.
+        base (StorageEngine): Engine, or view, holding the base snapshot.
+    """
+
+    def __init__(self, own: StorageEngine, base_id: int, base: StorageEngine) -> None:
+        self.own = own
+        self.base_id = base_id
+        self.base = base
+        self.name = own.name
+
+    def materialize(self, cursor: sqlite3.Cursor, file_id: int, columns: List[str]) -> pd.DataFrame:
+        """Rebuild every row of the snapshot.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the delta file.
+            columns (List[str]): All column names in their original order.
+
+        Returns:
+            pd.DataFrame: The snapshot's rows indexed by row number.
+        """
+        chunks = list(self.iter_rows(cursor, file_id, columns, SNAPSHOT_READ_CHUNK_SIZE))
+        if not chunks:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+    def shadowed(self, cursor: sqlite3.Cursor, file_id: int) -> Set[int]:
+        """Return the row numbers the snapshot does not take from its base.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor of the active transaction.
+            file_id (int): ID of the delta file.
+
+        Returns:
+            Set[int]: Base row numbers the delta removes or replaces, together with the
+                numbers of the rows it adds.
+        """
+        columns = _column_names(cursor, file_id)
+        shadowed = set(removed_rows(cursor, file_id))
+        for chunk in self.own.iter_rows(
+            cursor, file_id, columns, SNAPSHOT_READ_CHUNK_SIZE, [0] if columns else None
+        ):
+            shadowed.update(int(row) for row in chunk.index)
+        return shadowed
+
+    def iter_rows(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        chunk_size: int,
+        select: Optional[List[int]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        removed = set(removed_rows(cursor, file_id))
+        own_chunks = self.own.iter_rows(cursor, file_id, columns, chunk_size, select)
+        pending = next(own_chunks, None)
+        for base in self.base.iter_rows(cursor, self.base_id, columns, chunk_size, select):
+            # Take the delta's rows numbered up to the end of this base window
+            last = base.index[-1]
+            own_parts = []
+            while pending is not None and pending.index[0] <= last:
+                own_parts.append(pending[pending.index <= last])
+                rest = pending[pending.index > last]
+                pending = rest if len(rest) else next(own_chunks, None)
+            base = base[~base.index.isin(removed)]
+            if own_parts:
+                own = pd.concat(own_parts) if len(own_parts) > 1 else own_parts[0]
+                base = base[~base.index.isin(own.index)]
+                merged = own.copy() if not len(base) else pd.concat(
+                    [base.astype(object), own.astype(object)]
+                ).sort_index()
+            else:
+                merged = base.copy()
+            if len(merged):
+                yield merged
+        # Added rows are numbered after every base row
+        while pending is not None:
+            yield pending
+            pending = next(own_chunks, None)
+
+    def read(
+        self,
+        cursor: sqlite3.Cursor,
+        file_id: int,
+        columns: List[str],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        select: Optional[List[int]] = None,
+        filters: Optional[List[RowFilter]] = None,
+    ) -> pd.DataFrame:
+        positions = select if select is not None else list(range(len(columns)))
+        names = [columns[idx] for idx in positions]
+        # Filtered columns are read too, and projected away once rows are matched
+        used = list(dict.fromkeys(positions + [row_filter.position for row_filter in filters or []]))
+        if not used and columns:
+            # Rows without columns still need a column to be read by
+            used = [0]
+        chunk_size = max(limit or 0, SNAPSHOT_READ_CHUNK_SIZE)
+        parts: List[pd.DataFrame] = []
+        skip, wanted = offset, limit
+        for chunk in self.iter_rows(cursor, file_id, columns, chunk_size, used):
+            if filters:
+                mask = pd.Series(True, index=chunk.index)
+                for row_filter in filters:
+                    mask &= _filter_mask(chunk[columns[row_filter.position]], row_filter)
+                chunk = chunk[mask]
+            if skip:
+                dropped = min(skip, len(chunk))
+                chunk, skip = chunk.iloc[dropped:], skip - dropped
+            if wanted is not None:
+                chunk = chunk.iloc[:wanted]
+                wanted -= len(chunk)
+            if len(chunk):
+                parts.append(chunk[names])
+            if wanted == 0:
+                break
+        if not parts:
+            return pd.DataFrame(columns=names)
+        return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+    def count(self, cursor: sqlite3.Cursor, file_id: int) -> int:
+        columns = _column_names(cursor, file_id)
+        return sum(
+            len(chunk) for chunk in self.iter_rows(
+                cursor, file_id, columns, SNAPSHOT_READ_CHUNK_SIZE, [0] if columns else None
+            )
+        )
+
+
+def _column_names(cursor: sqlite3.Cursor, file_id: int) -> List[str]:
+    cursor.execute(
+        'SELECT column_name FROM csv_columns WHERE file_id = ? ORDER BY column_index', (file_id,)
+    )
+    return [row[0] for row in cursor.fetchall()]
@@ -1,9 +1,13 @@
-import io
-
-import pandas as pd
 import streamlit as st
 
-from src.utils import cached_get_files, cached_get_csv_preview, logger
+from src.utils import (
+    cached_get_csv_rows,
+    cached_get_files,
+    cached_get_row_count,
+    logger,
+    render_download_button,
+    select_page,
+)
 
 def render_data_page() -> None:
     """Render the Data Page for viewing CSV files."""
@@ -28,49 +32,28 @@ def render_data_page() -> None:
                     'details': f'Selected dataset: {file_options[selected_file_id]}',
                 },
             )
-            df = cached_get_csv_preview(selected_file_id)
-            if not df.empty:
-                st.write(f'Preview of {file_options[selected_file_id]}:')
-                st.dataframe(df, hide_index=True)
+            row_count = cached_get_row_count(selected_file_id)
+            if row_count:
+                offset, limit = select_page(row_count, key='data_page')
+                page_df = cached_get_csv_rows(selected_file_id, offset, limit)
+                st.write(
+                    f'Preview of {file_options[selected_file_id]} '
+                    f'(rows {offset + 1}-{offset + len(page_df)} of {row_count}):'
+                )
+                st.dataframe(page_df, hide_index=True)
 
                 st.subheader('Download Data')
                 col_dl1, col_dl2 = st.columns(2)
                 with col_dl1:
-                    csv_data = df.to_csv(index=False).encode('utf-8')
-                    if st.download_button(
-                        label='Download CSV',
-                        data=csv_data,
-                        file_name=f'{file_options[selected_file_id]}.csv',
-                        mime='text/csv',
-                        key='download_csv_data_page',
-                    ):
-                        logger.info(
-                            'CSV Downloaded',
-                            extra={
-                                'username': st.session_state.username or 'Anonymous',
-                                'action': 'download_csv_data_page',
-                                'details': f'Downloaded: {file_options[selected_file_id]}.csv',
-                            },
-                        )
+                    render_download_button(
+                        selected_file_id, file_options[selected_file_id], 'csv',
+                        key='download_csv_data_page', action='download_csv_data_page',
+                    )
                 with col_dl2:
-                    parquet_buffer = io.BytesIO()
-                    df.to_parquet(parquet_buffer, engine='pyarrow', index=False)
-                    parquet_data = parquet_buffer.getvalue()
-                    if st.download_button(
-                        label='Download Parquet',
-                        data=parquet_data,
-                        file_name=f'{file_options[selected_file_id]}.parquet',
-                        mime='application/octet-stream',
-                        key='download_parquet_data_page',
-                    ):
-                        logger.info(
-                            'Parquet Downloaded',
-                            extra={
-                                'username': st.session_state.username or 'Anonymous',
-                                'action': 'download_parquet_data_page',
-                                'details': f'Downloaded: {file_options[selected_file_id]}.parquet',
-                            },
-                        )
+                    render_download_button(
+                        selected_file_id, file_options[selected_file_id], 'parquet',
+                        key='download_parquet_data_page', action='download_parquet_data_page',
+                    )
             else:
                 st.error('No data found in the selected dataset.')
     else:
@@ -1,9 +1,9 @@
 import base64
-import io
 import os
 import time
+from collections import deque
 from datetime import datetime
-from typing import Dict
+from typing import Deque, Dict
 
 import pandas as pd
 import plotly.express as px
@@ -11,13 +11,79 @@ import psutil
 import streamlit as st
 from pandas import DataFrame
 
+from src.datastore import catalog, ingest_queue, retention
 from src.datastore.database import (
+    cancel_ingest,
     delete_file,
-    save_csv_to_database,
+    get_ingest_job,
+    patch_csv_data,
     search_csv_data,
-    update_csv_data,
+    submit_upload,
 )
-from src.utils import cached_get_files, cached_get_csv_preview, logger, send_dataset_email, memory_handler
+from src.utils import (
+    cached_get_catalog,
+    cached_get_csv_preview,
+    cached_get_csv_rows,
+    cached_get_files,
+    cached_get_row_count,
+    dataset_cache,
+    logger,
+    memory_handler,
+    queue_dataset_email,
+    render_download_button,
+    render_email_status,
+    select_page,
+)
+
+def render_upload_status(job_id: str) -> None:
+    """Show the progress of a queued upload, then how it ended.
+
+    Progress refreshes every second while the upload runs; the finished status is drawn
+    once, so nothing keeps polling afterwards.
+
+    Args:
+        job_id (str): ID of the ingest job returned by submit_upload.
+    """
+    job = get_ingest_job(job_id)
+    if job is None:
+        return
+    if not job.finished:
+        render_upload_progress(job_id)
+        return
+
+    if job.status == ingest_queue.CANCELLED:
+        st.warning(f'Upload of {job.filename} cancelled.')
+    elif job.status == ingest_queue.FAILED:
+        st.error(f'{job.filename} could not be saved.')
+    elif job.result.deduplicated == 'skipped':
+        st.info(f'{job.filename} is already stored; nothing to save.')
+    elif job.result.deduplicated == 'linked':
+        st.success(f'{job.filename} saved to the database (linked to an identical dataset)!')
+    else:
+        st.success(f'{job.filename} saved to the database!')
+
+
+@st.fragment(run_every=1)
+def render_upload_progress(job_id: str) -> None:
+    """Show the progress bar of a running upload, refreshing every second.
+
+    Once the upload finishes the whole page reruns, which shows the new dataset and
+    replaces this fragment with the final status.
+
+    Args:
+        job_id (str): ID of the ingest job returned by submit_upload.
+    """
+    job = get_ingest_job(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    eta = f', about {job.eta_seconds:.0f}s left' if job.eta_seconds is not None else ''
+    st.progress(
+        job.progress,
+        text=f'Uploading {job.filename}: {job.rows_ingested:,} of ~{job.total_rows:,} rows{eta}',
+    )
+    if st.button('Cancel upload', key=f'cancel_{job_id}'):
+        cancel_ingest(job_id)
+
 
 def render_home_page() -> None:
     """Render the Home page with data management and live features."""
@@ -45,16 +111,17 @@ def render_home_page() -> None:
             'Upload dataset (CSV)', type=['csv'], key='upload_csv'
         )
         if uploaded_file:
-            with st.spinner('Uploading dataset...'):
-                save_csv_to_database(
-                    uploaded_file.name,
-                    uploaded_file.getvalue(),
-                    len(uploaded_file.getvalue()),
-                    'csv',
-                    1,
-                )
-                time.sleep(1)
-            st.success(f'{uploaded_file.name} saved to the database!')
+            # Reruns resubmit the same upload; its file ID makes that a no-op
+            upload_job = submit_upload(
+                uploaded_file.name,
+                uploaded_file.getvalue(),
+                uploaded_file.size,
+                'csv',
+                1,
+                idempotency_key=uploaded_file.file_id,
+                source=catalog.UPLOAD_SOURCE,
+            )
+            render_upload_status(upload_job.job_id)
 
         manage_files = cached_get_files()
         if manage_files:
@@ -68,46 +135,51 @@ def render_home_page() -> None:
                 key='manage_select',
             )
             if manage_file_id:
-                manage_df = cached_get_csv_preview(manage_file_id)
-                if not manage_df.empty:
-                    st.write(f'**Preview of {manage_file_options[manage_file_id]}:**')
-                    st.dataframe(manage_df)
+                manage_row_count = cached_get_row_count(manage_file_id)
+                if manage_row_count:
+                    manage_offset, manage_limit = select_page(manage_row_count, key='manage')
+                    manage_page_df = cached_get_csv_rows(manage_file_id, manage_offset, manage_limit)
+                    st.write(
+                        f'**Preview of {manage_file_options[manage_file_id]} '
+                        f'(rows {manage_offset + 1}-{manage_offset + len(manage_page_df)} of {manage_row_count}):**'
+                    )
+                    st.dataframe(manage_page_df)
 
                     st.subheader('Edit Data')
-                    edited_df = st.data_editor(manage_df)
+                    # Categories would restrict edits to the existing values
+                    st.data_editor(
+                        manage_page_df.astype(
+                            {col: 'object' for col in manage_page_df.select_dtypes('category').columns}
+                        ),
+                        num_rows='dynamic',
+                        key='manage_editor',
+                    )
                     if st.button('Save Changes'):
-                        update_csv_data(manage_file_id, edited_df)
+                        edits = st.session_state.get('manage_editor', {})
+                        patch_csv_data(
+                            manage_file_id,
+                            changed_cells={
+                                int(manage_page_df.index[int(pos)]): changes
+                                for pos, changes in edits.get('edited_rows', {}).items()
+                            },
+                            inserted_rows=[
+                                {col: value for col, value in row.items() if col in manage_page_df.columns}
+                                for row in edits.get('added_rows', [])
+                            ],
+                            deleted_rows=[
+                                int(manage_page_df.index[int(pos)]) for pos in edits.get('deleted_rows', [])
+                            ],
+                        )
                         st.success('Changes saved!')
 
-                    csv_data = manage_df.to_csv(index=False).encode('utf-8')
-                    json_data = manage_df.to_json(orient='records')
-                    output = io.BytesIO()
-                    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                        manage_df.to_excel(writer, index=False)
-                    excel_data = output.getvalue()
-
                     col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.download_button(
-                            'Download CSV',
-                            data=csv_data,
-                            file_name=f'{manage_file_options[manage_file_id]}.csv',
-                            mime='text/csv',
-                        )
-                    with col2:
-                        st.download_button(
-                            'Download JSON',
-                            data=json_data,
-                            file_name=f'{manage_file_options[manage_file_id]}.json',
-                            mime='application/json',
-                        )
-                    with col3:
-                        st.download_button(
-                            'Download Excel',
-                            data=excel_data,
-                            file_name=f'{manage_file_options[manage_file_id]}.xlsx',
-                            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                        )
+                    for column, export_format in zip((col1, col2, col3), ('csv', 'json', 'excel')):
+                        with column:
+                            render_download_button(
+                                manage_file_id, manage_file_options[manage_file_id], export_format,
+                                key=f'download_{export_format}_manage',
+                                action=f'download_{export_format}_manage',
+                            )
 
                     if st.button('Delete This Dataset'):
                         delete_file(manage_file_id)
@@ -170,22 +242,14 @@ def render_home_page() -> None:
 
     files = cached_get_files()
     if files:
-        file_options: Dict[int, str] = {}
-        for file_id, filename, size, file_type, created_at in files:
-            if selected_category == 'lsu':
-                if (
-                    filename.lower().startswith('lsu')
-                    and formatted_date in filename
-                    and (selected_major in filename or 'relevant' in filename)
-                ):
-                    file_options[file_id] = filename
-            else:
-                if (
-                    selected_category in filename
-                    and formatted_date in filename
-                    and selected_major in filename
-                ):
-                    file_options[file_id] = filename
+        file_options: Dict[int, str] = {
+            file_id: filename
+            for file_id, filename, *_ in cached_get_catalog(
+                retention.LSU_COURSES if selected_category == 'lsu' else selected_category,
+                selected_major,
+                formatted_date,
+            )
+        }
 
         if file_options:
             col1, col2 = st.columns([3, 1])
@@ -213,58 +277,30 @@ def render_home_page() -> None:
                         st.subheader('Download Data')
                         col_dl1, col_dl2 = st.columns(2)
                         with col_dl1:
-                            csv_data = df.to_csv(index=False).encode('utf-8')
-                            if st.download_button(
-                                label='Download CSV',
-                                data=csv_data,
-                                file_name=f'{file_options[selected_file_id]}.csv',
-                                mime='text/csv',
-                                key='download_csv_live',
-                            ):
-                                logger.info(
-                                    'CSV Downloaded',
-                                    extra={
-                                        'username': st.session_state.username or 'Anonymous',
-                                        'action': 'download_csv',
-                                        'details': f'Downloaded: {file_options[selected_file_id]}.csv',
-                                    },
-                                )
+                            render_download_button(
+                                selected_file_id, file_options[selected_file_id], 'csv',
+                                key='download_csv_live', action='download_csv',
+                            )
                         with col_dl2:
-                            parquet_buffer = io.BytesIO()
-                            df.to_parquet(parquet_buffer, engine='pyarrow', index=False)
-                            parquet_data = parquet_buffer.getvalue()
-                            if st.download_button(
-                                label='Download Parquet',
-                                data=parquet_data,
-                                file_name=f'{file_options.get(selected_file_id, "dataset")}.parquet',
-                                mime='application/octet-stream',
-                                key='download_parquet_live',
-                            ):
-                                logger.info(
-                                    'Parquet Downloaded',
-                                    extra={
-                                        'username': st.session_state.username or 'Anonymous',
-                                        'action': 'download_parquet',
-                                        'details': f'Downloaded: {file_options.get(selected_file_id, "dataset")}.parquet',
-                                    },
-                                )
+                            render_download_button(
+                                selected_file_id, file_options[selected_file_id], 'parquet',
+                                key='download_parquet_live', action='download_parquet',
+                            )
 
                         st.subheader('Share Data via Email')
                         email_input = st.text_input(
-                            'Enter your email address:', key='email_live'
+                            'Enter email addresses, separated by commas:', key='email_live'
                         )
 
                         if st.button('Send Data', key='send_live'):
                             if email_input:
-                                success = send_dataset_email(
+                                message_ids = queue_dataset_email(
                                     email_input,
                                     file_options.get(selected_file_id, "dataset"),
                                     df
                                 )
-                                if success:
-                                    st.success(f"Data sent to {email_input}!")
-                                else:
-                                    st.error("Failed to send email.")
+                                if message_ids:
+                                    st.session_state.email_live_messages = message_ids
                             else:
                                 st.warning('Please enter an email address.')
                                 logger.error(
@@ -275,6 +311,8 @@ def render_home_page() -> None:
                                         'details': 'No email address provided',
                                     },
                                 )
+                        if st.session_state.get('email_live_messages'):
+                            render_email_status(st.session_state.email_live_messages)
                     else:
                         st.error('No data found in the selected dataset.')
             with col2:
@@ -315,6 +353,7 @@ def render_home_page() -> None:
 
         st.subheader('Search Data')
         global_search = st.text_input('Search across all datasets:', key='global_search_home')
+        st.caption('Words match as prefixes; put text in "double quotes" to match an exact phrase.')
         if global_search:
             results = search_csv_data(global_search)
             if results:
@@ -359,13 +398,18 @@ def render_home_page() -> None:
         st.subheader('Live Terminal Logs')
         st.markdown('View live logs in a terminal-like interface.')
         log_placeholder = st.empty()
-        for _ in range(60):
-            logs = memory_handler.get_logs()
-            log_text = '\n'.join(logs[-20:])
-            log_placeholder.markdown(
-                f'<div class="terminal-log">{log_text}</div>',
-                unsafe_allow_html=True,
-            )
+        log_lines: Deque[str] = deque(maxlen=20)
+        cursor = max(memory_handler.sequence - log_lines.maxlen, 0)
+        for tick in range(60):
+            # Fetch only the logs emitted since the last tick and redraw when there are any
+            new_logs, cursor = memory_handler.get_logs(since=cursor)
+            if new_logs or tick == 0:
+                log_lines.extend(new_logs)
+                log_text = '\n'.join(log_lines)
+                log_placeholder.markdown(
+                    f'<div class="terminal-log">{log_text}</div>',
+                    unsafe_allow_html=True,
+                )
             time.sleep(1)
 
     st.subheader('System Performance Metrics')
@@ -373,12 +417,23 @@ def render_home_page() -> None:
     for _ in range(60):
         cpu_usage = psutil.cpu_percent(interval=1)
         memory_usage = psutil.virtual_memory().percent
+        cache_stats = dataset_cache.stats()
         with placeholder.container():
-            col1, col2 = st.columns(2)
+            col1, col2, col3 = st.columns(3)
             with col1:
                 st.metric('CPU Usage', f'{cpu_usage}%')
             with col2:
                 st.metric('Memory Usage', f'{memory_usage}%')
+            with col3:
+                st.metric(
+                    'Dataset Cache Hit Rate',
+                    f'{cache_stats.hit_rate:.0%}',
+                    help=(
+                        f'{cache_stats.hits} hits, {cache_stats.misses} misses, '
+                        f'{cache_stats.evictions} evictions; {cache_stats.entries} entries using '
+                        f'{cache_stats.bytes / 2**20:.1f} of {cache_stats.max_bytes / 2**20:.0f} MB'
+                    ),
+                )
 
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -9,6 +9,7 @@ def render_search_data_page() -> None:
     st.header('Search Data')
     st.subheader('Search across all datasets')
     global_search = st.text_input('Search across all datasets:', key='global_search')
+    st.caption('Words match as prefixes; put text in "double quotes" to match an exact phrase.')
     if global_search:
         results = search_csv_data(global_search)
         if results:
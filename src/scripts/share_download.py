@@ -1,8 +1,15 @@
-import io
-import pandas as pd
 import streamlit as st
 
-from src.utils import cached_get_files, cached_get_csv_preview, send_dataset_email, logger
+from src.utils import (
+    cached_get_csv_preview,
+    cached_get_dataset,
+    cached_get_files,
+    logger,
+    queue_dataset_email,
+    render_download_button,
+    render_email_status,
+    render_stream_export,
+)
 
 def render_share_data_page() -> None:
     """Render the Share Data page for emailing datasets."""
@@ -21,19 +28,17 @@ def render_share_data_page() -> None:
         if selected_file_id:
             df = cached_get_csv_preview(selected_file_id)
             if not df.empty:
-                email_input = st.text_input('Enter your email address:', key='email_share')
+                email_input = st.text_input('Enter email addresses, separated by commas:', key='email_share')
                 
                 if st.button('Send Data', key='send_share'):
                     if email_input:
-                        success = send_dataset_email(
+                        message_ids = queue_dataset_email(
                             email_input,
                             file_options[selected_file_id],
                             df
                         )
-                        if success:
-                            st.success(f"Data sent to {email_input}!")
-                        else:
-                            st.error("Failed to send email.")
+                        if message_ids:
+                            st.session_state.email_share_messages = message_ids
                     else:
                         st.warning('Please enter an email address.')
                         logger.error(
@@ -44,6 +49,8 @@ def render_share_data_page() -> None:
                                 'details': 'No email address provided',
                             },
                         )
+                if st.session_state.get('email_share_messages'):
+                    render_email_status(st.session_state.email_share_messages)
             else:
                 st.error('No data found in the selected dataset.')
     else:
@@ -65,84 +72,31 @@ def render_download_data_page() -> None:
             key='download_select',
         )
         if selected_file_id:
-            df = cached_get_csv_preview(selected_file_id)
-            if not df.empty:
+            if cached_get_dataset(selected_file_id).num_rows:
+                filename = file_options[selected_file_id]
                 col_dl1, col_dl2 = st.columns(2)
                 col_dl3, col_dl4 = st.columns(2)
                 with col_dl1:
-                    csv_data = df.to_csv(index=False).encode('utf-8')
-                    if st.download_button(
-                        label='Download CSV',
-                        data=csv_data,
-                        file_name=f'{file_options[selected_file_id]}.csv',
-                        mime='text/csv',
-                        key='download_csv_live',
-                    ):
-                        logger.info(
-                            'CSV Downloaded',
-                            extra={
-                                'username': st.session_state.username or 'Anonymous',
-                                'action': 'download_csv',
-                                'details': f'Downloaded: {file_options[selected_file_id]}.csv',
-                            },
-                        )
+                    render_download_button(
+                        selected_file_id, filename, 'csv', key='download_csv_live', action='download_csv'
+                    )
                 with col_dl2:
-                    parquet_buffer = io.BytesIO()
-                    df.to_parquet(parquet_buffer, engine='pyarrow', index=False)
-                    parquet_data = parquet_buffer.getvalue()
-                    if st.download_button(
-                        label='Download Parquet',
-                        data=parquet_data,
-                        file_name=f'{file_options.get(selected_file_id, "dataset")}.parquet',
-                        mime='application/octet-stream',
-                        key='download_parquet_live',
-                    ):
-                        logger.info(
-                            'Parquet Downloaded',
-                            extra={
-                                'username': st.session_state.username or 'Anonymous',
-                                'action': 'download_parquet',
-                                'details': f'Downloaded: {file_options.get(selected_file_id, "dataset")}.parquet',
-                            },
-                        )
+                    render_download_button(
+                        selected_file_id, filename, 'parquet',
+                        key='download_parquet_live', action='download_parquet',
+                    )
                 with col_dl3:
-                    json_data=df.to_json(orient='records', indent=2).encode('utf-8')
-                    if st.download_button(
-                        label='Download JSON',
-                        data=json_data,
-                        file_name=f'{file_options.get(selected_file_id, "dataset")}.json',
-                        mime='application/json',
-                        key='download_json_live',
-                    ):
-                        logger.info(
-                            'JSON Downloaded',
-                            extra={
-                                'username': st.session_state.username or 'Anonymous',
-                                'action': 'download_json',
-                                'details': f'Downloaded: {file_options.get(selected_file_id, "dataset")}.json',
-                            },
-                        )
+                    render_download_button(
+                        selected_file_id, filename, 'json', key='download_json_live', action='download_json'
+                    )
                 with col_dl4:
-                    excel_buffer = io.BytesIO()
-                    with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-                        df.to_excel(writer, index=False)
-                    excel_data = excel_buffer.getvalue()
-                    if st.download_button(
-                        label='Download Excel',
-                        data=excel_data,
-                        file_name=f'{file_options.get(selected_file_id, "dataset")}.xlsx',
-                        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                        key='download_excel_live',
-                    ):
-                        logger.info(
-                            'Excel Downloaded',
-                            extra={
-                                'username': st.session_state.username or 'Anonymous',
-                                'action': 'download_excel',
-                                'details': f'Downloaded: {file_options.get(selected_file_id, "dataset")}.xlsx',
-                            },
-                        )
-                    
+                    render_download_button(
+                        selected_file_id, filename, 'excel',
+                        key='download_excel_live', action='download_excel',
+                    )
+
+                st.subheader('Export Large Dataset')
+                render_stream_export(selected_file_id, filename, key='stream_export')
             else:
                 st.error('No data found in the selected dataset.')
     else:
@@ -1,8 +1,14 @@
+from typing import List, Optional, Tuple
+
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
-from src.utils import cached_get_files, cached_get_csv_preview
+from src.datastore.column_types import FLOAT, INT
+from src.datastore.engines import AGGREGATIONS, FILTER_OPS
+from src.utils import (
+    cached_aggregate_csv_data, cached_get_column_types, cached_get_files, cached_query_csv_rows
+)
 
 def render_visualize_data_page() -> None:
     """Render the Visualize Data page for exploring data visualizations."""
@@ -19,9 +25,10 @@ def render_visualize_data_page() -> None:
             key='visualize_select',
         )
         if selected_file_id:
-            df = cached_get_csv_preview(selected_file_id)
-            if not df.empty:
-                numerical_cols = df.select_dtypes(include=['number']).columns
+            column_types = cached_get_column_types(selected_file_id)
+            if column_types:
+                # Only the plotted columns are read, so pick them from the recorded types
+                numerical_cols = [name for name, logical_type in column_types if logical_type in (INT, FLOAT)]
                 if len(numerical_cols) > 1:
                     x_axis = st.selectbox(
                         'Select X-Axis:', numerical_cols, index=1, key='x_axis'
@@ -29,14 +36,63 @@ def render_visualize_data_page() -> None:
                     y_axis = st.selectbox(
                         'Select Y-Axis:', numerical_cols, index=0, key='y_axis'
                     )
-                    fig = px.scatter(df, x=x_axis, y=y_axis, title=f'{x_axis} vs {y_axis}')
-                    st.plotly_chart(fig, use_container_width=True)
+                    filters = []
+                    with st.expander('Filter rows'):
+                        filter_col = st.selectbox(
+                            'Column:', ['None'] + [name for name, _ in column_types], key='filter_col'
+                        )
+                        filter_op = st.selectbox('Condition:', FILTER_OPS, key='filter_op')
+                        filter_value = st.text_input('Value:', key='filter_value')
+                        if filter_col != 'None' and filter_value:
+                            filters.append((filter_col, filter_op, filter_value))
+                    try:
+                        df = cached_query_csv_rows(
+                            selected_file_id, tuple(dict.fromkeys([x_axis, y_axis])), tuple(filters)
+                        )
+                    except ValueError:
+                        st.error('The filter value does not match the type of the column.')
+                        df = pd.DataFrame()
+                    if not df.empty:
+                        fig = px.scatter(df, x=x_axis, y=y_axis, title=f'{x_axis} vs {y_axis}')
+                        st.plotly_chart(fig, use_container_width=True)
+                    elif filters:
+                        st.info('No rows match the filter.')
                 elif len(numerical_cols) == 1:
                     st.warning('Only one numerical column was found; cannot plot.')
                 else:
                     st.warning('No numerical columns found for visualization.')
+                render_summary(selected_file_id, column_types, numerical_cols)
             else:
                 st.error('No data found in the selected dataset.')
     else:
         st.warning('No datasets uploaded yet.')
     st.markdown('</div>', unsafe_allow_html=True)
+
+def render_summary(file_id: int, column_types: List[Tuple[str, Optional[str]]], numerical_cols: List[str]) -> None:
+    """Render a grouped summary of a dataset computed by the datastore.
+
+    Args:
+        file_id (int): ID of the dataset to summarize.
+        column_types (List[Tuple[str, Optional[str]]]): Display names and logical types of its columns.
+        numerical_cols (List[str]): Display names of its numerical columns.
+    """
+    st.subheader('Summarize data')
+    group_col = st.selectbox('Group by:', [name for name, _ in column_types], key='summary_group')
+    func = st.selectbox('Statistic:', AGGREGATIONS, key='summary_func')
+    if func in ('sum', 'mean'):
+        value_cols = numerical_cols
+    elif func == 'count':
+        value_cols = ['All rows'] + [name for name, _ in column_types]
+    else:
+        value_cols = [name for name, _ in column_types]
+    if not value_cols:
+        st.warning('No numerical columns found to summarize.')
+        return
+    value_col = st.selectbox('Of column:', value_cols, key='summary_value')
+    summary = cached_aggregate_csv_data(
+        file_id, (group_col,), ((func, None if value_col == 'All rows' else value_col),)
+    )
+    st.dataframe(summary, use_container_width=True, hide_index=True)
+    if len(summary) > 1 and pd.api.types.is_numeric_dtype(summary.iloc[:, 1]):
+        fig = px.bar(summary, x=summary.columns[0], y=summary.columns[1])
+        st.plotly_chart(fig, use_container_width=True)
@@ -1,11 +1,14 @@
 import base64
-import io
+import itertools
 import logging
+import math
 import os
 import re
-import requests
+import sqlite3
+import time
+from collections import deque
 from logging.handlers import TimedRotatingFileHandler
-from typing import List, Tuple
+from typing import Any, Deque, List, Optional, Tuple
 
 import pandas as pd
 import streamlit as st
@@ -14,24 +17,49 @@ from pandas import DataFrame
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Attachment, Disposition, FileContent, FileName, FileType
 
+from src.datastore import outbox
+from src.datastore.cache import DatasetHandle, LRUCache
+from src.datastore.exports import (
+    EXPORT_FORMATS, STREAM_FORMATS, email_attachments, export_dataset, stream_file_name
+)
+
 # Custom MemoryHandler for live log display
 class MemoryHandler(logging.Handler):
-    """Store logs in memory for live display in Streamlit."""
+    """Store the most recent logs in memory for live display in Streamlit.
+
+    Logs are kept in a ring buffer of fixed capacity and numbered in the order they were
+    emitted, so a live view can ask for only the logs emitted since it last looked.
+    """
 
     def __init__(self, capacity: int = 1000) -> None:
         super().__init__()
         self.capacity = capacity
-        self.logs: List[str] = []
+        self.logs: Deque[str] = deque(maxlen=capacity)
+        # Sequence number the next log will get
+        self.sequence = 0
         self.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 
     def emit(self, record: logging.LogRecord) -> None:
+        # Handler.handle holds self.lock while emitting
         log_entry = self.format(record)
-        self.logs.append(log_entry)
-        if len(self.logs) > self.capacity:
-            self.logs.pop(0)  # Remove oldest log
+        self.logs.append(log_entry)  # The oldest log drops out once full
+        self.sequence += 1
+
+    def get_logs(self, since: int = 0) -> Tuple[List[str], int]:
+        """Return the logs emitted since a cursor.
+
+        Args:
+            since (int): Sequence number of the first log wanted, usually the cursor
+                returned by the previous call. Logs that already dropped out of the
+                buffer are skipped.
 
-    def get_logs(self) -> List[str]:
-        return self.logs
+        Returns:
+            Tuple[List[str], int]: The logs, oldest first, and the cursor to pass next time.
+        """
+        with self.lock:
+            first = self.sequence - len(self.logs)
+            logs = list(itertools.islice(self.logs, max(since - first, 0), None))
+            return logs, self.sequence
 
 # CSV formatter for file logs
 class CSVFormatter(logging.Formatter):
@@ -115,55 +143,353 @@ def get_secret(key: str, default: str) -> str:
         return default
     return os.getenv(key, default)
 
-@st.cache_data
+# Largest estimated size of the dataset listings and handles kept in memory
+CACHE_MAX_BYTES: int = int(os.getenv('CACHE_MAX_BYTES', str(256 * 2**20)))
+
+# Listings and dataset handles shared by all sessions, keyed by the version they were read at
+dataset_cache = LRUCache(CACHE_MAX_BYTES)
+
+# Largest total size of the generated export files kept in memory
+EXPORT_CACHE_MAX_BYTES: int = int(os.getenv('EXPORT_CACHE_MAX_BYTES', str(128 * 2**20)))
+
+# Generated export files by (file ID, format), keyed by the file version they were built at
+export_cache = LRUCache(EXPORT_CACHE_MAX_BYTES, sizeof=len)
+
 def cached_get_files() -> List[Tuple[int, str, int, str, datetime]]:
     """Retrieve cached file metadata from the database.
 
+    The listing is read again after any write to the datastore.
+
     Returns:
         List[Tuple[int, str, int, str, datetime]]: List of file metadata tuples.
     """
-    from src.datastore.database import get_files
-    return get_files()
+    from src.datastore.database import get_files, get_generation
+    return list(dataset_cache.get_or_load('files', get_generation(), get_files))
+
+def cached_get_catalog(
+    category: Optional[str] = None, major: Optional[str] = None, fetch_date: Optional[str] = None
+) -> List[Tuple[int, str, int, str, datetime, Optional[str], Optional[str], Optional[str], Optional[str]]]:
+    """Retrieve cached metadata of the files matching catalog filters.
+
+    The catalog is read again after any write to the datastore.
+
+    Args:
+        category (Optional[str]): Category to match; None for any.
+        major (Optional[str]): Major to match; None for any.
+        fetch_date (Optional[str]): ISO fetch date to match; None for any.
+
+    Returns:
+        List[Tuple[int, str, int, str, datetime, Optional[str], Optional[str], Optional[str],
+            Optional[str]]]: Catalog entries, newest fetch first.
+    """
+    from src.datastore.database import get_catalog, get_generation
+    return list(dataset_cache.get_or_load(
+        ('catalog', category, major, fetch_date), get_generation(),
+        lambda: get_catalog(category, major, fetch_date),
+    ))
+
+def cached_get_dataset(file_id: int) -> DatasetHandle:
+    """Retrieve the shared read-only handle on a file's formatted rows.
+
+    Every session gets the same handle until the file is written to.
+
+    Args:
+        file_id (int): ID of the file.
+
+    Returns:
+        DatasetHandle: Handle holding the rows as an Arrow table and a DataFrame.
+    """
+    from src.datastore.database import get_csv_table, get_file_version
+    return dataset_cache.get_or_load(
+        ('dataset', file_id), get_file_version(file_id), lambda: DatasetHandle(get_csv_table(file_id))
+    )
 
-@st.cache_data
 def cached_get_csv_preview(file_id: int) -> DataFrame:
     """Retrieve cached CSV data preview for a file.
 
+    The frame is shared by every session without copying and must not be modified;
+    take a copy to change it.
+
     Args:
         file_id (int): ID of the file to preview.
 
     Returns:
         DataFrame: Preview DataFrame or empty if no data.
     """
-    from src.datastore.database import get_csv_preview
-    return get_csv_preview(file_id)
+    return cached_get_dataset(file_id).frame
+
+def cached_get_row_count(file_id: int) -> int:
+    """Retrieve the cached row count of a file.
+
+    Args:
+        file_id (int): ID of the file.
+
+    Returns:
+        int: Number of rows in the file.
+    """
+    from src.datastore.database import get_file_version, get_row_count
+    return dataset_cache.get_or_load(
+        ('row_count', file_id), get_file_version(file_id), lambda: get_row_count(file_id)
+    )
+
+def cached_get_csv_rows(file_id: int, offset: int, limit: int) -> DataFrame:
+    """Retrieve a cached window of rows from a file.
+
+    Args:
+        file_id (int): ID of the file to read.
+        offset (int): Number of rows to skip.
+        limit (int): Maximum number of rows to return.
+
+    Returns:
+        DataFrame: Formatted rows indexed by their stored row number.
+    """
+    from src.datastore.database import get_csv_rows, get_file_version
+    return dataset_cache.get_or_load(
+        ('rows', file_id, offset, limit), get_file_version(file_id),
+        lambda: get_csv_rows(file_id, offset, limit),
+    ).copy()
+
+def cached_get_column_types(file_id: int) -> List[Tuple[str, Optional[str]]]:
+    """Retrieve the cached display names and logical types of a file's columns.
+
+    Args:
+        file_id (int): ID of the file.
 
-def send_dataset_email(email: str, filename: str, df: DataFrame) -> bool:
-    """Send a dataset as a CSV attachment via email using SendGrid.
+    Returns:
+        List[Tuple[str, Optional[str]]]: (display name, logical type) pairs in column order.
+    """
+    from src.datastore.database import get_column_types, get_file_version
+    return list(dataset_cache.get_or_load(
+        ('column_types', file_id), get_file_version(file_id), lambda: get_column_types(file_id)
+    ))
+
+def cached_query_csv_rows(
+    file_id: int, columns: Tuple[str, ...], filters: Tuple[Tuple[str, str, Any], ...] = ()
+) -> DataFrame:
+    """Retrieve cached rows of selected columns that match the given filters.
+
+    Args:
+        file_id (int): ID of the file to read.
+        columns (Tuple[str, ...]): Display names of the columns to load.
+        filters (Tuple[Tuple[str, str, Any], ...]): (column, operator, value) conditions.
+
+    Returns:
+        DataFrame: Formatted rows indexed by their stored row number.
+    """
+    from src.datastore.database import get_csv_rows, get_file_version
+    return dataset_cache.get_or_load(
+        ('query', file_id, columns, filters), get_file_version(file_id),
+        lambda: get_csv_rows(file_id, columns=list(columns), filters=list(filters)),
+    ).copy()
+
+def cached_aggregate_csv_data(
+    file_id: int,
+    group_by: Tuple[str, ...],
+    aggregations: Tuple[Tuple[str, Optional[str]], ...],
+    filters: Tuple[Tuple[str, str, Any], ...] = (),
+) -> DataFrame:
+    """Retrieve cached grouped aggregates of a file.
 
     Args:
-        email (str): Recipient email address.
+        file_id (int): ID of the file to aggregate.
+        group_by (Tuple[str, ...]): Display names of the grouping columns.
+        aggregations (Tuple[Tuple[str, Optional[str]], ...]): (function, column) pairs.
+        filters (Tuple[Tuple[str, str, Any], ...]): (column, operator, value) conditions.
+
+    Returns:
+        DataFrame: One row per group followed by one column per aggregate.
+    """
+    from src.datastore.database import aggregate_csv_data, get_file_version
+    return dataset_cache.get_or_load(
+        ('aggregate', file_id, group_by, aggregations, filters), get_file_version(file_id),
+        lambda: aggregate_csv_data(file_id, list(group_by), list(aggregations), list(filters)),
+    ).copy()
+
+def cached_export(file_id: int, export_format: str) -> bytes:
+    """Retrieve a file exported in a download format, generating it on first request.
+
+    Args:
+        file_id (int): ID of the file to export.
+        export_format (str): One of the exports.EXPORT_FORMATS names.
+
+    Returns:
+        bytes: Content of the exported file.
+    """
+    from src.datastore.database import get_file_version
+    return export_cache.get_or_load(
+        (file_id, export_format), get_file_version(file_id),
+        lambda: export_dataset(cached_get_dataset(file_id), export_format),
+    )
+
+def render_download_button(file_id: int, filename: str, export_format: str, key: str, action: str) -> None:
+    """Render a download button for a file whose export is only generated on request.
+
+    Until the export is cached for the file's current version, a button to prepare it is
+    shown instead, so viewing a page does not serialize the dataset.
+
+    Args:
+        file_id (int): ID of the file to export.
+        filename (str): Name of the dataset, used for the downloaded file.
+        export_format (str): One of the exports.EXPORT_FORMATS names.
+        key (str): Widget key of the download button, unique per page section.
+        action (str): Action recorded in the log when the file is downloaded.
+    """
+    from src.datastore.database import get_file_version
+    export = EXPORT_FORMATS[export_format]
+    if not export_cache.contains((file_id, export_format), get_file_version(file_id)):
+        if not st.button(f'Prepare {export.label}', key=f'{key}_prepare'):
+            return
+    if st.download_button(
+        label=f'Download {export.label}',
+        data=cached_export(file_id, export_format),
+        file_name=f'{filename}.{export.extension}',
+        mime=export.mime,
+        key=key,
+    ):
+        logger.info(
+            f'{export.label} Downloaded',
+            extra={
+                'username': st.session_state.username or 'Anonymous',
+                'action': action,
+                'details': f'Downloaded: {filename}.{export.extension}',
+            },
+        )
+
+def render_stream_export(file_id: int, filename: str, key: str) -> None:
+    """Render controls that stream a whole dataset to a file and offer it for download.
+
+    The export is written chunk by chunk to a temporary file, which replaces the
+    session's previous export.
+
+    Args:
+        file_id (int): ID of the file to export.
+        filename (str): Name of the dataset, used for the downloaded file.
+        key (str): Prefix for the widget keys, unique per page section.
+    """
+    from src.datastore.database import export_csv_data
+    col1, col2 = st.columns(2)
+    with col1:
+        export_format = st.selectbox(
+            'Format:', list(STREAM_FORMATS), format_func=lambda name: STREAM_FORMATS[name].label,
+            key=f'{key}_format',
+        )
+    with col2:
+        compress = st.checkbox('Compress (gzip)', key=f'{key}_gzip')
+    download_name = stream_file_name(filename, export_format, compress)
+    mime = 'application/gzip' if download_name.endswith('.gz') else STREAM_FORMATS[export_format].mime
+
+    previous = st.session_state.get(f'{key}_file')
+    if st.button('Export', key=f'{key}_start'):
+        with st.spinner(f'Exporting {download_name}...'):
+            path = export_csv_data(file_id, export_format, compress)
+        if previous and os.path.exists(previous[0]):
+            os.remove(previous[0])
+        previous = (path, file_id, download_name) if path else None
+        st.session_state[f'{key}_file'] = previous
+    if previous and previous[1:] == (file_id, download_name) and os.path.exists(previous[0]):
+        with open(previous[0], 'rb') as export_file:
+            if st.download_button(
+                label=f'Download {download_name}',
+                data=export_file,
+                file_name=download_name,
+                mime=mime,
+                key=f'{key}_download',
+            ):
+                logger.info(
+                    'Export Downloaded',
+                    extra={
+                        'username': st.session_state.username or 'Anonymous',
+                        'action': f'download_{export_format}_stream',
+                        'details': f'Downloaded: {download_name}',
+                    },
+                )
+
+# Page sizes offered when browsing a dataset
+PAGE_SIZES: List[int] = [50, 100, 500, 1000]
+
+def select_page(row_count: int, key: str) -> Tuple[int, int]:
+    """Render paging controls for a dataset and return the selected row window.
+
+    Args:
+        row_count (int): Total number of rows in the dataset.
+        key (str): Prefix for the widget keys, unique per page section.
+
+    Returns:
+        Tuple[int, int]: The (offset, limit) of the selected page.
+    """
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox('Rows per page:', PAGE_SIZES, index=1, key=f'{key}_page_size')
+    pages = max(1, math.ceil(row_count / page_size))
+    if st.session_state.get(f'{key}_page', 1) > pages:
+        st.session_state[f'{key}_page'] = pages
+    with col2:
+        page = st.number_input(
+            f'Page (of {pages}):', min_value=1, max_value=pages, step=1, key=f'{key}_page'
+        )
+    return (int(page) - 1) * page_size, page_size
+
+def _outbox_connection():
+    from src.datastore.database import get_connection
+    return get_connection()
+
+# Dataset emails waiting to be sent; the API key is read when a message goes out
+email_outbox = outbox.Outbox(_outbox_connection, lambda: get_secret('SENDGRID_API_KEY', ''))
+
+@st.cache_resource
+def resume_email_outbox() -> None:
+    """Resume sending emails queued before the server restarted, once per process."""
+    email_outbox.schedule()
+
+# SendGrid's limit on a whole message, attachments included after base64 encoding
+SENDGRID_MAX_MESSAGE_BYTES: int = int(os.getenv('SENDGRID_MAX_MESSAGE_BYTES', str(30 * 10**6)))
+
+# SendGrid's limit on personalizations, and so on recipients, in one request
+SENDGRID_MAX_PERSONALIZATIONS: int = 1000
+
+def parse_recipients(emails: str) -> List[str]:
+    """Split a list of email addresses separated by commas, semicolons or whitespace.
+
+    Args:
+        emails (str): The addresses as entered.
+
+    Returns:
+        List[str]: The distinct addresses, in the order entered.
+    """
+    return list(dict.fromkeys(email for email in re.split(r'[,;\s]+', emails) if email))
+
+def queue_dataset_email(emails: str, filename: str, df: DataFrame) -> List[int]:
+    """Queue a dataset as a compressed attachment for sending via email using SendGrid.
+
+    Every recipient gets their own personalization, so many recipients share one request.
+    A dataset too large for one message is split into several attachments, each sent in
+    its own message. The emails are sent and retried in the background;
+    render_email_status shows their progress.
+
+    Args:
+        emails (str): Recipient email addresses, separated by commas or semicolons.
         filename (str): Name of the dataset file.
         df (DataFrame): DataFrame containing the dataset.
 
     Returns:
-        bool: True if the email was sent successfully, False otherwise.
+        List[int]: IDs of the queued messages; empty if nothing could be queued.
     """
+    recipients = parse_recipients(emails)
     email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_regex, email):
-        st.error(f'Invalid email address format: {email}')
+    invalid = [email for email in recipients if not re.match(email_regex, email)]
+    if invalid or not recipients:
+        st.error(f'Invalid email address format: {", ".join(invalid) or emails}')
         logger.error(
             'Email Share Failed',
             extra={
                 'username': st.session_state.username or 'Anonymous',
                 'action': 'email_share',
-                'details': f'Invalid email format: {email}',
+                'details': f'Invalid email format: {", ".join(invalid) or emails}',
             },
         )
-        return False
+        return []
 
-    api_key = get_secret('SENDGRID_API_KEY', '')
-    if not api_key:
+    if not get_secret('SENDGRID_API_KEY', ''):
         st.error("SendGrid API key not found in environment variables. Please set SENDGRID_API_KEY or SENDGRID_API_KEY_PART1, SENDGRID_API_KEY_PART2, and SENDGRID_API_KEY_PART3 in .env.")
         logger.error(
             'Email Share Failed',
@@ -173,95 +499,60 @@ def send_dataset_email(email: str, filename: str, df: DataFrame) -> bool:
                 'details': 'No SendGrid API key found in environment variables',
             },
         )
-        return False
-
-    from_email = get_secret('FROM_EMAIL', 'default@example.com')
-    logger.info(f"Attempting to send email to {email} from {from_email} with dataset {filename}")
-
-    try:
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_data = csv_buffer.getvalue().encode('utf-8')
-        encoded_file = base64.b64encode(csv_data).decode()
-
-        email_data = {
-            "personalizations": [{"to": [{"email": email}]}],
-            "from": {"email": from_email},
-            "subject": f"LSU Datastore: {filename} Data",
-            "content": [
-                {
-                    "type": "text/html",
-                    "value": f"<p>Attached is the data from {filename} as viewed on the LSU Datastore Dashboard.</p>",
-                }
-            ],
-            "attachments": [
-                {
-                    "content": encoded_file,
-                    "filename": filename,
-                    "type": "text/csv",
-                    "disposition": "attachment",
-                }
-            ],
-        }
-
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
-        logger.debug(f"Sending email with headers: {headers} and data: {email_data}")
-        try:
-            response = requests.post(
-                "https://api.sendgrid.com/v3/mail/send",
-                json=email_data,
-                headers=headers,
-            )
-            response.raise_for_status()
-            logger.info(f"Email sent successfully. Status code: {response.status_code}")
-        except requests.exceptions.SSLError as ssl_err:
-            st.warning(
-                "SSL certificate verification failed. Retrying with SSL verification disabled. "
-                "This is less secure and should be fixed by updating your system's CA certificates "
-                "or configuring your network proxy certificates."
-            )
-            logger.warning(
-                'SSL Verification Failed - Retrying with Disabled Verification',
-                extra={
-                    'username': st.session_state.username or 'Anonymous',
-                    'action': 'email_share',
-                    'details': f'SSL error: {str(ssl_err)}, retrying without verification',
-                },
-            )
-            response = requests.post(
-                "https://api.sendgrid.com/v3/mail/send",
-                json=email_data,
-                headers=headers,
-                verify=False,
-            )
-            response.raise_for_status()
-            logger.info(f"Email sent successfully with disabled SSL verification. Status code: {response.status_code}")
-
-        if response.status_code == 202:
-            logger.info(
-                'Email Share Success',
-                extra={
-                    'username': st.session_state.username or 'Anonymous',
-                    'action': 'email_share',
-                    'details': f'Sent to: {email}, Dataset: {filename}',
-                },
-            )
-            return True
-        st.error(f'Failed to send email. Status code: {response.status_code}, Response: {response.text}')
+        return []
+
+    # Base64 grows attachments by a third; leave room for the rest of the message
+    max_bytes = (SENDGRID_MAX_MESSAGE_BYTES - 2**16) * 3 // 4
+    attachments = email_attachments(df, filename, max_bytes)
+    largest = max(len(attachment.content) for attachment in attachments)
+    if largest > max_bytes:
+        st.error(f'{filename} is too large to send by email; download it instead.')
         logger.error(
             'Email Share Failed',
             extra={
                 'username': st.session_state.username or 'Anonymous',
                 'action': 'email_share',
-                'details': f'Failed, Status code: {response.status_code}, Response: {response.text}, Dataset: {filename}',
+                'details': f'Attachment of {largest} bytes over the limit, Dataset: {filename}',
             },
         )
-        return False
-    except Exception as e:
-        st.error(f'Error sending email: {str(e)}')
+        return []
+    if len(attachments) > 1:
+        st.warning(
+            f'{filename} is too large for one email; it will arrive in {len(attachments)} '
+            f'emails of up to {largest / 2**20:.1f} MB each.'
+        )
+
+    from_email = get_secret('FROM_EMAIL', 'default@example.com')
+    message_ids = []
+    try:
+        for part, attachment in enumerate(attachments, start=1):
+            subject = f"LSU Datastore: {filename} Data"
+            if len(attachments) > 1:
+                subject += f" (part {part} of {len(attachments)})"
+            for start in range(0, len(recipients), SENDGRID_MAX_PERSONALIZATIONS):
+                batch = recipients[start:start + SENDGRID_MAX_PERSONALIZATIONS]
+                email_data = {
+                    "personalizations": [{"to": [{"email": email}]} for email in batch],
+                    "from": {"email": from_email},
+                    "subject": subject,
+                    "content": [
+                        {
+                            "type": "text/html",
+                            "value": f"<p>Attached is the data from {filename} as viewed on the LSU Datastore Dashboard.</p>",
+                        }
+                    ],
+                    "attachments": [
+                        {
+                            "content": base64.b64encode(attachment.content).decode(),
+                            "filename": attachment.filename,
+                            "type": attachment.mime,
+                            "disposition": "attachment",
+                        }
+                    ],
+                }
+                message_ids.append(email_outbox.enqueue(', '.join(batch), email_data))
+    except sqlite3.Error as e:
+        st.error(f'Error queueing email: {str(e)}')
         logger.error(
             'Email Share Error',
             extra={
@@ -270,4 +561,55 @@ def send_dataset_email(email: str, filename: str, df: DataFrame) -> bool:
                 'details': f'Error: {str(e)}, Dataset: {filename}',
             },
         )
-        return False
+        return message_ids
+    logger.info(
+        'Email Share Queued',
+        extra={
+            'username': st.session_state.username or 'Anonymous',
+            'action': 'email_share',
+            'details': f'Queued for: {", ".join(recipients)} from {from_email}, Dataset: {filename}, '
+                       f'Attachments: {", ".join(attachment.filename for attachment in attachments)}, '
+                       f'Messages: {", ".join(map(str, message_ids))}',
+        },
+    )
+    return message_ids
+
+@st.fragment(run_every=2)
+def render_email_status(message_ids: List[int]) -> None:
+    """Show the delivery state of queued emails, refreshing every two seconds.
+
+    Args:
+        message_ids (List[int]): IDs of the messages returned by queue_dataset_email.
+    """
+    for message_id in message_ids:
+        message = email_outbox.status(message_id)
+        if message is None:
+            continue
+        if message.status == outbox.SENT:
+            st.success(f"Data sent to {message.recipient}!")
+        elif message.status == outbox.FAILED:
+            st.error(f'Failed to send email to {message.recipient}: {message.last_error}')
+        elif message.attempts:
+            retry_in = max(message.next_attempt_at - time.time(), 0)
+            st.warning(
+                f'Sending to {message.recipient} failed ({message.last_error}); '
+                f'retry {message.attempts} of {outbox.OUTBOX_MAX_ATTEMPTS - 1} in {retry_in:.0f}s.'
+            )
+        else:
+            st.info(f'Sending data to {message.recipient}...')
+
+        # Log the outcome once per session
+        finished = message.status in (outbox.SENT, outbox.FAILED)
+        logged = st.session_state.setdefault('email_logged', set())
+        if finished and message_id not in logged:
+            logged.add(message_id)
+            log = logger.info if message.status == outbox.SENT else logger.error
+            log(
+                'Email Share Success' if message.status == outbox.SENT else 'Email Share Failed',
+                extra={
+                    'username': st.session_state.get('username') or 'Anonymous',
+                    'action': 'email_share',
+                    'details': f'Sent to: {message.recipient}, Attempts: {message.attempts}'
+                    + (f', Error: {message.last_error}' if message.last_error else ''),
+                },
+            )
@@ -0,0 +1,821 @@
+import gzip
+import io
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from datastore import (
+    cache, catalog, database, engines, exports, ingest_queue, outbox, reclaim, retention, snapshots,
+)
+
+CSV_CONTENT : bytes = b"title,company,salary\nEngineer,Acme,100\nAnalyst,Globex,85\nIntern,Acme,emptyvalue\n"
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch) -> str:
+    """Point the database module at a fresh SQLite file."""
+    db_path = str(tmp_path / "test.db")
+    monkeypatch.setattr(database, "DB_NAME", db_path)
+    monkeypatch.setattr(database, "_ingest_queue", ingest_queue.IngestQueue(database.save_csv_to_database))
+    database.init_db()
+    yield db_path
+    database.wait_for_reclaim()
+
+
+def _save(filename: str = "jobs.csv", content: bytes = CSV_CONTENT) -> int:
+    database.save_csv_to_database(filename, content, len(content), "csv", 1)
+    return database.get_files()[0][0]
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_engines_round_trip(temp_db, monkeypatch, engine_name) -> None:
+    """Test that both storage engines preview, search, update and delete the same data."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    file_id = _save()
+
+    df = database.get_csv_preview(file_id)
+    assert list(df.columns) == ["Title", "Company", "Salary"]
+    assert df["Title"].tolist() == ["Engineer", "Analyst", "Intern"]
+    assert df["Salary"].tolist()[:2] == [100, 85]
+    assert df["Salary"].isna().tolist() == [False, False, True]
+
+    assert sorted((row, value) for _, row, _, value in database.search_csv_data("Acme")) == [
+        (0, "Acme"), (2, "Acme")
+    ]
+
+    database.update_csv_data(file_id, df.head(1))
+    assert database.get_csv_preview(file_id)["Title"].tolist() == ["Engineer"]
+
+    database.delete_file(file_id)
+    assert database.get_files() == []
+    assert database.search_csv_data("Engineer") == []
+
+
+def test_migrate_storage_engine(temp_db, monkeypatch) -> None:
+    """Test migrating EAV datasets to the columnar engine keeps their content."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", "eav")
+    file_id = _save()
+    before = database.get_csv_preview(file_id)
+
+    assert database.migrate_storage_engine("columnar") == 1
+    pd.testing.assert_frame_equal(database.get_csv_preview(file_id), before)
+    assert database.migrate_storage_engine("columnar") == 0
+
+
+def test_chunked_ingest_reports_stats(temp_db) -> None:
+    """Test that ingest in small chunks stores every row and reports throughput."""
+    content = b"id,name\n" + b"".join(f"{i},row{i}\n".encode() for i in range(25))
+    stats = database.save_csv_to_database("rows.csv", content, len(content), "csv", 1, chunk_size=7)
+
+    assert stats.rows == 25
+    assert stats.rows_per_second > 0
+    assert stats.peak_memory_bytes > 0
+    df = database.get_csv_preview(stats.file_id)
+    assert df["Id"].tolist() == list(range(25))
+
+
+def test_migrate_schema_is_versioned(temp_db) -> None:
+    """Test that init_db records the latest schema version and creates the indexes."""
+    conn = sqlite3.connect(temp_db)
+    assert database.get_schema_version(conn) == database.SCHEMA_MIGRATIONS[-1][0]
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT row_number, column_name, value FROM csv_data "
+        "WHERE file_id = 1 ORDER BY row_number"
+    ).fetchall()
+    assert "idx_csv_data_file_row" in str(plan)
+    assert database.migrate_schema(conn) == database.SCHEMA_MIGRATIONS[-1][0]
+    conn.close()
+
+
+def test_pooled_connections_use_wal(temp_db) -> None:
+    """Test that pooled connections are reused and configured with WAL and foreign keys."""
+    with database.get_connection() as conn:
+        first = conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    with database.get_connection() as conn:
+        assert conn is first
+
+
+def test_full_text_search_prefix_phrase_and_limit(temp_db) -> None:
+    """Test prefix and phrase queries against the full-text index and the result limit."""
+    content = b"title\nSoftware Engineer\nSenior Software Engineer\nEngineer Software\nData Analyst\n"
+    file_id = _save("jobs.csv", content)
+
+    assert {row for _, row, _, _ in database.search_csv_data("soft")} == {0, 1, 2}
+    assert {row for _, row, _, _ in database.search_csv_data('"software engineer"')} == {0, 1}
+    assert len(database.search_csv_data("engineer", limit=2)) == 2
+
+    database.update_csv_data(file_id, pd.DataFrame({"title": ["Data Analyst"]}))
+    assert database.search_csv_data("software") == []
+    assert database.search_csv_data("analyst") == [(file_id, 0, "title", "Data Analyst")]
+
+
+def test_search_limit_counts_visible_hits_only(temp_db, monkeypatch) -> None:
+    """Test that hits in deleted files awaiting reclaim do not use up the result limit."""
+    monkeypatch.setattr(database._reclaimer, "schedule", lambda: None)
+    hidden = _save("old.csv", b"title\n" + b"Analyst\n" * 6)
+    database.delete_file(hidden)
+    visible = _save("new.csv", b"title\nSenior Analyst\nJunior Analyst\nEngineer\n")
+
+    assert database.search_csv_data("analyst", limit=2) == [
+        (visible, 0, "title", "Senior Analyst"), (visible, 1, "title", "Junior Analyst")
+    ]
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_windowed_reads_with_projection(temp_db, monkeypatch, engine_name) -> None:
+    """Test reading a row range with column projection and counting rows without loading them."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    content = b"id,name,score\n" + b"".join(f"{i},row{i},{i * 10}\n".encode() for i in range(30))
+    file_id = _save("rows.csv", content)
+
+    assert database.get_row_count(file_id) == 30
+    page = database.get_csv_rows(file_id, offset=10, limit=5, columns=["Name", "score"])
+    assert list(page.columns) == ["Name", "Score"]
+    assert list(page.index) == [10, 11, 12, 13, 14]
+    assert page["Score"].tolist() == [100, 110, 120, 130, 140]
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_filtered_reads_are_pushed_down(temp_db, monkeypatch, engine_name) -> None:
+    """Test equality, range and substring filters combined with projection and windows."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    content = b"id,name,score,posted\n" + b"".join(
+        f"{i},{'Row' if i % 3 else 'Item'}_{i},{i * 10},2025-05-{i + 1:02d}\n".encode() for i in range(20)
+    ) + b"20,Row_20,emptyvalue,2025-05-21\n"
+    file_id = _save("filtered.csv", content)
+
+    # Numbers compare numerically, not as text, and missing values never match
+    df = database.get_csv_rows(file_id, columns=["Score"], filters=[("score", ">=", 150)])
+    assert list(df.columns) == ["Score"]
+    assert df["Score"].tolist() == [150, 160, 170, 180, 190]
+
+    df = database.get_csv_rows(
+        file_id, columns=["Id"], filters=[("Name", "contains", "item"), ("posted", "<", "2025-05-10")]
+    )
+    assert df["Id"].tolist() == [0, 3, 6]
+
+    page = database.get_csv_rows(file_id, offset=2, limit=2, filters=[("Name", "!=", "Item_0"), ("id", "<", 10)])
+    assert list(page.index) == [3, 4]
+    assert database.get_csv_rows(file_id, filters=[("name", "==", "Row_20")])["Id"].tolist() == [20]
+    assert database.get_csv_rows(file_id, filters=[("name", "contains", "%")]).empty
+
+    with pytest.raises(KeyError):
+        database.get_csv_rows(file_id, filters=[("missing", "==", 1)])
+    with pytest.raises(ValueError):
+        database.get_csv_rows(file_id, filters=[("id", "~", 1)])
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_aggregate_csv_data(temp_db, monkeypatch, engine_name) -> None:
+    """Test grouped aggregates computed by each engine, with missing values and filters."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    content = (
+        b"dept,course,open_seats,start\n"
+        b"CSC,1350,10,2025-01-13\nCSC,3380,5,2025-01-15\nMATH,1550,emptyvalue,2025-01-14\n"
+        b"MATH,1550,7,2025-01-20\nBIOL,1201,0,2025-01-13\nCSC,4101,3,2025-01-16\n"
+    )
+    file_id = _save("courses.csv", content)
+
+    df = database.aggregate_csv_data(
+        file_id,
+        group_by=["Dept"],
+        aggregations=[
+            ("count", None), ("sum", "open_seats"), ("mean", "Open Seats"), ("max", "start"), ("nunique", "course"),
+        ],
+    )
+    assert list(df.columns) == [
+        "Dept", "count", "sum(Open Seats)", "mean(Open Seats)", "max(Start)", "nunique(Course)"
+    ]
+    assert df["Dept"].tolist() == ["BIOL", "CSC", "MATH"]
+    assert df["count"].tolist() == [1, 3, 2]
+    assert df["sum(Open Seats)"].tolist() == [0, 18, 7]
+    assert df["mean(Open Seats)"].tolist() == [0.0, 6.0, 7.0]
+    assert df["max(Start)"].tolist() == [pd.Timestamp(d) for d in ["2025-01-13", "2025-01-16", "2025-01-20"]]
+    assert df["nunique(Course)"].tolist() == [1, 3, 1]
+
+    total = database.aggregate_csv_data(file_id, aggregations=[("count", "open_seats"), ("min", "open_seats")])
+    assert total.values.tolist() == [[5, 0]]
+    filtered = database.aggregate_csv_data(file_id, group_by=["dept"], filters=[("open_seats", ">", 4)])
+    assert filtered.values.tolist() == [["CSC", 2], ["MATH", 1]]
+    empty = database.aggregate_csv_data(file_id, filters=[("dept", "==", "PHYS")])
+    assert empty["count"].tolist() == [0]
+
+
+    with pytest.raises(ValueError):
+        database.aggregate_csv_data(file_id, aggregations=[("sum", "dept")])
+    with pytest.raises(ValueError):
+        database.aggregate_csv_data(file_id, aggregations=[("median", "open_seats")])
+    with pytest.raises(KeyError):
+        database.aggregate_csv_data(file_id, group_by=["missing"])
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_min_max_of_text_and_dates_skip_missing_values(temp_db, monkeypatch, engine_name) -> None:
+    """Test min and max over string and date columns that have missing values."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    content = (
+        b"name,grade,seen\nann,A,2025-01-13\nbob,emptyvalue,2025-01-20\n"
+        b"cat,B,emptyvalue\ndan,C,2025-01-15\n"
+    )
+    file_id = _save("grades.csv", content)
+    aggregations = [("min", "grade"), ("max", "grade"), ("min", "seen"), ("max", "seen")]
+
+    total = database.aggregate_csv_data(file_id, aggregations=aggregations)
+    assert total["min(Grade)"].tolist() == ["A"]
+    assert total["max(Grade)"].tolist() == ["C"]
+    assert total["min(Seen)"].tolist() == [pd.Timestamp("2025-01-13")]
+    assert total["max(Seen)"].tolist() == [pd.Timestamp("2025-01-20")]
+
+    grouped = database.aggregate_csv_data(file_id, group_by=["name"], aggregations=aggregations)
+    assert grouped["Name"].tolist() == ["ann", "bob", "cat", "dan"]
+    assert grouped["max(Grade)"].tolist()[::2] == ["A", "B"]
+    assert grouped["max(Grade)"].isna().tolist() == [False, True, False, False]
+    assert grouped["min(Seen)"].isna().tolist() == [False, False, True, False]
+    assert grouped["min(Seen)"].tolist()[3] == pd.Timestamp("2025-01-15")
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_patch_csv_data(temp_db, monkeypatch, engine_name) -> None:
+    """Test that cell edits, inserted rows and deleted rows are applied in place."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    file_id = _save()
+
+    database.patch_csv_data(
+        file_id,
+        changed_cells={0: {"Title": "Lead Engineer"}},
+        inserted_rows=[{"title": "Designer", "Company": "Initech", "salary": 90}],
+        deleted_rows=[1],
+    )
+
+    df = database.get_csv_rows(file_id)
+    assert list(df.index) == [0, 2, 3]
+    assert df["Title"].tolist() == ["Lead Engineer", "Intern", "Designer"]
+    assert database.get_row_count(file_id) == 3
+    assert [row for _, row, _, _ in database.search_csv_data("engineer")] == [0]
+    assert [row for _, row, _, _ in database.search_csv_data("initech")] == [3]
+    assert database.search_csv_data("analyst") == []
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_identical_content_is_deduplicated(temp_db, monkeypatch, engine_name) -> None:
+    """Test that identical uploads are skipped or linked and that edits and deletes stay isolated."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    first = database.save_csv_to_database("jobs_2025-05-01.csv", CSV_CONTENT, len(CSV_CONTENT), "csv", 1)
+    again = database.save_csv_to_database("jobs_2025-05-01.csv", CSV_CONTENT, len(CSV_CONTENT), "csv", 1)
+    second = database.save_csv_to_database("jobs_2025-05-02.csv", CSV_CONTENT, len(CSV_CONTENT), "csv", 1)
+    third = database.save_csv_to_database("jobs_2025-05-03.csv", CSV_CONTENT, len(CSV_CONTENT), "csv", 1)
+
+    assert (again.deduplicated, again.file_id) == ("skipped", first.file_id)
+    assert second.deduplicated == third.deduplicated == "linked"
+    assert len(database.get_files()) == 3
+    assert database.get_dedup_stats() == {
+        "linked_files": 2, "bytes_saved": 2 * len(CSV_CONTENT), "rows_saved": 6
+    }
+    pd.testing.assert_frame_equal(
+        database.get_csv_preview(second.file_id), database.get_csv_preview(first.file_id)
+    )
+
+    # Editing the owner hands the original rows to the linked files
+    database.patch_csv_data(first.file_id, changed_cells={0: {"Title": "Lead Engineer"}})
+    assert database.get_csv_preview(first.file_id)["Title"][0] == "Lead Engineer"
+    assert database.get_csv_preview(second.file_id)["Title"][0] == "Engineer"
+    assert database.get_csv_preview(third.file_id)["Title"][0] == "Engineer"
+
+    # Deleting the new owner hides it until its last linked file is gone
+    database.delete_file(second.file_id)
+    assert {file_id for file_id, *_ in database.get_files()} == {first.file_id, third.file_id}
+    assert {file_id for file_id, *_ in database.search_csv_data("Analyst")} == {first.file_id, third.file_id}
+    assert database.get_csv_preview(third.file_id)["Title"].tolist() == ["Engineer", "Analyst", "Intern"]
+    database.delete_file(third.file_id)
+    assert {file_id for file_id, *_ in database.search_csv_data("Analyst")} == {first.file_id}
+    database.wait_for_reclaim()
+    with database.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 1
+
+
+def test_column_types_are_recorded_at_ingest(temp_db) -> None:
+    """Test that logical types are inferred across chunks and used to type reads."""
+    content = b"job_id,pay,posted,dept,notes\n" + b"".join(
+        f"{i},{i}.5,2025-05-{i % 28 + 1:02d},{'CS' if i % 2 else 'EE'},note {i}\n".encode()
+        for i in range(20)
+    ) + b"20,emptyvalue,emptyvalue,CS,note 20\n"
+    stats = database.save_csv_to_database("typed.csv", content, len(content), "csv", 1, chunk_size=6)
+
+    with database.get_connection() as conn:
+        stored = conn.execute(
+            "SELECT display_name, logical_type FROM csv_columns WHERE file_id = ? ORDER BY column_index",
+            (stats.file_id,),
+        ).fetchall()
+    assert stored == [
+        ("Job Id", "int"), ("Pay", "float"), ("Posted", "date"), ("Dept", "category"), ("Notes", "string")
+    ]
+
+    df = database.get_csv_rows(stats.file_id)
+    assert df["Job Id"].dtype == "int64"
+    assert df["Pay"].dtype == "float64" and df["Pay"].isna().sum() == 1
+    assert pd.api.types.is_datetime64_any_dtype(df["Posted"])
+    assert df["Dept"].dtype == "category"
+
+    # Text written into a numeric column widens its recorded type
+    database.patch_csv_data(stats.file_id, changed_cells={0: {"Job Id": "pending"}})
+    assert database.get_csv_rows(stats.file_id)["Job Id"].tolist()[0] == "pending"
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_values_keep_their_text_across_chunks(temp_db, monkeypatch, engine_name) -> None:
+    """Test that a column numeric in the first chunk keeps the text of later values."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    content = b"code,name\n1,one\n2,two\n007,bond\nA12,other\n"
+    stats = database.save_csv_to_database("codes.csv", content, len(content), "csv", 1, chunk_size=2)
+
+    assert database.get_csv_rows(stats.file_id)["Code"].astype(str).tolist() == ["1", "2", "007", "A12"]
+    assert [row for _, row, _, _ in database.search_csv_data("007")] == [2]
+
+
+def test_missing_column_types_are_inferred_once(temp_db) -> None:
+    """Test that files stored without column types get them on their first read."""
+    file_id = _save()
+    with database.get_connection() as conn:
+        conn.execute("UPDATE csv_columns SET logical_type = NULL")
+        conn.commit()
+
+    assert database.get_csv_preview(file_id)["Salary"].tolist()[:2] == [100, 85]
+    with database.get_connection() as conn:
+        assert conn.execute(
+            "SELECT logical_type FROM csv_columns WHERE file_id = ? ORDER BY column_index", (file_id,)
+        ).fetchall() == [("string",), ("string",), ("int",)]
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_deleted_files_are_reclaimed(temp_db, monkeypatch, engine_name) -> None:
+    """Test that deleted and orphaned datasets are purged in batches and their pages freed."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    content = b"id,name\n" + b"".join(f"{i},name {i}\n".encode() for i in range(3000))
+    file_id = _save("big.csv", content)
+    database.wait_for_reclaim()
+    with database.get_connection() as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        # Leftovers of a file whose files row was deleted without foreign keys enabled
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.executemany(
+            "INSERT INTO csv_data (file_id, row_number, column_name, value) VALUES (999, ?, 'x', 'y')",
+            [(row,) for row in range(50)],
+        )
+        conn.execute("INSERT INTO csv_columns (file_id, column_index, column_name) VALUES (999, 0, 'x')")
+        conn.commit()
+        conn.execute("PRAGMA foreign_keys = ON")
+
+    monkeypatch.setattr(reclaim, "RECLAIM_IN_BACKGROUND", False)
+    monkeypatch.setattr(reclaim, "RECLAIM_BATCH_SIZE", 1000)
+    database.delete_file(file_id)
+    stats = database._reclaimer.last_stats
+
+    assert stats.files_purged == 2
+    assert stats.bytes_reclaimed > 0
+    assert database.search_csv_data("name") == []
+    with database.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM csv_data").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM csv_columns").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM csv_search").fetchone()[0] == 0
+        assert conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name GLOB 'dataset_*'"
+        ).fetchone()[0] == 0
+
+
+def test_parquet_engine_reads_row_groups_memory_mapped(temp_db, monkeypatch) -> None:
+    """Test that Parquet datasets are written one row group per chunk beside the database."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", "parquet")
+    content = b"id,name\n" + b"".join(f"{i},row{i}\n".encode() for i in range(25))
+    stats = database.save_csv_to_database("rows.csv", content, len(content), "csv", 1, chunk_size=10)
+
+    path = os.path.join(temp_db + ".parquet", f"{stats.file_id}.parquet")
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    page = database.get_csv_rows(stats.file_id, offset=8, limit=4)
+    assert list(page.index) == [8, 9, 10, 11]
+    assert page["Id"].tolist() == [8, 9, 10, 11]
+
+    assert database.migrate_storage_engine("columnar") == 1
+    assert not os.path.exists(path)
+    assert database.get_csv_rows(stats.file_id, offset=8, limit=4)["Name"].tolist() == [
+        "row8", "row9", "row10", "row11"
+    ]
+
+
+def test_parquet_changes_follow_the_transaction(temp_db, monkeypatch) -> None:
+    """Test that Parquet files are only replaced or removed once the transaction commits."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", "parquet")
+    file_id = _save()
+    engine = engines.get_engine("parquet")
+    directory = temp_db + ".parquet"
+    path = os.path.join(directory, f"{file_id}.parquet")
+    committed = pq.read_table(path)
+    columns = ["title", "company", "salary"]
+
+    with database.get_connection() as conn:
+        cursor = conn.cursor()
+        engine.update_cells(cursor, file_id, [(0, 0, "title", "Lead Engineer")])
+        assert engine.delete_rows(cursor, file_id, [1]) == 1
+        assert engine.read(cursor, file_id, columns)["title"].tolist() == ["Lead Engineer", "Intern"]
+        assert pq.read_table(path).equals(committed)
+        conn.rollback()
+        engine.delete(cursor, file_id)
+        assert engine.count(cursor, file_id) == 0
+        assert os.path.exists(path)
+    assert pq.read_table(path).equals(committed)
+    assert os.listdir(directory) == [f"{file_id}.parquet"]
+
+    with database.get_connection() as conn:
+        cursor = conn.cursor()
+        engine.update_cells(cursor, file_id, [(0, 0, "title", "Lead Engineer")])
+        conn.commit()
+    assert pq.read_table(path).column("c0").to_pylist() == ["Lead Engineer", "Analyst", "Intern"]
+    assert os.listdir(directory) == [f"{file_id}.parquet"]
+
+    # A save that fails after its rows were written leaves no file behind
+    def fail(*args) -> None:
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(database, "_set_column_types", fail)
+    content = b"a,b\n1,2\n3,4\n"
+    assert database.save_csv_to_database("bad.csv", content, len(content), "csv", 1, chunk_size=1) is None
+    assert os.listdir(directory) == [f"{file_id}.parquet"]
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_daily_snapshots_are_stored_as_deltas(temp_db, monkeypatch, engine_name) -> None:
+    """Test that recurring snapshots store only their churn and still read as full files."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+
+    def snapshot(day: int, rows: list) -> database.IngestStats:
+        content = ("title,url\n" + "".join(f"{title},{url}\n" for title, url in rows)).encode()
+        return database.save_snapshot_to_database(
+            f"jobs_2025-05-0{day}.csv", content, len(content), "csv", 1, "jobs", key_columns=["url"]
+        )
+
+    jobs = [(f"Job {i}", f"u{i}") for i in range(10)]
+    first = snapshot(1, jobs)
+    second = snapshot(2, jobs[1:3] + [("Job 3 (remote)", "u3")] + jobs[4:] + [("Job 10", "u10")])
+    third = snapshot(3, jobs[1:] + [("Job 11", "u11")])
+
+    assert first.snapshot_base is None
+    assert (second.snapshot_base, third.snapshot_base) == (first.file_id, second.file_id)
+    with database.get_connection() as conn:
+        assert engines.get_engine(engine_name).count(conn.cursor(), second.file_id) == 2
+    assert sorted(database.get_csv_preview(second.file_id)["Title"]) == sorted(
+        [title for title, _ in jobs[1:] if title != "Job 3"] + ["Job 3 (remote)", "Job 10"]
+    )
+    assert database.get_row_count(third.file_id) == 10
+    assert database.get_csv_rows(third.file_id, filters=[("url", "==", "u3")])["Title"].tolist() == ["Job 3"]
+    assert database.aggregate_csv_data(third.file_id)["count"].tolist() == [10]
+
+    # Changing or deleting a base stores the snapshots built on it in full first
+    database.patch_csv_data(first.file_id, changed_cells={1: {"title": "Edited"}})
+    assert "Edited" not in database.get_csv_preview(second.file_id)["Title"].tolist()
+    database.delete_file(second.file_id)
+    database.wait_for_reclaim()
+    assert len(database.get_csv_preview(third.file_id)) == 10
+    with database.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 3
+    database.delete_file(third.file_id)
+    database.wait_for_reclaim()
+    with database.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM snapshot_removed").fetchone()[0] == 0
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_delta_snapshots_are_searched_and_streamed(temp_db, monkeypatch, engine_name) -> None:
+    """Test that search finds rows a delta shares with its hidden base and reads stream in windows."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    monkeypatch.setattr(snapshots, "SNAPSHOT_READ_CHUNK_SIZE", 3)
+
+    def snapshot(day: int, rows: list) -> database.IngestStats:
+        content = ("title,url\n" + "".join(f"{title},{url}\n" for title, url in rows)).encode()
+        return database.save_snapshot_to_database(
+            f"jobs_2025-05-0{day}.csv", content, len(content), "csv", 1, "jobs", key_columns=["url"]
+        )
+
+    jobs = [(f"Job {i}", f"u{i}") for i in range(10)]
+    first = snapshot(1, jobs)
+    second = snapshot(2, jobs[:3] + [("Job 3 (remote)", "u3")] + jobs[5:] + [("Job 10", "u10")])
+    assert second.snapshot_base == first.file_id
+
+    assert sorted(file_id for file_id, *_ in database.search_csv_data("u5")) == [first.file_id, second.file_id]
+    assert [file_id for file_id, *_ in database.search_csv_data("u4")] == [first.file_id]
+    database.delete_file(first.file_id)
+    assert [file_id for file_id, *_ in database.search_csv_data("u5")] == [second.file_id]
+    assert database.search_csv_data("u4") == []
+
+    expected = [title for title, _ in jobs[:3]] + ["Job 3 (remote)"] + [title for title, _ in jobs[5:]] + ["Job 10"]
+    chunks = list(database.iter_csv_rows(second.file_id, chunk_size=3))
+    assert pd.concat(chunks)["Title"].tolist() == expected
+    assert database.get_csv_rows(second.file_id, offset=2, limit=4)["Title"].tolist() == expected[2:6]
+    assert database.get_row_count(second.file_id) == len(expected)
+
+
+def test_expired_partitions_are_dropped_whole(temp_db, monkeypatch) -> None:
+    """Test that retention drops old date partitions per category and keeps newer snapshots readable."""
+    snapshot_ids = []
+    for day in range(1, 6):
+        content = ("title,url\n" + "".join(f"Job {i},u{i}\n" for i in range(day, day + 10))).encode()
+        snapshot_ids.append(database.save_snapshot_to_database(
+            f"jobs_2025-05-0{day}.csv", content, len(content), "csv", 1, "jobs", ["url"],
+            category="jobs", fetch_date=f"2025-05-0{day}",
+        ).file_id)
+    content = b"course\nCSC 1350\n"
+    database.save_csv_to_database(
+        "lsu_relevant_2025-05-01.csv", content, len(content), "csv", 1, category="lsu_courses", fetch_date="2025-05-01"
+    )
+    assert len(database.get_partitions()) == 6
+    assert retention.parse_policies("jobs=3, lsu_courses=365") == {"jobs": 3, "lsu_courses": 365}
+    with pytest.raises(ValueError):
+        retention.parse_policies("jobs")
+
+    # Only the first snapshot kept is stored in full; the dropped deltas are not copied
+    stored_in_full = []
+    store_in_full = database._store_in_full
+    monkeypatch.setattr(
+        database, "_store_in_full",
+        lambda cursor, file_id, view: stored_in_full.append(file_id) or store_in_full(cursor, file_id, view),
+    )
+    dropped = database.apply_retention({"jobs": 3, "lsu_courses": 365}, today=date(2025, 5, 6))
+    assert stored_in_full == [snapshot_ids[3]]
+    assert dropped == [("jobs", "2025-05-01"), ("jobs", "2025-05-02"), ("jobs", "2025-05-03")]
+    assert [(category, day) for category, day, *_ in database.get_partitions()] == [
+        ("jobs", "2025-05-05"), ("jobs", "2025-05-04"), ("lsu_courses", "2025-05-01")
+    ]
+    newest = max(file_id for file_id, name, *_ in database.get_files() if name.startswith("jobs"))
+    assert sorted(database.get_csv_preview(newest)["Url"]) == sorted(f"u{i}" for i in range(5, 15))
+    with database.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 3
+        assert conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name GLOB 'dataset_*'"
+        ).fetchone()[0] == 3
+
+
+def test_catalog_filters_on_structured_metadata(temp_db) -> None:
+    """Test that files are selected by category, major, date and source through an index."""
+    for day in ("2025-05-01", "2025-05-02"):
+        for category, major in (("jobs", "data_science"), ("jobs", "cybersecurity"), ("courses", "data_science")):
+            content = f"title,day\n{category} {major},{day}\n".encode()
+            database.save_csv_to_database(
+                f"{category}_{major}_{day}.csv", content, len(content), "csv", 1,
+                category=category, fetch_date=day, major=major, source=catalog.SOURCES[category],
+            )
+        content = f"course,day\nCSC 1350,{day}\n".encode()
+        database.save_csv_to_database(
+            f"lsu_relevant_{day}.csv", content, len(content), "csv", 1,
+            category="lsu_courses", fetch_date=day, source="lsu_booklet",
+        )
+
+    rows = database.get_catalog("jobs", "data_science", "2025-05-02")
+    assert [row[1] for row in rows] == ["jobs_data_science_2025-05-02.csv"]
+    assert rows[0][5:] == ("jobs", "data_science", "2025-05-02", "linkedin")
+    assert [row[1] for row in database.get_catalog("lsu_courses", "data_science", "2025-05-01")] == [
+        "lsu_relevant_2025-05-01.csv"
+    ]
+    assert database.count_catalog(source="linkedin") == 4
+    assert [row[1] for row in database.get_catalog("jobs", offset=1, limit=2)] == [
+        "jobs_data_science_2025-05-02.csv", "jobs_cybersecurity_2025-05-01.csv"
+    ]
+    with database.get_connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM files WHERE category = 'jobs' AND fetch_date = '2025-05-01'"
+        ).fetchall()
+    assert "idx_files_category_fetch_date" in str(plan)
+
+    assert catalog.parse_filename("research_cloud_computing_2025-04-30.csv") == (
+        "research", "cloud_computing", "2025-04-30", "core"
+    )
+    assert catalog.parse_filename("lsu_relevant_2025-04-30.csv").major is None
+    assert catalog.parse_filename("upload.csv") is None
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_uploads_run_on_the_ingest_queue(temp_db, monkeypatch, engine_name) -> None:
+    """Test that queued uploads report progress, are idempotent and roll back when cancelled."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    content = b"id,name\n" + b"".join(f"{i},name {i}\n".encode() for i in range(50))
+
+    job = database.submit_upload("rows.csv", content, len(content), "csv", 1, chunk_size=10)
+    assert database.wait_for_ingest(10)
+    assert job.status == ingest_queue.DONE
+    assert (job.total_rows, job.rows_ingested, job.progress) == (50, 50, 1.0)
+    assert database.get_row_count(job.result.file_id) == 50
+    assert database.submit_upload("rows.csv", content, len(content), "csv", 1) is job
+    assert database.get_ingest_job(job.job_id) is job
+    assert not database.cancel_ingest(job.job_id)
+
+    def cancel_after_first_chunk(rows: int) -> None:
+        raise ingest_queue.IngestCancelled("rows2.csv")
+
+    with pytest.raises(ingest_queue.IngestCancelled):
+        database.save_csv_to_database(
+            "rows2.csv", content + b"50,x\n", len(content) + 5, "csv", 1,
+            chunk_size=10, progress=cancel_after_first_chunk,
+        )
+    assert [row[1] for row in database.get_files()] == ["rows.csv"]
+    with database.get_connection() as conn:
+        assert conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name GLOB 'dataset_*'"
+        ).fetchone()[0] == (1 if engine_name == "columnar" else 0)
+    if engine_name == "parquet":
+        assert os.listdir(temp_db + ".parquet") == [f"{job.result.file_id}.parquet"]
+
+
+def test_writes_bump_generation_and_invalidate_cache(temp_db) -> None:
+    """Test that writes advance the generation and file version a versioned LRU keys on."""
+    results = cache.LRUCache(max_bytes=2000, sizeof=lambda value: len(value) * 100)
+    load = lambda file_id: lambda: database.get_csv_preview(file_id)["Title"].tolist()
+
+    generation = database.get_generation()
+    file_id = _save()
+    assert database.get_generation() == generation + 1
+    version = database.get_file_version(file_id)
+    assert results.get_or_load(("titles", file_id), version, load(file_id)) == ["Engineer", "Analyst", "Intern"]
+    assert results.get_or_load(("titles", file_id), version, load(file_id)) == ["Engineer", "Analyst", "Intern"]
+
+    database.patch_csv_data(file_id, changed_cells={0: {"Title": "Manager"}})
+    assert database.get_file_version(file_id) == version + 1
+    assert results.get_or_load(("titles", file_id), version + 1, load(file_id))[0] == "Manager"
+    assert (results.stats().hits, results.stats().misses, results.stats().entries) == (1, 2, 1)
+
+    for key in range(6):
+        results.put(key, 0, [key] * 3)
+    stats = results.stats()
+    assert (stats.entries, stats.bytes, stats.evictions) == (6, 1800, 1)
+    results.put("huge", 0, [0] * 30)
+    assert results.stats().entries == 6
+
+    database.delete_file(file_id)
+    assert database.get_generation() == generation + 3
+    assert database.get_file_version(file_id) == version + 2
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_previews_are_shared_through_the_arrow_cache(temp_db, monkeypatch, engine_name) -> None:
+    """Test that decoded previews are mapped from disk until the file's version changes."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    file_id = _save()
+    first = database.get_csv_preview(file_id)
+    version = database.get_file_version(file_id)
+    assert os.listdir(temp_db + ".arrow") == [f"{file_id}-{version}.arrow"]
+
+    # A process that finds the cached file maps it instead of decoding the rows again
+    with monkeypatch.context() as patch:
+        patch.setattr(type(engines.get_engine()), "read", None)
+        allocated = pa.total_allocated_bytes()
+        table = database.get_csv_table(file_id)
+        assert pa.total_allocated_bytes() == allocated
+        handle = cache.DatasetHandle(table)
+        assert handle.num_rows == 3
+        pd.testing.assert_frame_equal(handle.frame, first)
+
+    database.patch_csv_data(file_id, changed_cells={0: {"Title": "Manager"}})
+    assert database.get_csv_preview(file_id)["Title"].tolist()[0] == "Manager"
+    assert os.listdir(temp_db + ".arrow") == [f"{file_id}-{version + 1}.arrow"]
+
+    monkeypatch.setattr(reclaim, "RECLAIM_IN_BACKGROUND", False)
+    database.delete_file(file_id)
+    assert os.listdir(temp_db + ".arrow") == []
+
+
+def test_exports_are_built_from_the_dataset_handle(temp_db) -> None:
+    """Test that every download format serializes the shared dataset handle."""
+    handle = cache.DatasetHandle(database.get_csv_table(_save()))
+
+    assert exports.export_dataset(handle, "csv").decode().splitlines()[:2] == [
+        "Title,Company,Salary", "Engineer,Acme,100.0"
+    ]
+    assert json.loads(exports.export_dataset(handle, "json"))[1]["Company"] == "Globex"
+    parquet = pq.read_table(io.BytesIO(exports.export_dataset(handle, "parquet")))
+    pd.testing.assert_frame_equal(parquet.to_pandas(), handle.frame)
+    assert exports.export_dataset(handle, "excel").startswith(b"PK")
+    with pytest.raises(ValueError):
+        exports.export_dataset(handle, "xml")
+
+
+@pytest.mark.parametrize("engine_name", ["eav", "columnar", "parquet"])
+def test_exports_stream_in_chunks(temp_db, monkeypatch, engine_name) -> None:
+    """Test that streamed exports write every chunk with one schema, compressed on request."""
+    monkeypatch.setattr(engines, "DEFAULT_ENGINE", engine_name)
+    # The score is missing in the second chunk only
+    content = b"id,score,team\n" + b"".join(
+        f"{i},{'' if i == 12 else i * 2},{'ab'[i % 2]}\n".encode() for i in range(25)
+    )
+    file_id = _save("scores.csv", content)
+    assert [len(chunk) for chunk in database.iter_csv_rows(file_id, chunk_size=10)] == [10, 10, 5]
+
+    paths = []
+    try:
+        paths.append(database.export_csv_data(file_id, "csv", compress=True, chunk_size=10))
+        with gzip.open(paths[-1], "rt") as f:
+            assert pd.read_csv(f)["Id"].tolist() == list(range(25))
+
+        paths.append(database.export_csv_data(file_id, "jsonl", chunk_size=10))
+        with open(paths[-1]) as f:
+            records = [json.loads(line) for line in f]
+        assert len(records) == 25 and records[12]["Score"] is None
+
+        paths.append(database.export_csv_data(file_id, "parquet", chunk_size=10))
+        parquet = pq.ParquetFile(paths[-1])
+        assert parquet.metadata.num_row_groups == 3
+        assert parquet.schema_arrow.field("Score").type == pa.int64()
+        assert parquet.read().column("Score").null_count == 1
+    finally:
+        for path in paths:
+            os.remove(path)
+    assert database.export_csv_data(999, "csv") is None
+
+
+
+def test_email_attachments_are_compressed_and_split(monkeypatch) -> None:
+    """Test that emailed datasets are zipped, sent as Parquet when smaller and split when too large."""
+    rng = random.Random(0)
+    salaries = [rng.random() * 1000 for _ in range(20000)]
+    df = pd.DataFrame({"id": range(20000), "title": ["Engineer", "Analyst"] * 10000, "salary": salaries})
+
+    [attachment] = exports.email_attachments(df, "jobs.csv", 2**20)
+    assert (attachment.filename, attachment.mime) == ("jobs.zip", "application/zip")
+    with zipfile.ZipFile(io.BytesIO(attachment.content)) as archive:
+        pd.testing.assert_frame_equal(pd.read_csv(archive.open("jobs.csv")), df)
+
+    monkeypatch.setattr(exports, "EMAIL_PARQUET_THRESHOLD", 0)
+    [attachment] = exports.email_attachments(df, "jobs.csv", 2**20)
+    assert attachment.filename == "jobs.parquet"
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(attachment.content)), df)
+
+    parts = exports.email_attachments(df, "jobs.csv", len(attachment.content) // 3)
+    assert len(parts) > 3
+    assert parts[0].filename == f"jobs.part1of{len(parts)}.parquet"
+    assert all(len(part.content) <= len(attachment.content) // 3 for part in parts)
+    restored = pd.concat(pd.read_parquet(io.BytesIO(part.content)) for part in parts)
+    pd.testing.assert_frame_equal(restored.reset_index(drop=True), df)
+
+
+def test_outbox_retries_emails_in_the_background(temp_db, monkeypatch) -> None:
+    """Test that queued emails are retried with backoff against a local mail server."""
+    responses = [503, 202, 400]
+    received = []
+
+    class MailHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.headers["Authorization"], json.loads(body)))
+            self.send_response(responses.pop(0))
+            self.end_headers()
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), MailHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(outbox, "OUTBOX_BACKOFF_BASE", 0.05)
+    try:
+        sender = outbox.Outbox(
+            database.get_connection, lambda: "key", url=f"http://127.0.0.1:{server.server_port}/"
+        )
+        message_id = sender.enqueue("a@lsu.edu", {"subject": "jobs"})
+        assert sender.wait(timeout=10)
+
+        message = sender.status(message_id)
+        assert (message.status, message.attempts, message.last_error) == (outbox.SENT, 2, None)
+        assert received == [("Bearer key", {"subject": "jobs"})] * 2
+
+        # Client errors are not retried
+        message_id = sender.enqueue("b@lsu.edu", {"subject": "jobs"})
+        assert sender.wait(timeout=10)
+        message = sender.status(message_id)
+        assert (message.status, message.attempts) == (outbox.FAILED, 1)
+        assert message.last_error.startswith("Status code 400")
+        with database.get_connection() as conn:
+            assert conn.execute("SELECT DISTINCT payload FROM email_outbox").fetchall() == [("",)]
+
+        # A message another sender is sending is only looked at again once its claim times out
+        with database.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO email_outbox (recipient, payload, status, next_attempt_at, claimed_at) "
+                "VALUES ('c@lsu.edu', '{}', ?, 0, ?)",
+                (outbox.SENDING, time.time()),
+            )
+            conn.commit()
+        assert sender.run_once() == pytest.approx(outbox.OUTBOX_CLAIM_TIMEOUT, abs=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert all(0 <= outbox.backoff_delay(attempt) <= 0.05 * 2 ** (attempt - 1) for attempt in range(1, 6))